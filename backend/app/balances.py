@@ -0,0 +1,187 @@
+"""Group balances kept as an append-only ledger with running totals.
+
+Every group expense write appends ``balance_ledger`` entries (the change
+of each member's paid and owed totals) and adds them to
+``member_balances`` in the same transaction, so current balances are
+read with one row per member. Every ``BALANCE_SNAPSHOT_INTERVAL`` entries
+of a group, the running totals are copied to ``balance_snapshots`` under
+the last ledger position they include. Balances as of an earlier moment
+then start from the closest snapshot and replay at most about an
+interval of entries, instead of the whole history.
+
+Only unsettled splits count, as before the ledger existed. Edits made
+outside crud, such as marking splits paid by hand, are brought back in by
+``reconcile``, which appends correcting entries without an expense.
+
+    python -m app.balances check      # list members whose totals disagree; exits 1 if any
+    python -m app.balances rebuild    # recompute member_balances from the ledger
+    python -m app.balances reconcile  # append entries matching the ledger to the splits
+"""
+import argparse
+import math
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Ledger entries of a group between snapshots
+BALANCE_SNAPSHOT_INTERVAL = int(os.getenv("BALANCE_SNAPSHOT_INTERVAL", "1000"))
+
+
+def expense_changes(paid_by: int, splits) -> dict:
+    """``{user_id: [paid, owed]}`` that an expense with unsettled ``(user_id, amount)`` splits adds"""
+    changes = {}
+    for user_id, amount in splits:
+        changes.setdefault(user_id, [0.0, 0.0])[1] += amount or 0.0
+        changes.setdefault(paid_by, [0.0, 0.0])[0] += amount or 0.0
+    return changes
+
+
+def split_totals(db: Session, group_id: Optional[int] = None) -> dict:
+    """``{(group_id, user_id): [paid, owed]}`` recomputed from the unsettled splits.
+
+    One GROUP BY per (payer, debtor) pair; this is what the ledger must
+    add up to.
+    """
+    expense, split = models.GroupExpense, models.ExpenseSplit
+    statement = (
+        select(expense.group_id, expense.paid_by, split.user_id, func.sum(split.amount))
+        .join(split, split.expense_id == expense.id)
+        .where(expense.group_id.isnot(None), split.paid.isnot(True))
+        .group_by(expense.group_id, expense.paid_by, split.user_id)
+    )
+    if group_id is not None:
+        statement = statement.where(expense.group_id == group_id)
+    totals = {}
+    for group, payer, debtor, amount in db.execute(statement):
+        totals.setdefault((group, payer), [0.0, 0.0])[0] += amount or 0.0
+        totals.setdefault((group, debtor), [0.0, 0.0])[1] += amount or 0.0
+    return totals
+
+
+def ledger_totals(db: Session, group_id: Optional[int] = None,
+                  after: int = 0, upto: Optional[int] = None) -> dict:
+    """``{(group_id, user_id): [paid, owed]}`` summed over ledger positions in (``after``, ``upto``]"""
+    ledger = models.BalanceLedgerEntry
+    statement = select(ledger.group_id, ledger.user_id, func.sum(ledger.paid), func.sum(ledger.owed))\
+        .where(ledger.id > after)\
+        .group_by(ledger.group_id, ledger.user_id)
+    if group_id is not None:
+        statement = statement.where(ledger.group_id == group_id)
+    if upto is not None:
+        statement = statement.where(ledger.id <= upto)
+    return {(group, user_id): [paid, owed] for group, user_id, paid, owed in db.execute(statement)}
+
+
+def stored_totals(db: Session, group_id: Optional[int] = None) -> dict:
+    """``{(group_id, user_id): [paid, owed]}`` as kept in member_balances"""
+    balance = models.MemberBalance
+    statement = select(balance.group_id, balance.user_id, balance.paid, balance.owed)
+    if group_id is not None:
+        statement = statement.where(balance.group_id == group_id)
+    return {(group, user_id): [paid, owed] for group, user_id, paid, owed in db.execute(statement)}
+
+
+def position_at(db: Session, group_id: int, moment: datetime) -> int:
+    """Last ledger position of the group recorded at or before ``moment``, 0 if none"""
+    ledger = models.BalanceLedgerEntry
+    return db.scalar(
+        select(ledger.id)
+        .where(ledger.group_id == group_id, ledger.recorded_at <= moment)
+        .order_by(ledger.recorded_at.desc(), ledger.id.desc())
+        .limit(1)
+    ) or 0
+
+
+def totals_at(db: Session, group_id: int, position: int) -> dict:
+    """``{user_id: [paid, owed]}`` of the group after ledger ``position``.
+
+    Starts from the latest snapshot at or before it and adds the entries
+    recorded since.
+    """
+    snapshot = models.BalanceSnapshot
+    start = db.scalar(
+        select(func.max(snapshot.ledger_id))
+        .where(snapshot.group_id == group_id, snapshot.ledger_id <= position)
+    ) or 0
+    totals = {}
+    if start:
+        totals = {
+            user_id: [paid, owed] for user_id, paid, owed in db.execute(
+                select(snapshot.user_id, snapshot.paid, snapshot.owed)
+                .where(snapshot.group_id == group_id, snapshot.ledger_id == start)
+            )
+        }
+    for (_, user_id), (paid, owed) in ledger_totals(db, group_id, after=start, upto=position).items():
+        total = totals.setdefault(user_id, [0.0, 0.0])
+        total[0] += paid
+        total[1] += owed
+    return totals
+
+
+def differences(want: dict, have: dict) -> dict:
+    """``{key: [paid, owed]}`` to add to ``have`` to reach ``want``, leaving out rounding noise"""
+    changes = {}
+    for key in want.keys() | have.keys():
+        target, current = want.get(key, [0.0, 0.0]), have.get(key, [0.0, 0.0])
+        change = [target[0] - current[0], target[1] - current[1]]
+        if any(not math.isclose(value, 0.0, abs_tol=1e-6) for value in change):
+            changes[key] = change
+    return changes
+
+
+def rebuild(db: Session) -> int:
+    """Replace member_balances with the ledger totals; returns the number of rows"""
+    db.execute(delete(models.MemberBalance))
+    values = [
+        {"group_id": group_id, "user_id": user_id, "paid": paid, "owed": owed}
+        for (group_id, user_id), (paid, owed) in ledger_totals(db).items()
+    ]
+    if values:
+        db.execute(insert(models.MemberBalance), values)
+    db.commit()
+    return len(values)
+
+
+def check(db: Session, group_id: Optional[int] = None) -> list:
+    """``(key, splits, ledger, stored)`` for every member whose totals disagree anywhere.
+
+    ``splits`` is recomputed from the unsettled splits, ``ledger`` is the
+    sum of the ledger and ``stored`` comes from member_balances.
+    """
+    expected = split_totals(db, group_id)
+    ledger = ledger_totals(db, group_id)
+    stored = stored_totals(db, group_id)
+    mismatched = differences(expected, ledger).keys() | differences(ledger, stored).keys()
+    return [(key, expected.get(key), ledger.get(key), stored.get(key)) for key in sorted(mismatched)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.balances", description="Maintain group balance tables")
+    parser.add_argument("command", choices=["check", "rebuild", "reconcile"])
+    args = parser.parse_args(argv)
+
+    from . import crud
+    from .database import SessionLocal
+
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            print(f"member_balances: {rebuild(db)} rows")
+            return 0
+        if args.command == "reconcile":
+            print(f"balance_ledger: {crud.reconcile_balances(db)} correcting entries")
+            return 0
+        mismatches = check(db)
+        for key, expected, ledger, stored in mismatches:
+            print(f"{key}: splits {expected}, ledger {ledger}, stored {stored}")
+        print(f"member_balances: {len(mismatches)} mismatched members")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
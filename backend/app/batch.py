@@ -0,0 +1,41 @@
+"""Validation helpers for endpoints that take many items in one request."""
+import os
+
+from pydantic import TypeAdapter, ValidationError
+
+from . import schemas
+
+# Operations accepted by one POST /batch/expenses
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "500"))
+# Rows removed per transaction by DELETE /expenses/; keeps SQLite write locks short
+BULK_DELETE_CHUNK_SIZE = int(os.getenv("BULK_DELETE_CHUNK_SIZE", "500"))
+
+expense_operations = TypeAdapter(list[schemas.ExpenseOperation])
+
+
+def validate_many(adapter: TypeAdapter, items: list):
+    """Validate ``items`` with a list ``adapter`` in one pass, isolating failures.
+
+    Returns ``(valid, errors)``: ``valid`` holds ``(index, value)`` for items
+    that validated and ``errors`` maps the index of each failed item to a
+    message naming the first offending field.
+    """
+    errors = {}
+    indexes = range(len(items))
+    try:
+        values = adapter.validate_python(items)
+    except ValidationError as exc:
+        for error in exc.errors():
+            index = error["loc"][0]
+            if index not in errors:
+                # Skip the discriminator tag pydantic puts in front of the field path
+                path = [str(part) for part in error["loc"][1:]]
+                item = items[index]
+                if path and isinstance(item, dict) and path[0] == item.get("op"):
+                    path = path[1:]
+                field = ".".join(path)
+                errors[index] = f"{field}: {error['msg']}" if field else error["msg"]
+        indexes = [index for index in indexes if index not in errors]
+        # Only items that passed remain, so this pass cannot fail
+        values = adapter.validate_python([items[index] for index in indexes])
+    return list(zip(indexes, values)), errors
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from . import metrics, models
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+# How long a token version read from the database is trusted; 0 reads it on every request
+TOKEN_VERSION_TTL_SECONDS = float(os.getenv("TOKEN_VERSION_TTL_SECONDS", "1"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight, session-independent view of an authenticated user"""
+    id: int
+    email: str
+    full_name: str
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            token_version=user.token_version
+        )
+
+
+class PrincipalCache:
+    """Bounded LRU cache mapping validated tokens to principals.
+
+    Entries expire after ``ttl`` seconds or when the token itself expires,
+    whichever comes first.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[Principal, float]]" = OrderedDict()
+        self._tokens_by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def get_user(self, user_id: int) -> Optional[Principal]:
+        """Return the principal of any live token of the user, if cached"""
+        now = time.time()
+        with self._lock:
+            for token in self._tokens_by_user.get(user_id, ()):
+                principal, expires_at = self._entries[token]
+                if expires_at > now:
+                    return principal
+        return None
+
+    def set(self, token: str, principal: Principal, token_expires_at: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (principal, expires_at)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token of a user, e.g. after their record changes"""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, token: str):
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+
+class TokenVersionCache:
+    """Bounded LRU cache of each user's current token version from the database.
+
+    Cached principals are only trusted while their token version matches
+    this one, so a version bumped by another worker or directly in the
+    database rejects old tokens within ``ttl`` seconds.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = TOKEN_VERSION_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            version, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return version
+
+    def set(self, user_id: int, version: int):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._entries[user_id] = (version, time.monotonic() + self.ttl)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+token_versions = TokenVersionCache()
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
+    token_versions.invalidate_user(target.id)
+
+
+@metrics.register
+def _principal_cache_metrics():
+    return [
+        ("principal_cache_hits_total", "counter",
+         "Authenticated requests served from the principal cache", principal_cache.hits),
+        ("principal_cache_misses_total", "counter",
+         "Authenticated requests that had to load the user", principal_cache.misses),
+        ("principal_cache_evictions_total", "counter",
+         "Entries evicted to keep the cache bounded", principal_cache.evictions),
+        ("principal_cache_entries", "gauge",
+         "Tokens currently cached", len(principal_cache)),
+    ]
@@ -1,22 +1,274 @@
-from datetime import datetime
-# from typing import Optional
-from sqlalchemy.orm import Session
-from . import models, schemas
-from passlib.context import CryptContext
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+from itertools import count
+from sqlalchemy import (
+    String, and_, bindparam, case, delete, event, func, insert, literal, or_, select, text, tuple_, type_coerce,
+    update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, selectinload
+from . import balances, batch, database, importers, models, reports, rollups, schemas, search, settlement
+from .hashing import password_hasher
+from .pagination import decode_cursor, encode_cursor
 from fastapi import HTTPException, status
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def get_collection_version(db: Session, scope: str, scope_id: int) -> int:
+    version = db.query(models.CollectionVersion.version).filter(
+        models.CollectionVersion.scope == scope,
+        models.CollectionVersion.scope_id == scope_id
+    ).scalar()
+    return version or 0
+
+
+def _conflict_insert(db: Session):
+    """Dialect insert() with ON CONFLICT support, or None where there is none"""
+    return {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(db.get_bind().dialect.name)
+
+
+def bump_collection_version(db: Session, scope: str, scope_id: int, by: int = 1) -> Optional[int]:
+    """Invalidate ETags of a collection; call inside the mutating transaction.
+
+    Returns the new version on dialects with an upsert (read back with
+    RETURNING), otherwise None.
+    """
+    conflict_insert = _conflict_insert(db)
+    if conflict_insert is not None:
+        return db.scalar(
+            conflict_insert(models.CollectionVersion)
+            .values(scope=scope, scope_id=scope_id, version=by)
+            .on_conflict_do_update(
+                index_elements=["scope", "scope_id"],
+                set_={"version": models.CollectionVersion.version + by}
+            )
+            .returning(models.CollectionVersion.version)
+        )
+    result = db.execute(
+        update(models.CollectionVersion)
+        .where(models.CollectionVersion.scope == scope, models.CollectionVersion.scope_id == scope_id)
+        .values(version=models.CollectionVersion.version + by)
+    )
+    if result.rowcount == 0:
+        db.add(models.CollectionVersion(scope=scope, scope_id=scope_id, version=by))
+
+
+def next_sequence(db: Session, count: int = 1) -> int:
+    """Allocate ``count`` sync feed positions and return the last one.
+
+    The counter row stays write-locked until commit, so transactions commit
+    in sequence order and a client never skips a change that commits late.
+    """
+    seq = bump_collection_version(db, "sync", 0, by=count)
+    if seq is None:
+        seq = get_collection_version(db, "sync", 0)
+    return seq
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_write(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "before_commit")
+def _take_position(session):
+    # With replicas, count the user's writes on their own row so database.session_router
+    # can keep their reads off replicas that have not applied the latest one
+    wrote = session.info.pop("wrote", False) or session.new or session.dirty or session.deleted
+    user_id = session.info.get("user_id")
+    if wrote and user_id is not None and database.session_router.replicas:
+        position = bump_collection_version(session, "writes", user_id)
+        if position is None:
+            position = get_collection_version(session, "writes", user_id)
+        session.info["write_position"] = position
+
+
+def stamp_change(db: Session, row):
+    """Move a new or changed row to the head of the sync feed"""
+    row.seq = next_sequence(db)
+    row.updated_at = datetime.utcnow()
+
+
+def add_tombstone(db: Session, entity: str, entity_id: int, user_id: Optional[int] = None,
+                  group_id: Optional[int] = None):
+    db.add(models.Tombstone(
+        seq=next_sequence(db),
+        entity=entity,
+        entity_id=entity_id,
+        user_id=user_id,
+        group_id=group_id
+    ))
+
+
+def add_to_rollups(db: Session, rollup: rollups.Rollup, rows):
+    """Count new ``(owner, date, category, amount)`` expenses into their rollup buckets"""
+    values = rollups.row_values(rollup, rollups.aggregate(rollup, rows))
+    if not values:
+        return
+    model = rollup.model
+    conflict_insert = _conflict_insert(db)
+    if conflict_insert is not None:
+        statement = conflict_insert(model)
+        excluded = statement.excluded
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[rollup.owner, rollup.bucket, "category"],
+            set_={
+                "total": model.total + excluded.total,
+                "count": model.count + excluded.count,
+                "max_amount": case(
+                    (excluded.max_amount > model.max_amount, excluded.max_amount),
+                    else_=model.max_amount
+                ),
+            }
+        ), values)
+        return
+    for row in values:
+        result = db.execute(
+            update(model).where(
+                getattr(model, rollup.owner) == row[rollup.owner],
+                getattr(model, rollup.bucket) == row[rollup.bucket],
+                model.category == row["category"]
+            ).values(
+                total=model.total + row["total"],
+                count=model.count + row["count"],
+                max_amount=case((model.max_amount < row["max_amount"], row["max_amount"]), else_=model.max_amount)
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        if result.rowcount == 0:
+            db.execute(insert(model), [row])
+
+
+def refresh_rollups(db: Session, rollup: rollups.Rollup, keys):
+    """Recompute rollup buckets from the expenses left in them after updates or deletes.
+
+    ``keys`` are ``rollups.bucket_key`` tuples; call after the change is
+    flushed or executed, inside its transaction. Consecutive buckets of an
+    owner are read with one range scan.
+    """
+    by_owner = {}
+    for owner_id, bucket, category in keys:
+        by_owner.setdefault(owner_id, {}).setdefault(bucket, set()).add(category)
+    if not by_owner:
+        return
+    db.flush()
+    model = rollup.model
+    for owner_id, buckets in by_owner.items():
+        db.execute(
+            delete(model).where(
+                getattr(model, rollup.owner) == owner_id,
+                tuple_(getattr(model, rollup.bucket), model.category).in_(
+                    [(bucket, category) for bucket, categories in buckets.items() for category in categories]
+                )
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        runs = []
+        for bucket in sorted(buckets):
+            if runs and runs[-1][1] == bucket:
+                runs[-1][1] = rollup.next_bucket(bucket)
+            else:
+                runs.append([bucket, rollup.next_bucket(bucket)])
+        recomputed = {}
+        for start, end in runs:
+            recomputed.update(rollups.aggregate(
+                rollup, db.execute(rollups.source_rows(rollup, owner_id, start, end))
+            ))
+        values = rollups.row_values(rollup, {
+            key: stats for key, stats in recomputed.items() if key[2] in buckets[key[1]]
+        })
+        if values:
+            db.execute(insert(model), values)
+
+
+def record_balance_changes(db: Session, group_id: int, expense_id: Optional[int], changes: dict):
+    """Append ledger entries of ``{user_id: [paid, owed]}`` and add them to member_balances"""
+    if not changes:
+        return
+    now = datetime.utcnow()
+    db.execute(insert(models.BalanceLedgerEntry), [
+        {
+            "group_id": group_id, "user_id": user_id, "expense_id": expense_id,
+            "paid": paid, "owed": owed, "recorded_at": now,
+        }
+        for user_id, (paid, owed) in changes.items()
+    ])
+    model = models.MemberBalance
+    values = [
+        {"group_id": group_id, "user_id": user_id, "paid": paid, "owed": owed}
+        for user_id, (paid, owed) in changes.items()
+    ]
+    conflict_insert = _conflict_insert(db)
+    if conflict_insert is not None:
+        statement = conflict_insert(model)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["group_id", "user_id"],
+            set_={"paid": model.paid + statement.excluded.paid, "owed": model.owed + statement.excluded.owed}
+        ), values)
+    else:
+        for row in values:
+            result = db.execute(
+                update(model).where(model.group_id == group_id, model.user_id == row["user_id"])
+                .values(paid=model.paid + row["paid"], owed=model.owed + row["owed"]),
+                execution_options={"synchronize_session": False}
+            )
+            if result.rowcount == 0:
+                db.execute(insert(model), [row])
+
+    ledger, snapshot = models.BalanceLedgerEntry, models.BalanceSnapshot
+    last = db.scalar(select(func.max(snapshot.ledger_id)).where(snapshot.group_id == group_id)) or 0
+    pending = select(ledger.id).where(ledger.group_id == group_id, ledger.id > last)\
+        .limit(balances.BALANCE_SNAPSHOT_INTERVAL).subquery()
+    if db.scalar(select(func.count()).select_from(pending)) < balances.BALANCE_SNAPSHOT_INTERVAL:
+        return
+    position = db.scalar(select(func.max(ledger.id)).where(ledger.group_id == group_id))
+    db.execute(insert(snapshot).from_select(
+        ["group_id", "ledger_id", "user_id", "paid", "owed", "taken_at"],
+        select(model.group_id, literal(position), model.user_id, model.paid, model.owed, literal(now))
+        .where(model.group_id == group_id)
+    ))
+
+
+def reconcile_balances(db: Session, group_id: Optional[int] = None) -> int:
+    """Append ledger entries that bring balances back in line with the unsettled splits.
+
+    For edits made outside crud; returns the number of entries appended.
+    """
+    corrections = {}
+    changes = balances.differences(balances.split_totals(db, group_id), balances.ledger_totals(db, group_id))
+    for (group, user_id), change in changes.items():
+        corrections.setdefault(group, {})[user_id] = change
+    for group, group_changes in sorted(corrections.items()):
+        record_balance_changes(db, group, None, group_changes)
+        bump_collection_version(db, "group_expenses", group)
+    db.commit()
+    return len(changes)
 
 
 def get_user(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 
+def get_token_version(db: Session, user_id: int) -> Optional[int]:
+    return db.scalar(select(models.User.token_version).where(models.User.id == user_id))
+
+
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
 
-def create_user(db: Session, user: schemas.UserCreate):
+def validate_user_data(user: schemas.UserCreate):
     # Additional validation for empty strings
     if not user.password.strip():
         raise HTTPException(
@@ -29,7 +281,21 @@ def create_user(db: Session, user: schemas.UserCreate):
             detail="Full name cannot be empty"
         )
 
-    hashed_password = pwd_context.hash(user.password)
+
+def bump_token_version(db: Session, user_id: int):
+    user = get_user(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.token_version += 1
+    db.commit()
+    return user
+
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    validate_user_data(user)
+
+    if hashed_password is None:
+        hashed_password = password_hasher.hash(user.password)
     db_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
@@ -41,7 +307,71 @@ def create_user(db: Session, user: schemas.UserCreate):
     return db_user
 
 
-def get_expenses(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+def date_bounds(filters: schemas.ExpenseFilter):
+    """``(start, end, end_exclusive)`` datetimes of a filter's date window.
+
+    A date-only end_date covers that whole day, so it becomes the next
+    midnight and is compared exclusively.
+    """
+    start, end = filters.start_date, filters.end_date
+    if start is not None and not isinstance(start, datetime):
+        start = datetime.combine(start, time.min)
+    end_exclusive = end is not None and not isinstance(end, datetime)
+    if end_exclusive:
+        end = datetime.combine(end + timedelta(days=1), time.min)
+    if start is not None and end is not None and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start_date must not be after end_date"
+        )
+    return start, end, end_exclusive
+
+
+def filter_expenses(query, model, filters: Optional[schemas.ExpenseFilter]):
+    """Apply ExpenseFilter to a Query or select() over ``model`` (Expense or GroupExpense)"""
+    if filters is None:
+        return query
+    start, end, end_exclusive = date_bounds(filters)
+    if (filters.min_amount is not None and filters.max_amount is not None
+            and filters.min_amount > filters.max_amount):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="min_amount must not be greater than max_amount"
+        )
+
+    # Date bounds stay on the (owner, date) composite index
+    if start is not None:
+        query = query.filter(model.date >= start)
+    if end is not None:
+        query = query.filter(model.date < end if end_exclusive else model.date <= end)
+    if filters.categories:
+        query = query.filter(model.category.in_(filters.categories))
+    if filters.payment_method is not None:
+        if not hasattr(model, "payment_method"):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="payment_method does not apply to group expenses"
+            )
+        query = query.filter(model.payment_method == filters.payment_method)
+    if filters.min_amount is not None:
+        query = query.filter(model.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.filter(model.amount <= filters.max_amount)
+    if filters.search:
+        escaped = filters.search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(model.description.ilike(f"%{escaped}%", escape="\\"))
+    return query
+
+
+def get_expenses(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[schemas.ExpenseFilter] = None,
+    columns: Optional[list] = None
+):
+    """The user's expenses by id; rows of ``columns`` instead of ORM objects if given"""
     # Validate skip and limit parameters
     if skip < 0:
         raise HTTPException(
@@ -54,13 +384,193 @@ def get_expenses(db: Session, user_id: int, skip: int = 0, limit: int = 100):
             detail="Limit value cannot be negative"
         )
 
-    return db.query(models.Expense)\
-             .filter(models.Expense.user_id == user_id)\
+    query = db.query(*(columns or [models.Expense])).filter(models.Expense.user_id == user_id)
+    return filter_expenses(query, models.Expense, filters)\
+             .order_by(models.Expense.id)\
              .offset(skip)\
              .limit(limit)\
              .all()
 
 
+def get_expenses_page(
+    db: Session,
+    user_id: int,
+    cursor: str = "",
+    limit: int = 100,
+    filters: Optional[schemas.ExpenseFilter] = None,
+    columns: Optional[list] = None
+):
+    """Keyset page ordered by (date, id); seeks through ix_expenses_user_id_date.
+
+    ``columns`` (which must include date and id) selects plain rows.
+    """
+    if limit < 0:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Limit value cannot be negative"
+        )
+    position = decode_cursor(cursor)
+
+    query = db.query(*(columns or [models.Expense])).filter(models.Expense.user_id == user_id)
+    query = filter_expenses(query, models.Expense, filters)
+    if position is not None:
+        query = query.filter(tuple_(models.Expense.date, models.Expense.id) > position)
+    # One extra row tells whether another page follows
+    items = query.order_by(models.Expense.date, models.Expense.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        if items:
+            next_cursor = encode_cursor(items[-1].date, items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def rollup_statistics_statement(rollup: rollups.Rollup, owner_id: int,
+                                filters: Optional[schemas.ExpenseFilter]):
+    """Per-category select() over ``rollup`` buckets, or None if the filters need the expenses.
+
+    Buckets can answer category filters and date windows that start and end
+    on bucket boundaries (whole days, or whole months for groups).
+    """
+    start = end = None
+    if filters is not None:
+        if (filters.payment_method is not None or filters.min_amount is not None
+                or filters.max_amount is not None or filters.search
+                or rollups.UNCATEGORIZED in (filters.categories or [])):
+            return None
+        start, end, end_exclusive = date_bounds(filters)
+        for bound in (start, end):
+            if bound is not None and (bound.time() != time.min or rollup.bucket_of(bound) != bound.date()):
+                return None
+        if end is not None and not end_exclusive:
+            return None
+
+    model = rollup.model
+    bucket = getattr(model, rollup.bucket)
+    statement = select(
+        model.category,
+        func.sum(model.total),
+        func.sum(model.count),
+        func.max(model.max_amount)
+    ).where(getattr(model, rollup.owner) == owner_id)
+    if start is not None:
+        statement = statement.where(bucket >= start.date())
+    if end is not None:
+        statement = statement.where(bucket < end.date())
+    if filters is not None and filters.categories:
+        statement = statement.where(model.category.in_(filters.categories))
+    return statement.group_by(model.category)
+
+
+def category_statistics(db: Session, rollup: rollups.Rollup, owner_id: int,
+                        filters: Optional[schemas.ExpenseFilter] = None) -> dict:
+    """Total, count, average and maximum per category and overall.
+
+    Reads one row per rollup bucket when the filters allow it, otherwise
+    groups the matching expenses in SQL, through the (owner, date) index
+    when the filters bound the date. The overall figures are folded from
+    the per-category rows.
+    """
+    statement = rollup_statistics_statement(rollup, owner_id, filters)
+    if statement is None:
+        source = rollup.source
+        category = func.coalesce(source.category, rollups.UNCATEGORIZED)
+        statement = select(
+            category,
+            func.sum(source.amount),
+            func.count(source.id),
+            func.max(source.amount)
+        ).where(getattr(source, rollup.owner) == owner_id)
+        statement = filter_expenses(statement, source, filters).group_by(category)
+
+    categories = {}
+    for name, total, count, maximum in db.execute(statement):
+        categories[name] = {"total": total, "count": count, "average": total / count, "max": maximum}
+    total = sum(stats["total"] for stats in categories.values())
+    count = sum(stats["count"] for stats in categories.values())
+    return {
+        "total": total,
+        "count": count,
+        "average": total / count if count else 0.0,
+        "max": max((stats["max"] for stats in categories.values()), default=0.0),
+        "categories": categories,
+    }
+
+
+def get_category_statistics(db: Session, user_id: int, filters: Optional[schemas.ExpenseFilter] = None):
+    """Statistics of the user's personal expenses, from daily rollups where possible"""
+    return category_statistics(db, rollups.DAILY, user_id, filters)
+
+
+def aggregate_expenses(db: Session, user_id: int, dimensions: list, measures: list,
+                       filters: Optional[schemas.ExpenseFilter] = None, pivot: bool = False) -> dict:
+    """Report over the user's expenses and their shares of group expenses"""
+    return reports.aggregate(report_columns(db, user_id, dimensions, filters), dimensions, measures, pivot)
+
+
+def report_columns(db: Session, user_id: int, dimensions: list,
+                   filters: Optional[schemas.ExpenseFilter] = None) -> dict:
+    """Columns reports.aggregate needs for ``dimensions``, personal and shared rows together.
+
+    Only the columns the dimensions need are fetched, as plain tuples
+    through Core; dates come back as stored text on SQLite, which NumPy
+    parses far faster than datetime objects. Amount filters apply to the share of a
+    group expense, and a payment_method filter leaves group expenses out.
+    """
+    filters = filters or schemas.ExpenseFilter()
+    wanted = ["amount"]
+    if reports.DATE_DIMENSIONS & set(dimensions):
+        wanted.append("date")
+    for dimension, column in (("category", "category"), ("payment_method", "payment_method"), ("group", "group_id")):
+        if dimension in dimensions:
+            wanted.append(column)
+
+    def fetch(statement, names):
+        # Core execution on the session's connection skips ORM result handling
+        rows = db.connection().execute(statement).all()
+        fetched = dict(zip(names, zip(*rows))) if rows else {name: () for name in names}
+        return {name: fetched.get(name, (None,) * len(rows)) for name in wanted}
+
+    personal = {
+        "amount": models.Expense.amount,
+        "date": type_coerce(models.Expense.date, String),
+        "category": func.coalesce(models.Expense.category, rollups.UNCATEGORIZED),
+        "payment_method": models.Expense.payment_method,
+    }
+    names = [name for name in wanted if name in personal]
+    statement = select(*(personal[name] for name in names)).where(models.Expense.user_id == user_id)
+    columns = fetch(filter_expenses(statement, models.Expense, filters), names)
+    if filters.payment_method is not None:
+        return columns
+
+    share = models.ExpenseSplit.amount
+    shared = {
+        "amount": share,
+        "date": type_coerce(models.GroupExpense.date, String),
+        "category": func.coalesce(models.GroupExpense.category, rollups.UNCATEGORIZED),
+        "group_id": models.GroupExpense.group_id,
+    }
+    names = [name for name in wanted if name in shared]
+    statement = select(*(shared[name] for name in names)).select_from(models.GroupExpense).join(
+        models.ExpenseSplit,
+        and_(models.ExpenseSplit.expense_id == models.GroupExpense.id, models.ExpenseSplit.user_id == user_id)
+    ).where(models.GroupExpense.group_id.in_(
+        select(models.GroupMember.group_id).where(models.GroupMember.user_id == user_id)
+    ))
+    statement = filter_expenses(
+        statement, models.GroupExpense, filters.model_copy(update={"min_amount": None, "max_amount": None})
+    )
+    if filters.min_amount is not None:
+        statement = statement.where(share >= filters.min_amount)
+    if filters.max_amount is not None:
+        statement = statement.where(share <= filters.max_amount)
+    group_columns = fetch(statement, names)
+    for name in wanted:
+        columns[name] = columns[name] + group_columns[name]
+    return columns
+
+
 def validate_expense_data(amount: float, category: str, date: datetime):
     if amount < 0:
         raise HTTPException(
@@ -81,7 +591,7 @@ def validate_expense_data(amount: float, category: str, date: datetime):
     return date
 
 
-def create_expense(db: Session, expense: schemas.ExpenseCreate, user_id: int):
+def validate_expense_create(expense: schemas.ExpenseCreate):
     date = validate_expense_data(expense.amount, expense.category, expense.date)
 
     if not expense.payment_method.strip():
@@ -90,6 +600,28 @@ def create_expense(db: Session, expense: schemas.ExpenseCreate, user_id: int):
             detail="Payment method cannot be empty"
         )
 
+    return date
+
+
+def validate_expense_update(changes: schemas.ExpenseUpdate) -> dict:
+    """Column values for an update, with the same rules as creating"""
+    values = changes.model_dump(exclude_unset=True)
+    if "category" in values and not values["category"].strip():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Category cannot be empty"
+        )
+    if "payment_method" in values and not values["payment_method"].strip():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Payment method cannot be empty"
+        )
+    return values
+
+
+def create_expense(db: Session, expense: schemas.ExpenseCreate, user_id: int):
+    date = validate_expense_create(expense)
+
     db_expense = models.Expense(
         date=date,
         category=expense.category,
@@ -98,12 +630,84 @@ def create_expense(db: Session, expense: schemas.ExpenseCreate, user_id: int):
         payment_method=expense.payment_method,
         user_id=user_id
     )
+    stamp_change(db, db_expense)
     db.add(db_expense)
+    add_to_rollups(db, rollups.DAILY, [(user_id, date, expense.category, expense.amount)])
+    bump_collection_version(db, "expenses", user_id)
     db.commit()
     db.refresh(db_expense)
     return db_expense
 
 
+# Columns whose change moves an expense's rollup figures
+ROLLUP_COLUMNS = {"date", "category", "amount"}
+
+
+def update_expense(db: Session, expense_id: int, user_id: int, values: dict,
+                   version: Optional[int] = None):
+    """Apply ``values`` with one conditional UPDATE ... RETURNING; 409 on a stale ``version``
+
+    A date or category change also returns the row's old bucket from a
+    materialized CTE, which is read before the UPDATE writes the row, so the
+    rollups of both buckets are refreshed without loading the expense first.
+    """
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="No fields to update"
+        )
+    match = (models.Expense.id == expense_id, models.Expense.user_id == user_id)
+    statement = update(models.Expense).where(*match)
+    if version is not None:
+        statement = statement.where(models.Expense.version == version)
+    statement = statement.values(
+        **values,
+        version=models.Expense.version + 1,
+        updated_at=datetime.utcnow()
+    ).returning(models.Expense)
+    moves = {"date", "category"} & values.keys()
+    if moves:
+        old = select(models.Expense.id, models.Expense.date, models.Expense.category).where(
+            *match
+        ).with_for_update().cte("old").prefix_with("MATERIALIZED")
+        statement = statement.where(models.Expense.id.in_(select(old.c.id))).returning(
+            select(old.c.date).scalar_subquery(),
+            select(old.c.category).scalar_subquery()
+        )
+    row = db.execute(statement, execution_options={"synchronize_session": False}).first()
+    if row is None:
+        db.rollback()
+        exists = db.scalar(select(models.Expense.id).where(
+            models.Expense.id == expense_id,
+            models.Expense.user_id == user_id
+        ))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Expense not found")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Expense was modified by another request"
+        )
+    expense = row[0]
+    if ROLLUP_COLUMNS & values.keys():
+        buckets = {rollups.bucket_key(rollups.DAILY, user_id, expense.date, expense.category)}
+        if moves:
+            buckets.add(rollups.bucket_key(rollups.DAILY, user_id, row[1], row[2]))
+        refresh_rollups(db, rollups.DAILY, buckets)
+    # The sync position is taken once the row is updated; the counter stays
+    # locked until commit, so commits still land in sequence order
+    seq = next_sequence(db)
+    db.execute(
+        update(models.Expense).where(models.Expense.id == expense_id).values(seq=seq),
+        execution_options={"synchronize_session": False}
+    )
+    bump_collection_version(db, "expenses", user_id)
+    # Keep the returned values instead of reloading them after the commit
+    db.expunge(expense)
+    expense.seq = seq
+    db.commit()
+    return expense
+
+
 def delete_expense(db: Session, expense_id: int, user_id: int):
     expense = db.query(models.Expense)\
                 .filter(models.Expense.id == expense_id)\
@@ -111,16 +715,74 @@ def delete_expense(db: Session, expense_id: int, user_id: int):
                 .first()
     if expense:
         db.delete(expense)
+        refresh_rollups(db, rollups.DAILY, [
+            rollups.bucket_key(rollups.DAILY, user_id, expense.date, expense.category)
+        ])
+        add_tombstone(db, "expense", expense.id, user_id=user_id)
+        bump_collection_version(db, "expenses", user_id)
         db.commit()
     return expense
 
 
+def delete_expenses(db: Session, user_id: int, ids: Optional[list[int]] = None,
+                    filters: Optional[schemas.ExpenseFilter] = None) -> int:
+    """Delete the user's expenses matching ``ids`` and/or listing filters in chunks; return the count"""
+    criteria = filters.model_dump().values() if filters is not None else ()
+    if ids is None and not any(value not in (None, "", []) for value in criteria):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Pass ids or at least one filter"
+        )
+    size = batch.BULK_DELETE_CHUNK_SIZE
+    id_chunks = None
+    if ids is not None:
+        ordered = sorted(set(ids))
+        id_chunks = iter([ordered[i:i + size] for i in range(0, len(ordered), size)])
+
+    deleted = 0
+    while True:
+        candidates = filter_expenses(
+            select(models.Expense.id).where(models.Expense.user_id == user_id),
+            models.Expense,
+            filters
+        )
+        if id_chunks is not None:
+            chunk = next(id_chunks, None)
+            if chunk is None:
+                break
+            candidates = candidates.where(models.Expense.id.in_(chunk))
+        else:
+            candidates = candidates.order_by(models.Expense.id).limit(size)
+        removed = db.execute(
+            delete(models.Expense)
+            .where(models.Expense.id.in_(candidates.scalar_subquery()))
+            .returning(models.Expense.id, models.Expense.date, models.Expense.category),
+            execution_options={"synchronize_session": False}
+        ).all()
+        if removed:
+            first = next_sequence(db, len(removed)) - len(removed) + 1
+            db.execute(insert(models.Tombstone), [
+                {"seq": first + offset, "entity": "expense", "entity_id": row.id, "user_id": user_id}
+                for offset, row in enumerate(removed)
+            ])
+            refresh_rollups(db, rollups.DAILY, {
+                rollups.bucket_key(rollups.DAILY, user_id, row.date, row.category) for row in removed
+            })
+            bump_collection_version(db, "expenses", user_id)
+        db.commit()
+        deleted += len(removed)
+        if id_chunks is None and len(removed) < size:
+            break
+    return deleted
+
+
 def create_group(db: Session, name: str, user_id: int):
     group = models.Group(name=name, created_by=user_id)
-    member = models.GroupMember(user_id=user_id)
+    member = models.GroupMember(user_id=user_id, seq=next_sequence(db))
     group.members.append(member)
 
     db.add(group)
+    bump_collection_version(db, "groups", user_id)
     db.commit()
     db.refresh(group)
     return group
@@ -134,8 +796,11 @@ def join_group(db: Session, group_id: int, user_id: int):
     if any(member.user_id == user_id for member in group.members):
         raise HTTPException(status_code=400, detail="Already a member")
 
-    member = models.GroupMember(user_id=user_id, group_id=group.id)
+    member = models.GroupMember(user_id=user_id, group_id=group.id, seq=next_sequence(db))
     db.add(member)
+    bump_collection_version(db, "groups", user_id)
+    # Balances list every member
+    bump_collection_version(db, "group_expenses", group.id)
     db.commit()
     return member
 
@@ -193,12 +858,75 @@ def create_group_expense(db: Session, group_id: int, expense: schemas.GroupExpen
             )
             db_expense.splits.append(split)
 
+    stamp_change(db, db_expense)
     db.add(db_expense)
+    db.flush()
+    add_to_rollups(db, rollups.MONTHLY_GROUP, [(group.id, date, expense.category, expense.amount)])
+    record_balance_changes(db, group.id, db_expense.id, balances.expense_changes(
+        paid_by, [(split.user_id, split.amount) for split in db_expense.splits]
+    ))
+    bump_collection_version(db, "group_expenses", group.id)
     db.commit()
     db.refresh(db_expense)
     return db_expense
 
 
+def check_group_member(db: Session, group_id: int, user_id: int):
+    """Raise 404 for a missing group and 403 for a non-member"""
+    group = db.query(models.Group.id).filter(models.Group.id == group_id).first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    is_member = db.query(models.GroupMember.id).filter(
+        models.GroupMember.group_id == group_id,
+        models.GroupMember.user_id == user_id
+    ).first()
+    if not is_member:
+        raise HTTPException(status_code=403, detail="Not a member of this group")
+
+
+def get_group_category_statistics(db: Session, group_id: int, user_id: int,
+                                  filters: Optional[schemas.ExpenseFilter] = None):
+    """Statistics of a group's expenses, from monthly rollups where possible"""
+    check_group_member(db, group_id, user_id)
+    return category_statistics(db, rollups.MONTHLY_GROUP, group_id, filters)
+
+
+def get_group_balances(db: Session, group_id: int, user_id: int, as_of: Optional[datetime] = None) -> list:
+    """Net position of every member, what they paid minus what they owe, now or ``as_of`` (UTC)"""
+    check_group_member(db, group_id, user_id)
+    members = db.query(models.User.id, models.User.full_name)\
+        .join(models.GroupMember)\
+        .filter(models.GroupMember.group_id == group_id)
+    if as_of is None:
+        totals = {member: total for (_, member), total in balances.stored_totals(db, group_id).items()}
+    else:
+        if as_of.tzinfo is not None:
+            as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+        members = members.filter(models.GroupMember.joined_at <= as_of)
+        totals = balances.totals_at(db, group_id, balances.position_at(db, group_id, as_of))
+    result = {id: {"user_id": id, "full_name": full_name, "paid": 0.0, "owed": 0.0} for id, full_name in members}
+    for member, (paid, owed) in totals.items():
+        balance = result.setdefault(member, {"user_id": member, "full_name": None, "paid": 0.0, "owed": 0.0})
+        balance["paid"], balance["owed"] = paid, owed
+    for balance in result.values():
+        balance["net"] = round(balance["paid"] - balance["owed"], 2)
+        balance["paid"] = round(balance["paid"], 2)
+        balance["owed"] = round(balance["owed"], 2)
+    return sorted(result.values(), key=lambda balance: balance["user_id"])
+
+
+def get_settlement_plan(db: Session, group_id: int, user_id: int) -> dict:
+    """Transfers that settle every unsettled balance in the group"""
+    return settlement.plan(get_group_balances(db, group_id, user_id))
+
+
+def get_group_expenses_version(db: Session, group_id: int, user_id: int) -> int:
+    """Version of a group's expense list, after the same checks as listing it"""
+    check_group_member(db, group_id, user_id)
+    return get_collection_version(db, "group_expenses", group_id)
+
+
 def get_group_expenses(
     db: Session,
     group_id: int,
@@ -230,8 +958,54 @@ def get_group_expenses(
 
     expenses = db.query(models.GroupExpense).filter(
         models.GroupExpense.group_id == group.id
-    ).offset(skip).limit(limit).all()
+    ).order_by(models.GroupExpense.id).offset(skip).limit(limit).all()
+
+    return annotate_user_share(expenses, user_id)
+
+
+def get_group_expense_rows(
+    db: Session,
+    group_id: int,
+    user_id: int,
+    columns: list,
+    split_columns: list,
+    skip: int = 0,
+    limit: int = 100
+):
+    """Same page as get_group_expenses as plain rows: ``(expenses, splits)``.
+
+    ``columns`` must start with the expense id; the splits of the page are
+    read with one more query instead of a lazy load per expense.
+    """
+    if skip < 0:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Skip value cannot be negative"
+        )
+    if limit < 0:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Limit value cannot be negative"
+        )
+    check_group_member(db, group_id, user_id)
 
+    expenses = db.execute(
+        select(*columns)
+        .where(models.GroupExpense.group_id == group_id)
+        .order_by(models.GroupExpense.id)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    splits = db.execute(
+        select(*split_columns)
+        .where(models.ExpenseSplit.expense_id.in_([expense[0] for expense in expenses]))
+        .order_by(models.ExpenseSplit.id)
+    ).all() if expenses else []
+    return expenses, splits
+
+
+def annotate_user_share(expenses, user_id: int):
+    """Set the caller-specific fields of schemas.GroupExpense"""
     for expense in expenses:
         expense.user_split = next(
             (split.amount for split in expense.splits if split.user_id == user_id),
@@ -266,11 +1040,24 @@ def delete_group_expense(
             detail="Only expense creator or group admin can delete expenses"
         )
 
+    unsettled = db.execute(
+        select(models.ExpenseSplit.user_id, models.ExpenseSplit.amount)
+        .where(models.ExpenseSplit.expense_id == expense_id, models.ExpenseSplit.paid.isnot(True))
+    ).all()
     db.query(models.ExpenseSplit).filter(
         models.ExpenseSplit.expense_id == expense_id
     ).delete()
 
     db.delete(expense)
+    refresh_rollups(db, rollups.MONTHLY_GROUP, [
+        rollups.bucket_key(rollups.MONTHLY_GROUP, group.id, expense.date, expense.category)
+    ])
+    changes = balances.expense_changes(expense.paid_by, unsettled)
+    record_balance_changes(db, group.id, expense_id, {
+        user_id: [-paid, -owed] for user_id, (paid, owed) in changes.items()
+    })
+    add_tombstone(db, "group_expense", expense_id, group_id=group.id)
+    bump_collection_version(db, "group_expenses", group.id)
     db.commit()
 
     return {"message": "Expense deleted successfully"}
@@ -283,6 +1070,13 @@ def get_user_groups(db: Session, user_id: int, skip: int = 0, limit: int = 100):
     return member_groups
 
 
+def search_groups(db: Session, name: str, skip: int = 0, limit: int = 100):
+    """Search for groups by name (case-insensitive partial match)"""
+    return db.query(models.Group).filter(
+        models.Group.name.ilike(f"%{name}%")
+    ).offset(skip).limit(limit).all()
+
+
 def get_group_members(db: Session, group_id: int, current_user: models.User):
     # First check if the group exists
     group = db.query(models.Group).filter(models.Group.id == group_id).first()
@@ -308,3 +1102,407 @@ def get_group_members(db: Session, group_id: int, current_user: models.User):
         .all()
 
     return members
+
+
+def _search_hit(row, score: Optional[float] = None) -> dict:
+    group_id = getattr(row, "group_id", None)
+    return {
+        "entity": "expense" if group_id is None else "group_expense",
+        "id": row.id,
+        "group_id": group_id,
+        "date": row.date,
+        "category": row.category,
+        "amount": row.amount,
+        "description": row.description,
+        "score": score,
+    }
+
+
+def _search_like(db: Session, user_id: int, group_ids: list, terms: list, skip: int, limit: int):
+    """Newest-first fallback for databases without the FTS5 index"""
+    def matching(model, owner):
+        query = db.query(model).filter(owner)
+        for term in terms:
+            # Word terms can contain "_", a LIKE wildcard
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            query = query.filter(or_(
+                model.description.ilike(pattern, escape="\\"), model.category.ilike(pattern, escape="\\")
+            ))
+        return query.order_by(model.date.desc(), model.id.desc()).limit(skip + limit).all()
+
+    rows = matching(models.Expense, models.Expense.user_id == user_id)
+    if group_ids:
+        rows += matching(models.GroupExpense, models.GroupExpense.group_id.in_(group_ids))
+    rows.sort(key=lambda row: (row.date, row.id), reverse=True)
+    return [_search_hit(row) for row in rows[skip:skip + limit]]
+
+
+def search_expenses(db: Session, user_id: int, query: str, skip: int = 0, limit: int = 20):
+    """Ranked matches of ``query`` in the user's and their groups' expenses.
+
+    On SQLite the FTS5 index ranks and pages the matches, already limited
+    to the caller's scopes, and only that page is loaded from the expense
+    tables, where ownership is checked again.
+    """
+    if skip < 0:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Skip value cannot be negative"
+        )
+    if not 1 <= limit <= 100:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Limit must be between 1 and 100"
+        )
+    terms = search.search_terms(query)
+    group_ids = db.scalars(
+        select(models.GroupMember.group_id).where(models.GroupMember.user_id == user_id)
+    ).all()
+    if db.get_bind().dialect.name != "sqlite":
+        return _search_like(db, user_id, group_ids, terms, skip, limit)
+
+    ranked = db.execute(text(search.SEARCH_QUERY), {
+        "match": search.match_expression(terms, user_id, group_ids),
+        "limit": limit,
+        "skip": skip,
+    }).all()
+    keys = [(search.decode_rowid(rowid), score) for rowid, score in ranked]
+
+    def load(model, ids):
+        # By primary key only: adding the owner makes SQLite pick the owner
+        # index and walk the caller's whole history
+        return {row.id: row for row in db.scalars(select(model).where(model.id.in_(ids)))} if ids else {}
+
+    personal = load(models.Expense, [expense_id for (is_shared, expense_id), _ in keys if not is_shared])
+    shared = load(models.GroupExpense, [expense_id for (is_shared, expense_id), _ in keys if is_shared])
+    hits = []
+    for (is_shared, expense_id), score in keys:
+        if is_shared:
+            row = shared.get(expense_id)
+            visible = row is not None and row.group_id in group_ids
+        else:
+            row = personal.get(expense_id)
+            visible = row is not None and row.user_id == user_id
+        if visible:
+            hits.append(_search_hit(row, score))
+    return hits
+
+
+def get_changes(db: Session, user_id: int, since: int = 0, limit: int = 500):
+    """Changes after ``since`` to the user's expenses and their groups' expenses"""
+    if since < 0:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="since cannot be negative"
+        )
+    if not 1 <= limit <= 1000:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Limit must be between 1 and 1000"
+        )
+
+    group_ids = select(models.GroupMember.group_id).where(models.GroupMember.user_id == user_id)
+    # Each source is read in seq order up to one row past the page, then merged
+    fetch = limit + 1
+    expenses = db.query(models.Expense).filter(
+        models.Expense.user_id == user_id,
+        models.Expense.seq > since
+    ).order_by(models.Expense.seq).limit(fetch).all()
+    group_expenses = db.query(models.GroupExpense).options(
+        selectinload(models.GroupExpense.splits)
+    ).filter(
+        models.GroupExpense.group_id.in_(group_ids),
+        models.GroupExpense.seq > since
+    ).order_by(models.GroupExpense.seq).limit(fetch).all()
+    tombstones = db.query(models.Tombstone).filter(
+        or_(
+            and_(models.Tombstone.user_id == user_id, models.Tombstone.group_id.is_(None)),
+            models.Tombstone.group_id.in_(group_ids)
+        ),
+        models.Tombstone.seq > since
+    ).order_by(models.Tombstone.seq).limit(fetch).all()
+    joins = db.query(models.GroupMember).filter(
+        models.GroupMember.user_id == user_id,
+        models.GroupMember.seq > since
+    ).order_by(models.GroupMember.seq).limit(fetch).all()
+
+    changes = [
+        {"seq": e.seq, "entity": "expense", "op": "upsert", "id": e.id,
+         "updated_at": e.updated_at, "expense": e}
+        for e in expenses
+    ] + [
+        {"seq": e.seq, "entity": "group_expense", "op": "upsert", "id": e.id, "group_id": e.group_id,
+         "updated_at": e.updated_at, "group_expense": e}
+        for e in annotate_user_share(group_expenses, user_id)
+    ] + [
+        {"seq": t.seq, "entity": t.entity, "op": "delete", "id": t.entity_id, "group_id": t.group_id,
+         "updated_at": t.deleted_at}
+        for t in tombstones
+    ] + [
+        # Older expenses of a newly joined group are behind ``since``; clients refetch the group
+        {"seq": m.seq, "entity": "group", "op": "joined", "id": m.group_id, "group_id": m.group_id,
+         "updated_at": m.joined_at}
+        for m in joins
+    ]
+    changes.sort(key=lambda change: change["seq"])
+    page = changes[:limit]
+    return {
+        "changes": page,
+        "next_since": page[-1]["seq"] if page else since,
+        "has_more": len(changes) > limit
+    }
+
+
+def expense_export_statement(user_id: int, filters: Optional[schemas.ExpenseFilter] = None):
+    """All matching expenses in (date, id) order, as plain columns"""
+    statement = select(
+        models.Expense.id,
+        models.Expense.date,
+        models.Expense.category,
+        models.Expense.amount,
+        models.Expense.description,
+        models.Expense.payment_method
+    ).where(models.Expense.user_id == user_id)
+    return filter_expenses(statement, models.Expense, filters)\
+        .order_by(models.Expense.date, models.Expense.id)
+
+
+def group_expense_export_statement(group_id: int, user_id: int,
+                                   filters: Optional[schemas.ExpenseFilter] = None):
+    """A group's matching expenses in (date, id) order with the user's share"""
+    statement = select(
+        models.GroupExpense.id,
+        models.GroupExpense.date,
+        models.GroupExpense.category,
+        models.GroupExpense.amount,
+        models.GroupExpense.description,
+        models.GroupExpense.paid_by,
+        models.ExpenseSplit.amount.label("user_split")
+    ).outerjoin(models.ExpenseSplit, and_(
+        models.ExpenseSplit.expense_id == models.GroupExpense.id,
+        models.ExpenseSplit.user_id == user_id
+    )).where(models.GroupExpense.group_id == group_id)
+    return filter_expenses(statement, models.GroupExpense, filters)\
+        .order_by(models.GroupExpense.date, models.GroupExpense.id)
+
+
+def insert_import_chunk(db: Session, user_id: int, valid: list, report: dict, seen: set):
+    """Insert one chunk of validated import rows in its own transaction.
+
+    Rows whose import key already exists for the user, or repeats earlier
+    in the file (``seen``), are noted in ``report`` as duplicates.
+    """
+    existing = set(db.scalars(select(models.Expense.import_key).where(
+        models.Expense.user_id == user_id,
+        models.Expense.import_key.in_([key for _, _, key in valid])
+    )))
+    new = []
+    for line, expense, key in valid:
+        if key in existing or key in seen:
+            importers.note(report, line, "duplicate")
+            continue
+        seen.add(key)
+        new.append((line, expense, key))
+    if not new:
+        return
+
+    first = next_sequence(db, len(new)) - len(new) + 1
+    now = datetime.utcnow()
+    statement = insert(models.Expense)
+    conflict_insert = _conflict_insert(db)
+    if conflict_insert is not None:
+        # A concurrent import of the same rows loses quietly instead of failing the chunk
+        statement = conflict_insert(models.Expense).on_conflict_do_nothing()
+    # Only rows actually inserted come back, so rollups skip the ones that lost
+    inserted = db.execute(statement.returning(
+        models.Expense.user_id, models.Expense.date, models.Expense.category, models.Expense.amount,
+        models.Expense.import_key
+    ), [
+        {
+            "user_id": user_id,
+            "date": expense.date,
+            "category": expense.category,
+            "amount": expense.amount,
+            "description": expense.description,
+            "payment_method": expense.payment_method,
+            "import_key": key,
+            "seq": first + offset,
+            "updated_at": now,
+        }
+        for offset, (_, expense, key) in enumerate(new)
+    ]).all()
+    add_to_rollups(db, rollups.DAILY, [row[:4] for row in inserted])
+    bump_collection_version(db, "expenses", user_id)
+    db.commit()
+    report["imported"] += len(inserted)
+    stored = {row.import_key for row in inserted}
+    for line, _, key in new:
+        if key not in stored:
+            importers.note(report, line, "duplicate")
+
+
+def import_expenses(db: Session, user_id: int, rows) -> dict:
+    """Insert parsed statement rows in chunked transactions and report per row.
+
+    ``rows`` yields ``(line, row, error)`` as produced by ``importers``.
+    """
+    report = importers.new_report()
+    occurrences, seen = Counter(), set()
+    rows = iter(rows)
+    while True:
+        valid = importers.next_chunk(rows, report, occurrences)
+        if valid is None:
+            break
+        insert_import_chunk(db, user_id, valid, report, seen)
+    report["rows"].sort(key=lambda entry: entry["row"])
+    return report
+
+
+def apply_expense_batch(db: Session, user_id: int, operations: list) -> dict:
+    """Validate and apply create/update/delete operations in one transaction.
+
+    Operations are checked in order against the user's expenses; failing
+    ones are reported and skipped while the rest are applied with one bulk
+    statement per kind and a single commit. Several updates of one expense
+    are merged, and an update followed by a delete only deletes.
+    """
+    if len(operations) > batch.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch can hold at most {batch.BATCH_MAX_OPERATIONS} operations"
+        )
+    valid, failed = batch.validate_many(batch.expense_operations, operations)
+    results = {
+        index: {"index": index, "status": "error", "detail": message}
+        for index, message in failed.items()
+    }
+
+    ids = {operation.id for _, operation in valid if operation.op != "create"}
+    # Lock the rows before the sync counter, in the order update_expense
+    # takes them. SQLite has no row locks, so the counter's write lock comes
+    # first there to keep other writers out between the check and the write.
+    row_locks = db.get_bind().dialect.name != "sqlite"
+    first_seq = next_sequence(db) if ids and not row_locks else None
+    current = db.execute(select(
+        models.Expense.id, models.Expense.version, models.Expense.date, models.Expense.category
+    ).where(
+        models.Expense.user_id == user_id,
+        models.Expense.id.in_(ids)
+    ).order_by(models.Expense.id).with_for_update()).all() if ids else []
+    versions = {row.id: row.version for row in current}
+    stored = {row.id: row for row in current}
+    creates, updates, bumps, deletes = [], {}, {}, []
+    for index, operation in valid:
+        try:
+            if operation.op == "create":
+                validate_expense_create(operation.expense)
+                creates.append((index, operation))
+                continue
+            if operation.id not in versions:
+                raise HTTPException(status_code=404, detail="Expense not found")
+            if operation.op == "update":
+                if operation.version is not None and operation.version != versions[operation.id]:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Expense was modified by another request"
+                    )
+                updates.setdefault(operation.id, {}).update(validate_expense_update(operation.changes))
+                bumps[operation.id] = bumps.get(operation.id, 0) + 1
+                versions[operation.id] += 1
+                results[index] = {
+                    "index": index, "status": "updated", "id": operation.id, "version": versions[operation.id]
+                }
+            else:
+                del versions[operation.id]
+                updates.pop(operation.id, None)
+                deletes.append(operation.id)
+                results[index] = {"index": index, "status": "deleted", "id": operation.id}
+        except HTTPException as exc:
+            results[index] = {"index": index, "status": "error", "detail": exc.detail}
+
+    changed = len(creates) + len(updates) + len(deletes)
+    if not changed:
+        db.rollback()
+    else:
+        if first_seq is None:
+            first_seq = next_sequence(db, changed) - changed + 1
+        elif changed > 1:
+            next_sequence(db, changed - 1)
+        sequence = count(first_seq)
+        now = datetime.utcnow()
+        if creates:
+            created_ids = db.scalars(
+                insert(models.Expense).returning(models.Expense.id, sort_by_parameter_order=True),
+                [
+                    {
+                        **operation.expense.model_dump(),
+                        "user_id": user_id,
+                        "seq": next(sequence),
+                        "updated_at": now,
+                    }
+                    for _, operation in creates
+                ]
+            ).all()
+            add_to_rollups(db, rollups.DAILY, [
+                (user_id, operation.expense.date, operation.expense.category, operation.expense.amount)
+                for _, operation in creates
+            ])
+            for (index, operation), expense_id in zip(creates, created_ids):
+                results[index] = {
+                    "index": index, "status": "created", "id": expense_id,
+                    "client_id": operation.client_id, "version": 1
+                }
+        if updates:
+            # One executemany UPDATE per set of changed columns
+            by_columns = {}
+            for expense_id, values in updates.items():
+                by_columns.setdefault(tuple(sorted(values)), []).append({
+                    "b_id": expense_id,
+                    "b_bump": bumps[expense_id],
+                    "b_seq": next(sequence),
+                    **{f"b_{column}": value for column, value in values.items()},
+                })
+            table = models.Expense.__table__
+            for columns, rows in by_columns.items():
+                db.execute(
+                    update(table).where(
+                        table.c.id == bindparam("b_id"), table.c.user_id == user_id
+                    ).values({
+                        **{column: bindparam(f"b_{column}") for column in columns},
+                        "version": table.c.version + bindparam("b_bump"),
+                        "seq": bindparam("b_seq"),
+                        "updated_at": now,
+                    }),
+                    rows
+                )
+        if deletes:
+            db.execute(
+                delete(models.Expense).where(
+                    models.Expense.user_id == user_id,
+                    models.Expense.id.in_(deletes)
+                ),
+                execution_options={"synchronize_session": False}
+            )
+            db.execute(insert(models.Tombstone), [
+                {"seq": next(sequence), "entity": "expense", "entity_id": expense_id, "user_id": user_id}
+                for expense_id in deletes
+            ])
+        touched = set()
+        for expense_id, values in updates.items():
+            if ROLLUP_COLUMNS & values.keys():
+                row = stored[expense_id]
+                touched.add(rollups.bucket_key(rollups.DAILY, user_id, row.date, row.category))
+                touched.add(rollups.bucket_key(
+                    rollups.DAILY, user_id, values.get("date", row.date), values.get("category", row.category)
+                ))
+        for expense_id in deletes:
+            row = stored[expense_id]
+            touched.add(rollups.bucket_key(rollups.DAILY, user_id, row.date, row.category))
+        refresh_rollups(db, rollups.DAILY, touched)
+        bump_collection_version(db, "expenses", user_id)
+        db.commit()
+
+    ordered = [results[index] for index in range(len(operations))]
+    failures = sum(1 for result in ordered if result["status"] == "error")
+    return {"results": ordered, "applied": len(ordered) - failures, "failed": failures}
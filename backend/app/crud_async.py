@@ -0,0 +1,119 @@
+"""Awaitable counterparts of the functions in crud.py.
+
+Each wrapper runs the synchronous crud function either on an AsyncSession
+(through ``run_sync``, so all I/O goes through aiosqlite) or, for a plain
+Session, in the threadpool. Relationships the response models read are
+loaded before returning, so serialization never triggers lazy I/O on the
+event loop.
+
+``run_sync`` runs the crud body on the event loop's thread, so it only
+carries statement-level work. Functions with CPU-heavy Python (reports,
+settlement plans, import parsing) fetch through ``run_sync`` and compute in
+the threadpool.
+"""
+import functools
+from collections import Counter
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud, importers, reports, schemas, settlement
+from .hashing import password_hasher
+
+
+async def run(db, fn, *args, **kwargs):
+    """Run ``fn(session, *args, **kwargs)`` without blocking the event loop"""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def _preload(result, attributes):
+    items = result if isinstance(result, list) else [result]
+    for item in items:
+        if item is None:
+            continue
+        for attribute in attributes:
+            getattr(item, attribute)
+
+
+def _async(fn, *preload):
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        def call(sync_db):
+            result = fn(sync_db, *args, **kwargs)
+            _preload(result, preload)
+            return result
+        return await run(db, call)
+    return wrapper
+
+
+get_collection_version = _async(crud.get_collection_version)
+get_group_expenses_version = _async(crud.get_group_expenses_version)
+check_group_member = _async(crud.check_group_member)
+get_user = _async(crud.get_user)
+get_token_version = _async(crud.get_token_version)
+get_user_by_email = _async(crud.get_user_by_email)
+bump_token_version = _async(crud.bump_token_version)
+get_expenses = _async(crud.get_expenses)
+get_expenses_page = _async(crud.get_expenses_page)
+search_expenses = _async(crud.search_expenses)
+get_category_statistics = _async(crud.get_category_statistics)
+apply_expense_batch = _async(crud.apply_expense_batch)
+create_expense = _async(crud.create_expense)
+update_expense = _async(crud.update_expense)
+delete_expense = _async(crud.delete_expense)
+delete_expenses = _async(crud.delete_expenses)
+create_group = _async(crud.create_group)
+join_group = _async(crud.join_group)
+create_group_expense = _async(crud.create_group_expense, "splits")
+get_group_expenses = _async(crud.get_group_expenses, "splits")
+get_group_expense_rows = _async(crud.get_group_expense_rows)
+get_group_category_statistics = _async(crud.get_group_category_statistics)
+get_group_balances = _async(crud.get_group_balances)
+delete_group_expense = _async(crud.delete_group_expense)
+get_user_groups = _async(crud.get_user_groups)
+search_groups = _async(crud.search_groups)
+get_group_members = _async(crud.get_group_members)
+get_changes = _async(crud.get_changes)
+
+_create_user = _async(crud.create_user, "expenses")
+
+
+async def create_user(db, user: schemas.UserCreate):
+    # Hash on the worker pool first so bcrypt never runs inside run_sync
+    crud.validate_user_data(user)
+    hashed_password = await password_hasher.hash_async(user.password)
+    return await _create_user(db, user, hashed_password=hashed_password)
+
+
+async def aggregate_expenses(db, user_id: int, dimensions: list, measures: list,
+                             filters=None, pivot: bool = False) -> dict:
+    """Fetch the report columns on the session, then aggregate them in the threadpool"""
+    if not isinstance(db, AsyncSession):
+        return await run_in_threadpool(crud.aggregate_expenses, db, user_id, dimensions, measures, filters, pivot)
+    columns = await db.run_sync(crud.report_columns, user_id, dimensions, filters)
+    return await run_in_threadpool(reports.aggregate, columns, dimensions, measures, pivot)
+
+
+async def get_settlement_plan(db, group_id: int, user_id: int) -> dict:
+    """Read the balances on the session, then search for transfers in the threadpool"""
+    if not isinstance(db, AsyncSession):
+        return await run_in_threadpool(crud.get_settlement_plan, db, group_id, user_id)
+    return await run_in_threadpool(settlement.plan, await get_group_balances(db, group_id, user_id))
+
+
+async def import_expenses(db, user_id: int, rows) -> dict:
+    """Parse and validate each chunk in the threadpool; only the inserts use the session"""
+    if not isinstance(db, AsyncSession):
+        return await run_in_threadpool(crud.import_expenses, db, user_id, rows)
+    report = importers.new_report()
+    occurrences, seen = Counter(), set()
+    rows = iter(rows)
+    while True:
+        valid = await run_in_threadpool(importers.next_chunk, rows, report, occurrences)
+        if valid is None:
+            break
+        await db.run_sync(crud.insert_import_chunk, user_id, valid, report, seen)
+    report["rows"].sort(key=lambda entry: entry["row"])
+    return report
@@ -1,24 +1,375 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from dotenv import load_dotenv
+import itertools
+import logging
 import os
+import threading
+
+from . import metrics
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./expenses.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Serve requests from an AsyncSession (aiosqlite) instead of the threadpool.
+# crud_async reaches the session through AsyncSession.run_sync, which runs the
+# synchronous crud body on the event loop's thread; keep those bodies to
+# statement-level work and move CPU-heavy Python to run_in_threadpool.
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Comma-separated read replica URLs; without replicas every read uses the primary
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "20"))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "20"))
+
+# Production profile applied to every SQLite connection; disable to keep SQLite defaults
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() in ("1", "true", "yes")
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    # NORMAL is durable across application crashes in WAL mode
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are in KiB, i.e. 64 MiB of page cache per connection
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+# Startup schema handling: "create" (create_all), "check" (require the Alembic head) or "none"
+DATABASE_SCHEMA_MODE = os.getenv("DATABASE_SCHEMA_MODE", "create").lower()
+# Connections opened at startup so the first requests do not pay for connecting
+DATABASE_POOL_PREWARM = int(os.getenv("DATABASE_POOL_PREWARM", "4"))
+
+SQLITE_CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("SQLITE_CHECKPOINT_INTERVAL_SECONDS", "30"))
+SQLITE_CHECKPOINT_MODE = os.getenv("SQLITE_CHECKPOINT_MODE", "PASSIVE")
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None, pragmas=None):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in (pragmas or SQLITE_PRAGMAS).items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def make_engine(url: str, tuned: bool = SQLITE_TUNING):
+    if not is_sqlite(url):
+        return create_engine(url, pool_size=DATABASE_POOL_SIZE, max_overflow=DATABASE_MAX_OVERFLOW)
+    options = {"connect_args": {"check_same_thread": False}}
+    if ":memory:" not in url and url not in ("sqlite://", "sqlite:///"):
+        options.update(pool_size=DATABASE_POOL_SIZE, max_overflow=DATABASE_MAX_OVERFLOW)
+    new_engine = create_engine(url, **options)
+    if tuned:
+        event.listen(new_engine, "connect", apply_sqlite_pragmas)
+    return new_engine
+
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def async_database_url(url: str) -> str:
+    """Map a sync SQLite URL onto its aiosqlite driver"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    return url
+
+
+def create_async_session_factory(url: str, tuned: bool = SQLITE_TUNING) -> async_sessionmaker:
+    async_engine = create_async_engine(async_database_url(url))
+    if tuned and is_sqlite(url):
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+AsyncSessionLocal = (
+    create_async_session_factory(SQLALCHEMY_DATABASE_URL) if DATABASE_ASYNC else None
+)
+
+
+def check_schema(bind):
+    """Fail fast when the database is not at the latest Alembic revision"""
+    # Alembic is only needed when the check is enabled
+    from alembic.config import Config
+    from alembic.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "migrations"))
+    head = ScriptDirectory.from_config(config).get_current_head()
+    with bind.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}; run 'alembic upgrade head'"
+        )
+
+
+def prewarm_pool(bind, connections: int = DATABASE_POOL_PREWARM):
+    """Open (and return to the pool) up to ``connections`` connections"""
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = bind.connect()
+            opened.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+async def prewarm_async_pool(async_engine, connections: int = DATABASE_POOL_PREWARM):
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = await async_engine.connect()
+            opened.append(connection)
+            await connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
+
+
+# Count of a user's commits, bumped by crud while replicas are configured
+WRITE_POSITION = text("SELECT version FROM collection_versions WHERE scope = 'writes' AND scope_id = :user_id")
+
+
+async def write_position(factory, user_id: int) -> int:
+    """Read the user's ``("writes", user_id)`` counter through a session from ``factory``"""
+    db = factory()
+    try:
+        if isinstance(db, AsyncSession):
+            return (await db.scalar(WRITE_POSITION, {"user_id": user_id})) or 0
+        return (await run_in_threadpool(db.scalar, WRITE_POSITION, {"user_id": user_id})) or 0
+    finally:
+        if isinstance(db, AsyncSession):
+            await db.close()
+        else:
+            await run_in_threadpool(db.close)
+
+
+class SessionRouter:
+    """Routes reads to replicas and writes to the primary.
+
+    Each user's last commit is remembered by the value of their own
+    ``("writes", user_id)`` counter; their reads go to a replica only once
+    its copy of that counter has reached it, otherwise to the primary.
+    """
+
+    def __init__(self, primary, replicas):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self._last_writes: dict[int, int] = {}
+        # Highest position of each user seen on each replica; replicas only move forward
+        self._applied: list[dict[int, int]] = [{} for _ in self.replicas]
+        self._round_robin = itertools.count()
+        self._lock = threading.Lock()
+
+    def mark_write(self, user_id: int, position: int):
+        if not self.replicas:
+            return
+        with self._lock:
+            if position > self._last_writes.get(user_id, 0):
+                self._last_writes[user_id] = position
+            if len(self._last_writes) > 10000:
+                # Users whose last write every replica has can read anywhere again
+                for key, last in list(self._last_writes.items()):
+                    if all(applied.get(key, 0) >= last for applied in self._applied):
+                        del self._last_writes[key]
+                        for applied in self._applied:
+                            applied.pop(key, None)
+
+    def last_write(self, user_id: int) -> int:
+        return self._last_writes.get(user_id, 0)
+
+    async def reader(self, user_id=None):
+        """Return the session factory a read for ``user_id`` should use"""
+        if not self.replicas:
+            self.primary_reads += 1
+            return self.primary
+        index = next(self._round_robin) % len(self.replicas)
+        needed = self.last_write(user_id) if user_id is not None else 0
+        applied = self._applied[index]
+        if needed and applied.get(user_id, 0) < needed:
+            position = await write_position(self.replicas[index], user_id)
+            with self._lock:
+                applied[user_id] = max(applied.get(user_id, 0), position)
+        if needed and applied[user_id] < needed:
+            self.primary_reads += 1
+            return self.primary
+        self.replica_reads += 1
+        return self.replicas[index]
+
+
+def session_factory(url: str):
+    """Session factory for ``url`` in the configured (sync or async) mode"""
+    if DATABASE_ASYNC:
+        return create_async_session_factory(url)
+    return sessionmaker(autocommit=False, autoflush=False, bind=make_engine(url))
+
+
+session_router = SessionRouter(
+    AsyncSessionLocal if DATABASE_ASYNC else SessionLocal,
+    [session_factory(url) for url in DATABASE_REPLICA_URLS]
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _route_reads_to_primary(session):
+    # get_current_user tags the request session with the user it acts for;
+    # crud records the write position the commit took
+    position = session.info.pop("write_position", None)
+    user_id = session.info.get("user_id")
+    if user_id is not None and position is not None:
+        session_router.mark_write(user_id, position)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_position(session):
+    session.info.pop("write_position", None)
+
+
+@metrics.register
+def _session_router_metrics():
+    return [
+        ("database_primary_reads_total", "counter",
+         "Read sessions served by the primary", session_router.primary_reads),
+        ("database_replica_reads_total", "counter",
+         "Read sessions served by a replica", session_router.replica_reads),
+    ]
+
+
+class WalCheckpointer:
+    """Checkpoints the SQLite WAL from a background thread.
+
+    Keeps the WAL short so readers stay fast, and moves checkpoint work off
+    the commit path of the writer that would otherwise cross the
+    auto-checkpoint threshold.
+    """
+
+    def __init__(
+        self,
+        bind,
+        interval: float = SQLITE_CHECKPOINT_INTERVAL_SECONDS,
+        mode: str = SQLITE_CHECKPOINT_MODE
+    ):
+        self.bind = bind
+        self.interval = interval
+        self.mode = mode
+        self.checkpoints = 0
+        self.busy = 0
+        self.last_wal_frames = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        with self.bind.connect() as connection:
+            busy, wal_frames, _ = connection.exec_driver_sql(
+                f"PRAGMA wal_checkpoint({self.mode})"
+            ).one()
+        self.checkpoints += 1
+        self.busy += busy
+        self.last_wal_frames = wal_frames
+        return wal_frames
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("WAL checkpoint failed")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="wal-checkpoint", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+wal_checkpointer = (
+    WalCheckpointer(engine)
+    if is_sqlite(SQLALCHEMY_DATABASE_URL) and SQLITE_TUNING
+    and SQLITE_PRAGMAS["journal_mode"].upper() == "WAL"
+    else None
+)
+
+
+@metrics.register
+def _wal_checkpoint_metrics():
+    if wal_checkpointer is None:
+        return []
+    return [
+        ("sqlite_wal_checkpoints_total", "counter",
+         "Background WAL checkpoints run", wal_checkpointer.checkpoints),
+        ("sqlite_wal_checkpoints_busy_total", "counter",
+         "Checkpoints that could not complete because of readers", wal_checkpointer.busy),
+        ("sqlite_wal_frames", "gauge",
+         "WAL frames seen by the last checkpoint", wal_checkpointer.last_wal_frames),
+    ]
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency used by the endpoints; crud_async accepts either session type
+get_session = get_async_db if DATABASE_ASYNC else get_db
+
+
+@asynccontextmanager
+async def read_session(user_id=None):
+    db = (await session_router.reader(user_id))()
+    try:
+        yield db
+    finally:
+        if isinstance(db, AsyncSession):
+            await db.close()
+        else:
+            await run_in_threadpool(db.close)
+
+
+async def get_read_session():
+    """Read-only session for endpoints that do not act for a user"""
+    async with read_session() as db:
+        yield db
@@ -0,0 +1,72 @@
+"""Streaming CSV / NDJSON export of expense history.
+
+Rows are read in batches from a streaming cursor on their own read session
+and encoded batch by batch in the threadpool, so memory stays flat however
+long the history is, and the CSV header goes out before the query runs.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import database
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode(rows, columns, format: str) -> bytes:
+    buffer = io.StringIO()
+    if format == "csv":
+        csv.writer(buffer, lineterminator="\n").writerows(
+            [_value(value) for value in row] for row in rows
+        )
+    else:
+        for row in rows:
+            buffer.write(json.dumps(dict(zip(columns, map(_value, row)))))
+            buffer.write("\n")
+    return buffer.getvalue().encode()
+
+
+async def stream_rows(statement, columns, format: str, user_id: int):
+    """Yield encoded chunks of ``statement``'s rows, one batch at a time"""
+    if format == "csv":
+        yield encode([columns], columns, format)
+    statement = statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+    db = (await database.session_router.reader(user_id))()
+    try:
+        if isinstance(db, AsyncSession):
+            result = await db.stream(statement)
+            async for rows in result.partitions():
+                yield await run_in_threadpool(encode, rows, columns, format)
+        else:
+            result = await run_in_threadpool(db.execute, statement)
+            while True:
+                rows = await run_in_threadpool(result.fetchmany, EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                yield await run_in_threadpool(encode, rows, columns, format)
+    finally:
+        if isinstance(db, AsyncSession):
+            await db.close()
+        else:
+            await run_in_threadpool(db.close)
+
+
+def export_response(statement, format: str, user_id: int, filename: str) -> StreamingResponse:
+    columns = [column.name for column in statement.selected_columns]
+    return StreamingResponse(
+        stream_rows(statement, columns, format, user_id),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
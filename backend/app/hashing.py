@@ -0,0 +1,138 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+from fastapi import HTTPException, status
+
+from . import metrics
+
+# "thread" is enough because bcrypt releases the GIL; "process" isolates it fully
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    """The passlib context, built on first use (and once per worker process)"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context().hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context().verify(password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a bounded worker pool.
+
+    At most ``workers + queue_size`` operations are accepted at once; further
+    submissions fail fast with 503 instead of queueing without bound.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        queue_size: int = PASSWORD_HASH_QUEUE_SIZE,
+        executor: str = PASSWORD_HASH_EXECUTOR
+    ):
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.executor_kind = executor
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_seconds_sum = 0.0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers,
+                            thread_name_prefix="password-hash"
+                        )
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        executor = self._get_executor()
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+        started = time.perf_counter()
+
+        def _done(_future):
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.latency_seconds_sum += time.perf_counter() - started
+
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(_done)
+        return future
+
+    def hash(self, password: str) -> str:
+        """Hash from synchronous code, blocking only the calling thread"""
+        return self.submit(_hash, password).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self.submit(_verify, password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(_hash, password))
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self.submit(_verify, password, hashed_password))
+
+    def warm(self):
+        """Build the passlib context and load the bcrypt backend without hashing"""
+        pwd_context().handler("bcrypt").get_backend()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher()
+
+
+@metrics.register
+def _password_hasher_metrics():
+    return [
+        ("password_hash_pending", "gauge",
+         "Hash/verify operations queued or running", password_hasher.pending),
+        ("password_hash_capacity", "gauge",
+         "Operations accepted before rejecting with 503", password_hasher.max_pending),
+        ("password_hash_completed_total", "counter",
+         "Hash/verify operations completed", password_hasher.completed),
+        ("password_hash_rejected_total", "counter",
+         "Operations rejected because the queue was full", password_hasher.rejected),
+        ("password_hash_latency_seconds_sum", "counter",
+         "Total time from submission to completion", password_hasher.latency_seconds_sum),
+    ]
@@ -0,0 +1,240 @@
+"""Incremental parsers for bank statement imports (CSV, OFX, QIF).
+
+Each parser reads a text stream line by line and yields
+``(line_number, row, error)``. ``row`` holds ExpenseCreate fields plus an
+optional ``import_key`` that identifies the transaction at its source;
+``error`` is set instead when the record itself cannot be parsed.
+"""
+import csv
+import hashlib
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, Optional, TextIO, Tuple
+
+from pydantic import TypeAdapter
+
+from . import schemas
+from .batch import validate_many
+
+# Rows validated and inserted per transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "2000"))
+# Per-row entries (errors, duplicates) returned in the report
+IMPORT_REPORT_LIMIT = int(os.getenv("IMPORT_REPORT_LIMIT", "1000"))
+
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+FORMATS = ("csv", "ofx", "qif")
+
+_expense_batch = TypeAdapter(list[schemas.ExpenseCreate])
+
+
+def _normalize_date(value: str) -> str:
+    value = value.strip()
+    # Date-only CSV cells are common; pydantic wants a time for datetime
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", value):
+        return value + "T00:00:00"
+    return value
+
+
+def _amount(value: str) -> float:
+    return float(value.strip().replace(",", ""))
+
+
+def parse_csv(stream: TextIO, category: str, payment_method: str) -> Iterator[ParsedRow]:
+    """Columns as in /expenses/export: date, category, amount, description, payment_method"""
+    reader = csv.DictReader(stream)
+    missing = {"date", "amount"} - set(reader.fieldnames or ())
+    if missing:
+        yield 1, None, f"Missing CSV columns: {', '.join(sorted(missing))}"
+        return
+    for record in reader:
+        yield reader.line_num, {
+            "date": _normalize_date(record["date"] or ""),
+            "category": record.get("category") or category,
+            "amount": record["amount"],
+            "description": record.get("description") or None,
+            "payment_method": record.get("payment_method") or payment_method,
+        }, None
+
+
+def _ofx_date(value: str) -> datetime:
+    # YYYYMMDD[HHMMSS[.XXX]][gmt offset[:tz name]]
+    digits = re.match(r"\d+", value).group()
+    return datetime.strptime(digits[:14].ljust(8, "0"), "%Y%m%d%H%M%S" if len(digits) >= 14 else "%Y%m%d")
+
+
+def parse_ofx(stream: TextIO, category: str, payment_method: str) -> Iterator[ParsedRow]:
+    """Debit STMTTRN records of OFX 1.x (SGML) or 2.x (XML) statements"""
+    account = ""
+    transaction = None
+    start = 0
+    for line_number, line in enumerate(stream, start=1):
+        for closing, tag, value in re.findall(r"<(/?)([A-Za-z0-9.]+)>([^<]*)", line):
+            tag, value = tag.upper(), value.strip()
+            if tag == "STMTTRN" and not closing:
+                transaction, start = {}, line_number
+            elif tag == "STMTTRN" and closing and transaction is not None:
+                yield _ofx_row(start, transaction, account, category, payment_method)
+                transaction = None
+            elif tag == "ACCTID" and not closing:
+                account = value
+            elif transaction is not None and not closing and value:
+                transaction[tag] = value
+
+
+def _ofx_row(line_number: int, record: dict, account: str, category: str, payment_method: str) -> ParsedRow:
+    try:
+        amount = _amount(record["TRNAMT"])
+        date = _ofx_date(record["DTPOSTED"])
+    except (KeyError, ValueError, AttributeError):
+        return line_number, None, "Transaction needs a valid DTPOSTED and TRNAMT"
+    if amount >= 0:
+        return line_number, None, "Credit transactions are not expenses"
+    fitid = record.get("FITID")
+    description = " - ".join(part for part in (record.get("NAME"), record.get("MEMO")) if part)
+    return line_number, {
+        "date": date,
+        "category": category,
+        "amount": -amount,
+        "description": description or None,
+        "payment_method": payment_method,
+        "import_key": f"ofx:{account}:{fitid}" if fitid else None,
+    }, None
+
+
+def _qif_date(value: str) -> datetime:
+    value = value.strip().replace("'", "/").replace(" ", "")
+    for pattern in ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(value, pattern)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date {value!r}")
+
+
+def parse_qif(stream: TextIO, category: str, payment_method: str) -> Iterator[ParsedRow]:
+    """Debit records of a QIF bank or card register"""
+    record, start = {}, 1
+    for line_number, line in enumerate(stream, start=1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        if line.startswith("^"):
+            if record:
+                yield _qif_row(start, record, category, payment_method)
+            record, start = {}, line_number + 1
+            continue
+        if not record:
+            start = line_number
+        record.setdefault(line[0], line[1:].strip())
+    if record:
+        yield _qif_row(start, record, category, payment_method)
+
+
+def _qif_row(line_number: int, record: dict, category: str, payment_method: str) -> ParsedRow:
+    try:
+        amount = _amount(record.get("T") or record["U"])
+        date = _qif_date(record["D"])
+    except (KeyError, ValueError):
+        return line_number, None, "Record needs a valid D (date) and T (amount)"
+    if amount >= 0:
+        return line_number, None, "Credit transactions are not expenses"
+    description = " - ".join(part for part in (record.get("P"), record.get("M")) if part)
+    return line_number, {
+        "date": date,
+        "category": record.get("L") or category,
+        "amount": -amount,
+        "description": description or None,
+        "payment_method": payment_method,
+    }, None
+
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "qif": parse_qif}
+
+
+def format_for(filename: Optional[str]) -> Optional[str]:
+    """Guess the format from a file extension (.qfx is OFX)"""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    extension = "ofx" if extension == "qfx" else extension
+    return extension if extension in PARSERS else None
+
+
+def import_key(expense: schemas.ExpenseCreate, occurrence: int = 0) -> str:
+    """Fingerprint of a transaction without a source id, so re-imports are skipped.
+
+    ``occurrence`` counts identical rows earlier in the same file, so
+    repeated purchases are kept while importing the file again still
+    matches every one of them.
+    """
+    content = "|".join([
+        expense.date.isoformat(), repr(expense.amount), expense.category,
+        expense.description or "", expense.payment_method
+    ])
+    if occurrence:
+        content += f"|{occurrence}"
+    return "sha1:" + hashlib.sha1(content.encode()).hexdigest()
+
+
+def validate_batch(batch, occurrences: Optional[Counter] = None):
+    """Validate ``[(line, row)]`` in one pass; return ``(valid, errors)``.
+
+    ``valid`` holds ``(line, ExpenseCreate, import_key)`` and ``errors``
+    ``(line, message)``, both in line order. ``occurrences`` carries the
+    count of each content fingerprint across the batches of one file.
+    """
+    occurrences = Counter() if occurrences is None else occurrences
+    expenses, failed = validate_many(_expense_batch, [row for _, row in batch])
+    errors = [(batch[index][0], message) for index, message in failed.items()]
+    valid = []
+    for index, expense in expenses:
+        line, row = batch[index]
+        if not expense.category.strip():
+            errors.append((line, "category: Category cannot be empty"))
+        elif not expense.payment_method.strip():
+            errors.append((line, "payment_method: Payment method cannot be empty"))
+        elif row.get("import_key"):
+            valid.append((line, expense, row["import_key"]))
+        else:
+            first = import_key(expense)
+            valid.append((line, expense, import_key(expense, occurrences[first])))
+            occurrences[first] += 1
+    errors.sort()
+    return valid, errors
+
+
+def new_report() -> dict:
+    return {"imported": 0, "duplicates": 0, "failed": 0, "rows": [], "truncated": False}
+
+
+def note(report: dict, line: int, status: str, detail: Optional[str] = None):
+    """Count a failed or duplicate row and list it while the report has room"""
+    report["failed" if status == "error" else "duplicates"] += 1
+    if len(report["rows"]) < IMPORT_REPORT_LIMIT:
+        report["rows"].append({"row": line, "status": status, "detail": detail})
+    else:
+        report["truncated"] = True
+
+
+def next_chunk(rows: Iterator[ParsedRow], report: dict, occurrences: Counter) -> Optional[list]:
+    """Parse and validate up to IMPORT_CHUNK_SIZE rows; None once ``rows`` is exhausted.
+
+    Needs no database, so async callers run it in the threadpool. Failures
+    are noted in ``report``; the valid ``(line, ExpenseCreate, import_key)``
+    are returned.
+    """
+    chunk = list(islice(rows, IMPORT_CHUNK_SIZE))
+    if not chunk:
+        return None
+    parsed = []
+    for line, row, error in chunk:
+        if error is not None:
+            note(report, line, "error", error)
+        else:
+            parsed.append((line, row))
+    valid, errors = validate_batch(parsed, occurrences)
+    for line, message in errors:
+        note(report, line, "error", message)
+    return valid
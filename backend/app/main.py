@@ -1,20 +1,61 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from . import crud, models, schemas
-from .database import engine, get_db
+from typing import Any, Dict, List, Literal, Optional, Union
+from datetime import date, datetime, timedelta
+from . import crud, crud_async, export, importers, metrics, models, reports, schemas, serializers
+from .cache import Principal, principal_cache, token_versions
+from .database import (
+    DATABASE_ASYNC,
+    DATABASE_SCHEMA_MODE,
+    AsyncSessionLocal,
+    check_schema,
+    engine,
+    get_read_session,
+    get_session,
+    prewarm_async_pool,
+    prewarm_pool,
+    read_session,
+    wal_checkpointer,
+)
+from .hashing import password_hasher
+import hashlib
+import io
+import logging
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DATABASE_SCHEMA_MODE == "create":
+        await run_in_threadpool(models.Base.metadata.create_all, bind=engine)
+    elif DATABASE_SCHEMA_MODE == "check":
+        await run_in_threadpool(check_schema, engine)
+
+    # Pay connection, bcrypt backend and OpenAPI generation costs before traffic
+    await run_in_threadpool(prewarm_pool, engine)
+    if DATABASE_ASYNC:
+        await prewarm_async_pool(AsyncSessionLocal.kw["bind"])
+    await run_in_threadpool(password_hasher.warm)
+    app.openapi()
+    if wal_checkpointer is not None:
+        wal_checkpointer.start()
+    logger.info("Startup complete")
+
+    yield
 
-models.Base.metadata.create_all(bind=engine)
+    if wal_checkpointer is not None:
+        wal_checkpointer.stop()
+    password_hasher.shutdown()
 
-app = FastAPI(title="Expense Tracker API")
+
+app = FastAPI(title="Expense Tracker API", lifespan=lifespan)
 
 
 # Add this new root route
@@ -50,6 +91,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 def create_access_token(data: dict):
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
@@ -57,126 +100,368 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    # Tokens are only cached after their signature has been validated
+    principal = principal_cache.get(token)
+    if principal is None:
+        # python-jose is imported on first use to keep imports cheap
+        from jose import JWTError, jwt
+
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            user_id = int(payload["sub"])
+            token_version = int(payload["ver"])
+        except (JWTError, KeyError, TypeError, ValueError):
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    user = crud.get_user_by_email(db, email=email)
-    if user is None:
+        # Another live token of the same user carries the same profile
+        principal = principal_cache.get_user(user_id)
+        if principal is None or principal.token_version != token_version:
+            user = await crud_async.get_user(db, user_id)
+            if user is None or user.token_version != token_version:
+                raise credentials_exception
+            principal = Principal.from_user(user)
+            token_versions.set(user.id, user.token_version)
+        principal_cache.set(token, principal, token_expires_at=payload.get("exp"))
+    # Cached principals are only as current as the token version in the database,
+    # which other workers and plain SQL can bump
+    current_version = token_versions.get(principal.id)
+    if current_version is None:
+        current_version = await crud_async.get_token_version(db, principal.id)
+        if current_version is not None:
+            token_versions.set(principal.id, current_version)
+    if current_version != principal.token_version:
+        principal_cache.invalidate_user(principal.id)
         raise credentials_exception
-    return user
+    # Commits on this request's session route the user's next reads to the primary
+    db.info["user_id"] = principal.id
+    return principal
+
+
+async def get_user_read_session(current_user: Principal = Depends(get_current_user)):
+    """Read-only session that keeps the user on the primary after their writes"""
+    async with read_session(current_user.id) as db:
+        yield db
+
+
+def collection_etag(request: Request, user_id: int, version: int) -> str:
+    """Strong ETag of a list response: collection version, caller and query string"""
+    key = f"{request.url.path}?{request.url.query}:{user_id}:{version}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already has ``etag``; otherwise tag ``response``"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or etag in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
+def expected_version(request: Request, version: Optional[int]) -> Optional[int]:
+    """Version an update is conditional on: the body's, else an If-Match tag"""
+    if version is not None:
+        return version
+    if_match = request.headers.get("if-match", "").strip()
+    if not if_match or if_match == "*":
+        return None
+    try:
+        return int(if_match.removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="If-Match must carry an expense version"
+        )
 
 
 @app.post("/token")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not crud.pwd_context.verify(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_session)):
+    user = await crud_async.get_user_by_email(db, form_data.username)
+    if not user or not await password_hasher.verify_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": str(user.id), "ver": user.token_version})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@app.post("/token/revoke")
+async def revoke_tokens(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    """Invalidate every token issued to the current user so far"""
+    await crud_async.bump_token_version(db, current_user.id)
+    return {"message": "All tokens revoked"}
+
+
 @app.post("/users/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def create_user(user: schemas.UserCreate, db: Session = Depends(get_session)):
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    return await crud_async.create_user(db=db, user=user)
+
+
+def expense_filters(
+    start_date: Optional[Union[datetime, date]] = None,
+    end_date: Optional[Union[datetime, date]] = None,
+    category: Optional[List[str]] = Query(None),
+    payment_method: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    search: Optional[str] = None
+) -> schemas.ExpenseFilter:
+    """Filters shared by expense listings; repeat ``category`` to match several"""
+    return schemas.ExpenseFilter(
+        start_date=start_date,
+        end_date=end_date,
+        categories=category,
+        payment_method=payment_method,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        search=search
+    )
 
 
-@app.get("/expenses/", response_model=List[schemas.Expense])
-def read_expenses(
+@app.get("/expenses/", response_model=Union[List[schemas.Expense], schemas.ExpensePage])
+async def read_expenses(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    lean: bool = False,
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    db: Session = Depends(get_user_read_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    expenses = crud.get_expenses(db, user_id=current_user.id, skip=skip, limit=limit)
+    # The version is read before the list, so a racing write can only make the tag older
+    version = await crud_async.get_collection_version(db, "expenses", current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    # lean=true reads plain columns and skips response_model validation
+    columns = serializers.EXPENSE_COLUMNS if lean else None
+    # Passing cursor (empty for the first page) switches to keyset pagination
+    if cursor is not None:
+        page = await crud_async.get_expenses_page(
+            db, user_id=current_user.id, cursor=cursor, limit=limit, filters=filters, columns=columns
+        )
+        if lean:
+            page["items"] = serializers.expenses(page["items"])
+            return serializers.json_response(page, response)
+        return page
+    expenses = await crud_async.get_expenses(
+        db, user_id=current_user.id, skip=skip, limit=limit, filters=filters, columns=columns
+    )
+    if lean:
+        return serializers.json_response(serializers.expenses(expenses), response)
     return expenses
 
 
+@app.get("/expenses/export")
+async def export_expenses(
+    format: Literal["csv", "ndjson"] = "csv",
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream the user's whole (filtered) expense history"""
+    statement = crud.expense_export_statement(current_user.id, filters)
+    return export.export_response(statement, format, current_user.id, "expenses")
+
+
+@app.post("/expenses/import", response_model=schemas.ImportReport)
+async def import_expenses(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ofx", "qif"]] = None,
+    category: str = "Uncategorized",
+    payment_method: str = "Imported",
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    """Import a bank statement; ``category`` and ``payment_method`` fill fields the file lacks"""
+    format = format or importers.format_for(file.filename)
+    if format is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Pass format=csv|ofx|qif or upload a .csv, .ofx, .qfx or .qif file"
+        )
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        rows = importers.PARSERS[format](stream, category, payment_method)
+        return await crud_async.import_expenses(db, current_user.id, rows)
+    finally:
+        # Leave closing the upload to Starlette
+        stream.detach()
+
+
 @app.post("/expenses/", response_model=schemas.Expense)
-def create_expense(
+async def create_expense(
     expense: schemas.ExpenseCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    return await crud_async.create_expense(db=db, expense=expense, user_id=current_user.id)
+
+
+@app.post("/batch/expenses", response_model=schemas.BatchResult)
+async def batch_expenses(
+    operations: List[Dict[str, Any]] = Body(..., embed=True),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    """Apply queued create/update/delete operations with a single commit"""
+    return await crud_async.apply_expense_batch(db, current_user.id, operations)
+
+
+@app.put("/expenses/{expense_id}", response_model=schemas.Expense)
+async def replace_expense(
+    expense_id: int,
+    expense: schemas.ExpenseReplace,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Replace an expense; a version (body or If-Match) makes the update conditional"""
+    crud.validate_expense_create(expense)
+    values = expense.model_dump(exclude={"version"})
+    updated = await crud_async.update_expense(
+        db, expense_id, current_user.id, values, expected_version(request, expense.version)
+    )
+    response.headers["ETag"] = f'"{updated.version}"'
+    return updated
+
+
+@app.patch("/expenses/{expense_id}", response_model=schemas.Expense)
+async def patch_expense(
+    expense_id: int,
+    changes: schemas.ExpensePatch,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    return crud.create_expense(db=db, expense=expense, user_id=current_user.id)
+    """Change some fields of an expense; versioned like PUT"""
+    values = crud.validate_expense_update(changes)
+    values.pop("version", None)
+    updated = await crud_async.update_expense(
+        db, expense_id, current_user.id, values, expected_version(request, changes.version)
+    )
+    response.headers["ETag"] = f'"{updated.version}"'
+    return updated
+
+
+@app.delete("/expenses/", response_model=schemas.BulkDeleteResult)
+async def delete_expenses(
+    ids: Optional[List[int]] = Body(None, embed=True),
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Delete expenses by a body ``ids`` list and/or the listing filters"""
+    deleted = await crud_async.delete_expenses(db, current_user.id, ids=ids, filters=filters)
+    return {"deleted": deleted}
 
 
 @app.delete("/expenses/{expense_id}")
-def delete_expense(
+async def delete_expense(
     expense_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_user)
 ):
-    expense = crud.delete_expense(db=db, expense_id=expense_id, user_id=current_user.id)
+    expense = await crud_async.delete_expense(db=db, expense_id=expense_id, user_id=current_user.id)
     if expense is None:
         raise HTTPException(status_code=404, detail="Expense not found")
     return {"message": "Expense deleted successfully"}
 
 
 @app.post("/groups/", response_model=schemas.Group)
-def create_group(
+async def create_group(
     group: schemas.GroupCreate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_session)
 ):
-    return crud.create_group(db, group.name, current_user.id)
+    return await crud_async.create_group(db, group.name, current_user.id)
 
 
 @app.post("/groups/{group_id}/join")
-def join_group(
+async def join_group(
     group_id: int,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_session)
 ):
-    return crud.join_group(db, group_id, current_user.id)
+    return await crud_async.join_group(db, group_id, current_user.id)
 
 
 @app.get("/groups/", response_model=list[schemas.Group])
-def list_user_groups(
+async def list_user_groups(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
 ):
     """List all groups that the current user is a member of"""
-    return crud.get_user_groups(db, current_user.id, skip=skip, limit=limit)
+    version = await crud_async.get_collection_version(db, "groups", current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    return await crud_async.get_user_groups(db, current_user.id, skip=skip, limit=limit)
 
 
 @app.post("/groups/{group_id}/expenses", response_model=schemas.GroupExpense)
-def create_group_expense(
+async def create_group_expense(
     group_id: int,
     expense: schemas.GroupExpenseCreate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_session)
 ):
-    return crud.create_group_expense(db, group_id, expense, current_user.id)
+    return await crud_async.create_group_expense(db, group_id, expense, current_user.id)
 
 
 @app.get("/groups/{group_id}/expenses/", response_model=list[schemas.GroupExpense])
-def list_group_expenses(
+async def list_group_expenses(
+    request: Request,
+    response: Response,
     group_id: int,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    lean: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
 ):
-    return crud.get_group_expenses(
+    # Membership is still checked before answering 304
+    version = await crud_async.get_group_expenses_version(db, group_id, current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    if lean:
+        expenses, splits = await crud_async.get_group_expense_rows(
+            db,
+            group_id=group_id,
+            user_id=current_user.id,
+            columns=serializers.GROUP_EXPENSE_COLUMNS,
+            split_columns=serializers.SPLIT_COLUMNS,
+            skip=skip,
+            limit=limit
+        )
+        return serializers.json_response(
+            serializers.group_expenses(expenses, splits, current_user.id), response
+        )
+    return await crud_async.get_group_expenses(
         db,
         group_id=group_id,
         user_id=current_user.id,
@@ -185,14 +470,78 @@ def list_group_expenses(
     )
 
 
+@app.get("/groups/{group_id}/balances", response_model=List[schemas.MemberBalance])
+async def read_group_balances(
+    request: Request,
+    response: Response,
+    group_id: int,
+    as_of: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
+):
+    """Who owes whom: each member's unsettled paid and owed totals and the net, now or ``as_of``"""
+    version = await crud_async.get_group_expenses_version(db, group_id, current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    return await crud_async.get_group_balances(db, group_id, current_user.id, as_of)
+
+
+@app.get("/groups/{group_id}/settlement-plan", response_model=schemas.SettlementPlan)
+async def read_settlement_plan(
+    request: Request,
+    response: Response,
+    group_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
+):
+    """Transfers between members that settle the group's balances"""
+    version = await crud_async.get_group_expenses_version(db, group_id, current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    return await crud_async.get_settlement_plan(db, group_id, current_user.id)
+
+
+@app.get("/groups/{group_id}/statistics/by_category", response_model=schemas.StatisticsByCategory)
+async def read_group_statistics_by_category(
+    request: Request,
+    response: Response,
+    group_id: int,
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
+):
+    """Group expense totals overall and per category; month-aligned windows read the rollups"""
+    version = await crud_async.get_group_expenses_version(db, group_id, current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    return await crud_async.get_group_category_statistics(db, group_id, current_user.id, filters)
+
+
+@app.get("/groups/{group_id}/expenses/export")
+async def export_group_expenses(
+    group_id: int,
+    format: Literal["csv", "ndjson"] = "csv",
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
+):
+    """Stream a group's (filtered) expenses with the user's share of each"""
+    await crud_async.check_group_member(db, group_id, current_user.id)
+    statement = crud.group_expense_export_statement(group_id, current_user.id, filters)
+    return export.export_response(statement, format, current_user.id, f"group-{group_id}-expenses")
+
+
 @app.delete("/groups/{group_id}/expenses/{expense_id}")
-def delete_group_expense(
+async def delete_group_expense(
     group_id: int,
     expense_id: int,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_session)
 ):
-    return crud.delete_group_expense(
+    return await crud_async.delete_group_expense(
         db,
         group_id=group_id,
         expense_id=expense_id,
@@ -202,26 +551,103 @@ def delete_group_expense(
 
 # Added a new endpoint to search groups by name
 @app.get("/groups/search/", response_model=list[schemas.Group])
-def search_groups(
+async def search_groups(
     name: str,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_session)
 ):
     """Search for groups by name (case-insensitive partial match)"""
-    return db.query(models.Group).filter(
-        models.Group.name.ilike(f"%{name}%")
-    ).offset(skip).limit(limit).all()
+    return await crud_async.search_groups(db, name, skip=skip, limit=limit)
 
 
 @app.get("/groups/{group_id}/members/", response_model=List[schemas.GroupMemberBase])
-def get_group_members(
+async def get_group_members(
     group_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_user_read_session),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get all members of a specific group"""
-    return crud.get_group_members(db, group_id=group_id, current_user=current_user)
+    return await crud_async.get_group_members(db, group_id=group_id, current_user=current_user)
+
+
+@app.get("/sync/changes", response_model=schemas.SyncChanges)
+async def sync_changes(
+    since: int = 0,
+    limit: int = 500,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
+):
+    """Inserts, updates and deletes after ``since``, oldest first"""
+    return await crud_async.get_changes(db, current_user.id, since=since, limit=limit)
+
+
+@app.get("/statistics/", response_model=schemas.StatisticsSummary)
+async def read_statistics(
+    request: Request,
+    response: Response,
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    db: Session = Depends(get_user_read_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Total, count, average and maximum of the matching expenses"""
+    version = await crud_async.get_collection_version(db, "expenses", current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    return await crud_async.get_category_statistics(db, current_user.id, filters)
+
+
+@app.get("/statistics/by_category", response_model=schemas.StatisticsByCategory)
+async def read_statistics_by_category(
+    request: Request,
+    response: Response,
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    db: Session = Depends(get_user_read_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    """The same figures overall and per category, e.g. for a start_date/end_date window"""
+    version = await crud_async.get_collection_version(db, "expenses", current_user.id)
+    cached = not_modified(request, response, collection_etag(request, current_user.id, version))
+    if cached is not None:
+        return cached
+    return await crud_async.get_category_statistics(db, current_user.id, filters)
+
+
+@app.get("/reports/aggregate", response_model=schemas.AggregateReport)
+async def aggregate_report(
+    group_by: List[Literal[reports.DIMENSIONS]] = Query([]),
+    measure: List[Literal[reports.MEASURES]] = Query(["sum", "count"]),
+    pivot: bool = False,
+    filters: schemas.ExpenseFilter = Depends(expense_filters),
+    db: Session = Depends(get_user_read_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Measures of the matching expenses grouped by any mix of dimensions.
+
+    Repeat ``group_by`` and ``measure``; with two dimensions, ``pivot=true``
+    also returns each measure as a matrix. Group expenses count with the
+    caller's share.
+    """
+    return await crud_async.aggregate_expenses(db, current_user.id, group_by, measure, filters, pivot=pivot)
+
+
+@app.get("/search", response_model=list[schemas.SearchHit])
+async def search_expenses(
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_user_read_session)
+):
+    """Personal and group expenses whose description or category match ``q``, best first"""
+    return await crud_async.search_expenses(db, current_user.id, q, skip=skip, limit=limit)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Expose in-process counters in the Prometheus text format"""
+    return metrics.render()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,23 @@
+from typing import Callable, Iterable, Tuple
+
+# A collector returns (name, type, help, value) tuples when scraped
+Sample = Tuple[str, str, str, float]
+
+_collectors: list[Callable[[], Iterable[Sample]]] = []
+
+
+def register(collector: Callable[[], Iterable[Sample]]):
+    """Register a callable whose samples are exposed on /metrics"""
+    _collectors.append(collector)
+    return collector
+
+
+def render() -> str:
+    """Render all registered samples in the Prometheus text format"""
+    lines = []
+    for collector in _collectors:
+        for name, metric_type, help_text, value in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
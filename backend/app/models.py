@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Boolean, Index, event
 from sqlalchemy.orm import relationship
+from . import search
 from .database import Base
 from datetime import datetime
 
@@ -11,6 +12,8 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     full_name = Column(String)
+    # Bumped to revoke every token issued before the change
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     expenses = relationship("Expense", back_populates="owner")
     group_memberships = relationship("GroupMember", back_populates="user")
 
@@ -24,13 +27,25 @@ class ExpenseBase(Base):
     category = Column(String, index=True)
     amount = Column(Float)
     description = Column(String)
+    # Position in the sync feed, reassigned on every change
+    seq = Column(Integer)
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
 
 class Expense(ExpenseBase):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_id_date", "user_id", "date"),
+        Index("ix_expenses_user_id_seq", "user_id", "seq"),
+        Index("ix_expenses_user_id_import_key", "user_id", "import_key", unique=True),
+    )
 
     payment_method = Column(String)
     user_id = Column(Integer, ForeignKey("users.id"))
+    # Source transaction id or content fingerprint of imported rows; NULL otherwise
+    import_key = Column(String)
+    # Incremented by every update; clients send it back to detect lost updates
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     owner = relationship("User", back_populates="expenses")
 
 
@@ -49,11 +64,16 @@ class Group(Base):
 
 class GroupMember(Base):
     __tablename__ = "group_members"
+    __table_args__ = (
+        Index("ix_group_members_group_id_user_id", "group_id", "user_id", unique=True),
+        Index("ix_group_members_user_id_group_id", "user_id", "group_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     group_id = Column(Integer, ForeignKey("groups.id"))
     joined_at = Column(DateTime, default=datetime.utcnow)
+    seq = Column(Integer)  # Sync feed position of the join
 
     user = relationship("User", back_populates="group_memberships")
     group = relationship("Group", back_populates="members")
@@ -61,6 +81,10 @@ class GroupMember(Base):
 
 class GroupExpense(ExpenseBase):
     __tablename__ = "group_expenses"
+    __table_args__ = (
+        Index("ix_group_expenses_group_id_date", "group_id", "date"),
+        Index("ix_group_expenses_group_id_seq", "group_id", "seq"),
+    )
 
     group_id = Column(Integer, ForeignKey("groups.id"))
     paid_by = Column(Integer, ForeignKey("users.id"))
@@ -72,6 +96,9 @@ class GroupExpense(ExpenseBase):
 
 class ExpenseSplit(Base):
     __tablename__ = "expense_splits"
+    __table_args__ = (
+        Index("ix_expense_splits_expense_id_user_id", "expense_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     expense_id = Column(Integer, ForeignKey("group_expenses.id"))
@@ -81,3 +108,99 @@ class ExpenseSplit(Base):
 
     expense = relationship("GroupExpense", back_populates="splits")
     user = relationship("User")
+
+
+class CollectionVersion(Base):
+    """Change counter of a list endpoint's collection, used for ETags"""
+    __tablename__ = "collection_versions"
+
+    # "expenses", "groups" or "group_expenses"; ("sync", 0) allocates sync feed positions;
+    # ("writes", user id) counts a user's commits while read replicas are configured
+    scope = Column(String, primary_key=True)
+    scope_id = Column(Integer, primary_key=True)  # user id, or group id for group_expenses
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class Tombstone(Base):
+    """Left behind by a hard delete so sync clients learn about it"""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_user_id_seq", "user_id", "seq"),
+        Index("ix_tombstones_group_id_seq", "group_id", "seq"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    seq = Column(Integer, nullable=False)
+    entity = Column(String, nullable=False)  # "expense" or "group_expense"
+    entity_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))  # owner of a personal expense
+    group_id = Column(Integer, ForeignKey("groups.id"))  # group of a group expense
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DailyExpenseRollup(Base):
+    """Totals of a user's personal expenses per day and category, kept by crud"""
+    __tablename__ = "daily_expense_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)  # "Uncategorized" for a missing category
+    total = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
+    max_amount = Column(Float, nullable=False)
+
+
+class MonthlyGroupRollup(Base):
+    """Totals of a group's expenses per month and category, kept by crud"""
+    __tablename__ = "monthly_group_rollups"
+
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    category = Column(String, primary_key=True)
+    total = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
+    max_amount = Column(Float, nullable=False)
+
+
+class BalanceLedgerEntry(Base):
+    """Change of a member's group balance by one expense write; rows are only ever appended"""
+    __tablename__ = "balance_ledger"
+    __table_args__ = (
+        Index("ix_balance_ledger_group_id_id", "group_id", "id"),
+        Index("ix_balance_ledger_group_id_recorded_at", "group_id", "recorded_at"),
+    )
+
+    id = Column(Integer, primary_key=True)  # Ledger position, increasing with every write
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expense_id = Column(Integer)  # No foreign key, deleted expenses keep their entries; None for a correction
+    paid = Column(Float, nullable=False)  # Change of the member's paid total
+    owed = Column(Float, nullable=False)  # Change of the member's owed total
+    recorded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class MemberBalance(Base):
+    """Running totals of a member's group ledger entries, kept by crud"""
+    __tablename__ = "member_balances"
+
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    paid = Column(Float, nullable=False)
+    owed = Column(Float, nullable=False)
+
+
+class BalanceSnapshot(Base):
+    """A member's group totals as of a ledger position, so replays start close by"""
+    __tablename__ = "balance_snapshots"
+
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    ledger_id = Column(Integer, primary_key=True)  # Last ledger entry of the group included
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    paid = Column(Float, nullable=False)
+    owed = Column(Float, nullable=False)
+    taken_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+# The FTS5 search index is not a mapped table; create_all builds it through these hooks
+event.listen(Base.metadata, "after_create", search.create_index)
+event.listen(Base.metadata, "before_drop", search.drop_index)
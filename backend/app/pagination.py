@@ -0,0 +1,27 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(date: datetime, id: int) -> str:
+    """Opaque cursor pointing just after the row with this (date, id)"""
+    raw = json.dumps([date.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """Return the (date, id) position of a cursor; an empty cursor is the first page"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        date, id = json.loads(raw)
+        return datetime.fromisoformat(date), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid cursor"
+        )
@@ -0,0 +1,151 @@
+"""NumPy kernels behind reports.aggregate.
+
+Each grouping dimension becomes an integer code per row, the codes are
+combined into one group index, and every measure is computed per group
+with vectorised NumPy: ``bincount`` for sums and counts, and a single
+sort by (group, amount) for maxima and percentiles.
+"""
+import math
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from .reports import DATE_DIMENSIONS
+
+PERCENTILES = {"median": 0.5, "p90": 0.9}
+# datetime.toordinal() of 1970-01-01, the datetime64 epoch
+EPOCH_ORDINAL = 719163
+
+
+def epoch_days(values) -> np.ndarray:
+    """Days since 1970-01-01 of datetimes, or of ISO strings as SQLite returns them"""
+    if not values:
+        return np.zeros(0, dtype=np.int64)
+    if isinstance(values[0], str):
+        return np.array(values, dtype="datetime64[D]").astype(np.int64)
+    return np.fromiter((value.toordinal() for value in values), np.int64, len(values)) - EPOCH_ORDINAL
+
+
+def _encode(values, missing):
+    """Codes ordered like the sorted distinct values, and those values.
+
+    ``missing`` stands in for None while sorting, so missing values sort
+    first and are reported as None.
+    """
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values), np.int64, len(values))
+    labels = sorted(index, key=lambda value: missing if value is None else value)
+    rank = np.empty(len(labels), dtype=np.int64)
+    rank[[index[label] for label in labels]] = np.arange(len(labels))
+    return rank[codes], labels
+
+
+def _dimension(name: str, columns: dict, days: np.ndarray):
+    """(codes, labels) of one dimension over the fetched rows"""
+    if name == "category":
+        return _encode(columns["category"], "")
+    if name == "payment_method":
+        return _encode(columns["payment_method"], "")
+    if name == "group":
+        return _encode(columns["group_id"], 0)
+    if name == "weekday":
+        keys = (days + 3) % 7  # 1970-01-01 was a Thursday; Monday is 0 as in date.weekday()
+    elif name == "week":
+        keys = days - (days + 3) % 7  # Monday starting the ISO week
+    elif name == "month":
+        keys = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    else:
+        keys = days
+    distinct, codes = np.unique(keys, return_inverse=True)
+    if name == "weekday":
+        labels = distinct.tolist()
+    elif name == "month":
+        labels = [str(month) for month in distinct.astype("datetime64[M]")]
+    else:
+        labels = [str(day) for day in distinct.astype("datetime64[D]")]
+    return codes, labels
+
+
+def _measures(groups: np.ndarray, amounts: np.ndarray, size: int, measures: list) -> dict:
+    """Each measure as an array over ``size`` groups; ``groups`` maps rows to groups"""
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=amounts, minlength=size)
+    values = {"sum": sums, "count": counts, "mean": sums / np.maximum(counts, 1)}
+    if {"median", "p90", "max"} & set(measures):
+        ordered = amounts[np.lexsort((amounts, groups))]
+        starts = np.cumsum(counts) - counts
+        last = starts + np.maximum(counts - 1, 0)
+        values["max"] = ordered[last] if len(ordered) else np.zeros(size)
+        for name, q in PERCENTILES.items():
+            if name not in measures or not len(ordered):
+                values[name] = np.zeros(size)
+                continue
+            # Linear interpolation between closest ranks, as numpy.percentile does
+            position = starts + q * np.maximum(counts - 1, 0)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            values[name] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return {name: values[name] for name in measures}
+
+
+def aggregate(columns: dict, dimensions: list, measures: list, pivot: bool, max_groups: int) -> dict:
+    """Report dict of reports.aggregate over already validated arguments"""
+    measures = list(dict.fromkeys(measures))
+    amounts = np.asarray(columns["amount"], dtype=np.float64)
+    days = epoch_days(columns["date"]) if DATE_DIMENSIONS & set(dimensions) else None
+
+    encoded = [_dimension(name, columns, days) for name in dimensions]
+    shape = tuple(len(labels) for _, labels in encoded)
+    if encoded and len(amounts):
+        keys = np.ravel_multi_index([codes for codes, _ in encoded], shape)
+        present, groups = np.unique(keys, return_inverse=True)
+    else:
+        present, groups = np.zeros(0, dtype=np.int64), np.zeros(len(amounts), dtype=np.int64)
+        if not encoded and len(amounts):
+            present = np.zeros(1, dtype=np.int64)
+    if len(present) > max_groups:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A report can hold at most {max_groups} groups; narrow the filters or dimensions"
+        )
+
+    values = _measures(groups, amounts, len(present), measures)
+    columns_out = {name: array.tolist() for name, array in values.items()}
+    positions = np.unravel_index(present, shape) if encoded and len(present) else ()
+    labels = [
+        [encoded[d][1][i] for i in indexes.tolist()] for d, indexes in enumerate(positions)
+    ]
+    rows = []
+    for g in range(len(present)):
+        row = {name: labels[d][g] for d, name in enumerate(dimensions)}
+        for name in measures:
+            row[name] = columns_out[name][g]
+        rows.append(row)
+
+    totals = _measures(np.zeros(len(amounts), dtype=np.int64), amounts, 1, measures)
+    report = {
+        "dimensions": list(dimensions),
+        "measures": measures,
+        "rows": rows,
+        "total": {name: array.tolist()[0] for name, array in totals.items()},
+        "pivot": None,
+    }
+    if pivot:
+        report["pivot"] = _pivot(encoded, present, values)
+    return report
+
+
+def _pivot(encoded: list, present: np.ndarray, values: dict) -> dict:
+    """Matrices of each measure; missing cells are 0 for sum and count, None otherwise"""
+    (_, row_labels), (_, column_labels) = encoded
+    shape = (len(row_labels), len(column_labels))
+    cells = {}
+    for name, array in values.items():
+        empty = 0 if name in ("sum", "count") else None
+        matrix = np.full(shape, np.nan)
+        matrix.flat[present] = array
+        cells[name] = [
+            [empty if math.isnan(value) else (int(value) if name == "count" else value) for value in row]
+            for row in matrix.tolist()
+        ]
+    return {"rows": row_labels, "columns": column_labels, "cells": cells}
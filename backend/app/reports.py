@@ -0,0 +1,41 @@
+"""Multi-dimensional aggregation of expenses for GET /reports/aggregate.
+
+crud fetches the filtered personal and group expenses column by column and
+``report_arrays`` groups and measures them with NumPy. Group expenses
+count with the caller's split share. NumPy is imported on the first
+report, so importing the app stays cheap.
+"""
+import os
+
+from fastapi import HTTPException, status
+
+DIMENSIONS = ("category", "payment_method", "day", "week", "month", "weekday", "group")
+MEASURES = ("sum", "count", "mean", "median", "p90", "max")
+DATE_DIMENSIONS = {"day", "week", "month", "weekday"}
+# Groups a single report may return
+REPORT_MAX_GROUPS = int(os.getenv("REPORT_MAX_GROUPS", "10000"))
+
+
+def aggregate(columns: dict, dimensions: list, measures: list, pivot: bool = False) -> dict:
+    """Report over fetched ``columns`` grouped by ``dimensions``.
+
+    ``columns`` holds equally long sequences under ``amount``, ``date``,
+    ``category``, ``payment_method`` and ``group_id``; only those the
+    dimensions need must be present. Rows come back ordered by dimension
+    values. A pivot spreads the first of two dimensions over rows and the
+    second over columns.
+    """
+    if len(set(dimensions)) != len(dimensions):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Each dimension can be grouped by once"
+        )
+    if pivot and len(dimensions) != 2:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="A pivot needs exactly two dimensions"
+        )
+    # NumPy is imported on the first report to keep importing the app cheap
+    from . import report_arrays
+
+    return report_arrays.aggregate(columns, dimensions, measures, pivot, REPORT_MAX_GROUPS)
@@ -0,0 +1,172 @@
+"""Pre-aggregated expense totals for statistics over long histories.
+
+``daily_expense_rollups`` holds the total, count and largest amount of a
+user's personal expenses per (day, category) and ``monthly_group_rollups``
+the same for a group's expenses per (month, category). crud maintains both
+inside the mutating transaction: new expenses are added to their bucket
+with an upsert, while updates and deletes recompute the buckets they
+touched from the expenses left in them, since a maximum cannot be
+subtracted. Statistics over bucket-aligned windows then read one row per
+bucket instead of one per expense.
+
+    python -m app.rollups rebuild   # recompute both tables from the expenses
+    python -m app.rollups check     # list buckets that disagree; exits 1 if any
+"""
+import argparse
+import math
+import sys
+from datetime import date, datetime, time, timedelta
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+UNCATEGORIZED = "Uncategorized"
+# Rows per INSERT when rebuilding
+REBUILD_CHUNK_SIZE = 5000
+
+
+class Rollup(NamedTuple):
+    model: type  # The rollup table
+    source: type  # The expense table it summarises
+    owner: str  # Owner column shared by both
+    bucket: str  # Bucket column of the rollup table
+    bucket_of: Callable  # datetime -> first day of its bucket
+    next_bucket: Callable  # bucket -> first day of the following one
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+DAILY = Rollup(
+    models.DailyExpenseRollup, models.Expense, "user_id", "day",
+    lambda moment: moment.date(), lambda day: day + timedelta(days=1)
+)
+MONTHLY_GROUP = Rollup(
+    models.MonthlyGroupRollup, models.GroupExpense, "group_id", "month",
+    lambda moment: date(moment.year, moment.month, 1), _next_month
+)
+ROLLUPS = {"daily": DAILY, "monthly_group": MONTHLY_GROUP}
+
+
+def bucket_key(rollup: Rollup, owner_id: int, moment: datetime, category: Optional[str]) -> tuple:
+    """(owner, bucket, category) key of an expense"""
+    return owner_id, rollup.bucket_of(moment), category or UNCATEGORIZED
+
+
+def aggregate(rollup: Rollup, rows) -> dict:
+    """``{key: [total, count, max]}`` of ``(owner, date, category, amount)`` rows"""
+    buckets = {}
+    for owner_id, moment, category, amount in rows:
+        key = bucket_key(rollup, owner_id, moment, category)
+        amount = amount or 0.0
+        stats = buckets.get(key)
+        if stats is None:
+            buckets[key] = [amount, 1, amount]
+        else:
+            stats[0] += amount
+            stats[1] += 1
+            if amount > stats[2]:
+                stats[2] = amount
+    return buckets
+
+
+def row_values(rollup: Rollup, buckets: dict) -> list:
+    """Insert parameters of aggregated buckets"""
+    return [
+        {
+            rollup.owner: owner_id, rollup.bucket: bucket, "category": category,
+            "total": total, "count": count, "max_amount": maximum,
+        }
+        for (owner_id, bucket, category), (total, count, maximum) in buckets.items()
+    ]
+
+
+def source_rows(rollup: Rollup, owner_id: Optional[int] = None,
+                start: Optional[date] = None, end: Optional[date] = None):
+    """select() of ``(owner, date, category, amount)`` expense rows, ``end`` exclusive"""
+    source = rollup.source
+    owner = getattr(source, rollup.owner)
+    statement = select(owner, source.date, source.category, source.amount)
+    if owner_id is not None:
+        statement = statement.where(owner == owner_id)
+    else:
+        statement = statement.where(owner.isnot(None))
+    if start is not None:
+        statement = statement.where(source.date >= datetime.combine(start, time.min))
+    if end is not None:
+        statement = statement.where(source.date < datetime.combine(end, time.min))
+    return statement
+
+
+def rebuild(db: Session) -> dict:
+    """Replace both rollup tables with totals recomputed from the expenses"""
+    counts = {}
+    for name, rollup in ROLLUPS.items():
+        db.execute(delete(rollup.model))
+        buckets = aggregate(rollup, db.execute(source_rows(rollup).execution_options(yield_per=10000)))
+        values = row_values(rollup, buckets)
+        for start in range(0, len(values), REBUILD_CHUNK_SIZE):
+            db.execute(insert(rollup.model), values[start:start + REBUILD_CHUNK_SIZE])
+        counts[name] = len(values)
+    db.commit()
+    return counts
+
+
+def check(db: Session, rollup: Rollup, owner_id: Optional[int] = None) -> list:
+    """``(key, expected, stored)`` for every bucket that disagrees with the expenses.
+
+    ``expected`` or ``stored`` is None for a bucket missing on that side.
+    Totals are compared with a small tolerance, as adding amounts one at a
+    time rounds differently from summing them all at once.
+    """
+    expected = aggregate(rollup, db.execute(source_rows(rollup, owner_id)))
+    model = rollup.model
+    statement = select(
+        getattr(model, rollup.owner), getattr(model, rollup.bucket), model.category,
+        model.total, model.count, model.max_amount
+    )
+    if owner_id is not None:
+        statement = statement.where(getattr(model, rollup.owner) == owner_id)
+    stored = {(owner, bucket, category): [total, count, maximum]
+              for owner, bucket, category, total, count, maximum in db.execute(statement)}
+
+    mismatches = []
+    for key in sorted(expected.keys() | stored.keys(), key=lambda key: tuple(map(str, key))):
+        want, have = expected.get(key), stored.get(key)
+        if want is None or have is None or not (
+            want[1] == have[1]
+            and math.isclose(want[0], have[0], rel_tol=1e-9, abs_tol=1e-6)
+            and math.isclose(want[2], have[2], rel_tol=1e-9, abs_tol=1e-6)
+        ):
+            mismatches.append((key, want, have))
+    return mismatches
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.rollups", description="Maintain expense rollup tables")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal
+
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            for name, count in rebuild(db).items():
+                print(f"{name}: {count} buckets")
+            return 0
+        failed = 0
+        for name, rollup in ROLLUPS.items():
+            mismatches = check(db, rollup)
+            for key, want, have in mismatches:
+                print(f"{name} {key}: expected {want}, stored {have}")
+            print(f"{name}: {len(mismatches)} mismatched buckets")
+            failed += len(mismatches)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, constr, confloat
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, constr, confloat
+from datetime import date, datetime
+from typing import Annotated, Any, Literal, Optional, Union
 
 
 # Common base class for expense schemas
@@ -23,9 +23,44 @@ class Expense(ExpenseBase):
     id: int
     date: datetime
     user_id: int
+    version: int = 1
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class ExpenseUpdate(BaseModel):
+    """Fields to change; omitted fields keep their value and null is rejected"""
+    date: datetime = None
+    category: constr(min_length=1) = None
+    amount: confloat(ge=0) = None
+    description: Optional[str] = None
+    payment_method: constr(min_length=1) = None
+
+
+class ExpenseReplace(ExpenseCreate):
+    """Full replacement; with a version the update only applies to that version"""
+    version: Optional[int] = None
+
+
+class ExpensePatch(ExpenseUpdate):
+    version: Optional[int] = None
+
+
+class ExpenseFilter(BaseModel):
+    """Query filters for expense listings; a date-only end_date covers that whole day"""
+    start_date: Optional[Union[datetime, date]] = None
+    end_date: Optional[Union[datetime, date]] = None
+    categories: Optional[list[str]] = None
+    payment_method: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    search: Optional[str] = None
+
+
+class ExpensePage(BaseModel):
+    items: list[Expense]
+    next_cursor: Optional[str] = None
 
 
 class UserBase(BaseModel):
@@ -42,7 +77,7 @@ class User(UserBase):
     expenses: list[Expense] = []
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 class Token(BaseModel):
@@ -121,3 +156,136 @@ class GroupMemberBase(BaseModel):
 
 class GroupMember(GroupMemberBase):
     joined_at: datetime
+
+
+class MemberBalance(BaseModel):
+    user_id: int
+    full_name: Optional[str] = None
+    paid: float  # Unsettled shares of expenses this member paid for, their own included
+    owed: float  # This member's unsettled shares
+    net: float  # paid - owed; positive when the group owes the member
+
+
+class Transfer(BaseModel):
+    from_user_id: int
+    to_user_id: int
+    amount: float
+
+
+class SettlementPlan(BaseModel):
+    transfers: list[Transfer]
+    exact: bool  # True when no plan with fewer transfers exists
+
+
+class SyncChange(BaseModel):
+    seq: int
+    entity: str  # "expense", "group_expense" or "group"
+    op: str  # "upsert", "delete", or "joined" (refetch that group's expenses)
+    id: int
+    group_id: Optional[int] = None
+    updated_at: Optional[datetime] = None
+    expense: Optional[Expense] = None
+    group_expense: Optional[GroupExpense] = None
+
+
+class SyncChanges(BaseModel):
+    changes: list[SyncChange]
+    next_since: int  # Pass as ``since`` on the next call
+    has_more: bool
+
+
+class CategoryStatistics(BaseModel):
+    total: float
+    count: int
+    average: float
+    max: float
+
+
+class StatisticsSummary(CategoryStatistics):
+    pass
+
+
+class StatisticsByCategory(StatisticsSummary):
+    categories: dict[str, CategoryStatistics]
+
+
+class ReportPivot(BaseModel):
+    rows: list  # Values of the first dimension
+    columns: list  # Values of the second dimension
+    cells: dict[str, list[list[Optional[float]]]]  # Measure -> rows x columns
+
+
+class AggregateReport(BaseModel):
+    dimensions: list[str]
+    measures: list[str]
+    rows: list[dict[str, Any]]  # Dimension values and measures of each group
+    total: dict[str, Union[int, float]]  # count stays an integer
+    pivot: Optional[ReportPivot] = None
+
+
+class SearchHit(BaseModel):
+    entity: str  # "expense" or "group_expense"
+    id: int
+    group_id: Optional[int] = None
+    date: datetime
+    category: Optional[str] = None
+    amount: float
+    description: Optional[str] = None
+    score: Optional[float] = None  # BM25 relevance, higher is better; None without FTS5
+
+
+class ImportRowReport(BaseModel):
+    row: int  # Line number in the uploaded file
+    status: str  # "error" or "duplicate"
+    detail: Optional[str] = None
+
+
+class ImportReport(BaseModel):
+    imported: int
+    duplicates: int
+    failed: int
+    rows: list[ImportRowReport]
+    truncated: bool  # More rows needed reporting than IMPORT_REPORT_LIMIT
+
+
+class CreateExpenseOperation(BaseModel):
+    op: Literal["create"]
+    expense: ExpenseCreate
+    client_id: Optional[str] = None  # Echoed back so clients can map their local ids
+
+
+class UpdateExpenseOperation(BaseModel):
+    op: Literal["update"]
+    id: int
+    changes: ExpenseUpdate
+    version: Optional[int] = None
+
+
+class DeleteExpenseOperation(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+
+ExpenseOperation = Annotated[
+    Union[CreateExpenseOperation, UpdateExpenseOperation, DeleteExpenseOperation],
+    Field(discriminator="op")
+]
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    status: str  # "created", "updated", "deleted" or "error"
+    id: Optional[int] = None
+    client_id: Optional[str] = None
+    version: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BatchResult(BaseModel):
+    results: list[BatchOperationResult]
+    applied: int
+    failed: int
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: int
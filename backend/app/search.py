@@ -0,0 +1,118 @@
+"""Full-text search over personal and group expense descriptions.
+
+On SQLite the ``expense_search`` FTS5 table indexes the description and
+category of every expense, kept current by triggers on ``expenses`` and
+``group_expenses`` so bulk paths need no extra work. Personal expenses are
+stored under rowid ``2 * id`` and group expenses under ``2 * id + 1``, so
+rowid order roughly follows recency across both. An indexed ``scope``
+column holds ``u<user_id>`` or ``g<group_id>``, so restricting matches to
+what the caller may see happens inside the index instead of after it.
+Prefix indexes for 2-4 characters keep the type-ahead ``word*`` queries
+from expanding over the whole vocabulary.
+
+Matches are ranked and paged inside FTS5 with bm25(), which weights
+description over category and gives ``scope`` no weight, so it only
+filters.
+"""
+import re
+
+from fastapi import HTTPException, status
+
+SEARCH_TABLE = "expense_search"
+SEARCH_MAX_TERMS = 8
+# bm25() weights of description, category and scope; scope only filters
+COLUMN_WEIGHTS = (2.0, 1.0, 0.0)
+BM25 = f"bm25(expense_search, {', '.join(map(str, COLUMN_WEIGHTS))})"
+
+INDEX_DDL = (
+    "CREATE VIRTUAL TABLE expense_search USING fts5("
+    "description, category, scope, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+)
+
+BACKFILL = [
+    "INSERT INTO expense_search (rowid, description, category, scope) "
+    "SELECT 2 * id, description, category, 'u' || user_id FROM expenses",
+    "INSERT INTO expense_search (rowid, description, category, scope) "
+    "SELECT 2 * id + 1, description, category, 'g' || group_id FROM group_expenses",
+]
+
+# IF NOT EXISTS so they come back if a table rebuild in a migration dropped them
+TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS expenses_search_insert AFTER INSERT ON expenses BEGIN "
+    "INSERT INTO expense_search (rowid, description, category, scope) "
+    "VALUES (2 * new.id, new.description, new.category, 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_search_update "
+    "AFTER UPDATE OF description, category, user_id ON expenses BEGIN "
+    "UPDATE expense_search SET description = new.description, category = new.category, "
+    "scope = 'u' || new.user_id WHERE rowid = 2 * old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS expenses_search_delete AFTER DELETE ON expenses BEGIN "
+    "DELETE FROM expense_search WHERE rowid = 2 * old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS group_expenses_search_insert AFTER INSERT ON group_expenses BEGIN "
+    "INSERT INTO expense_search (rowid, description, category, scope) "
+    "VALUES (2 * new.id + 1, new.description, new.category, 'g' || new.group_id); END",
+    "CREATE TRIGGER IF NOT EXISTS group_expenses_search_update "
+    "AFTER UPDATE OF description, category, group_id ON group_expenses BEGIN "
+    "UPDATE expense_search SET description = new.description, category = new.category, "
+    "scope = 'g' || new.group_id WHERE rowid = 2 * old.id + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS group_expenses_search_delete AFTER DELETE ON group_expenses BEGIN "
+    "DELETE FROM expense_search WHERE rowid = 2 * old.id + 1; END",
+]
+
+WORD = re.compile(r"\w+")
+
+# bm25() is lower for better matches; ties go to the newer row
+SEARCH_QUERY = (
+    f"SELECT rowid, -{BM25} AS score FROM expense_search "
+    f"WHERE expense_search MATCH :match ORDER BY {BM25}, rowid DESC LIMIT :limit OFFSET :skip"
+)
+
+
+def create_index(target, connection, **kw):
+    """Metadata after_create hook building the FTS5 table and its triggers.
+
+    The index is filled from existing rows only when it is first created.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'expense_search'"
+    ).first()
+    if not exists:
+        connection.exec_driver_sql(INDEX_DDL)
+        for statement in BACKFILL:
+            connection.exec_driver_sql(statement)
+    for statement in TRIGGERS:
+        connection.exec_driver_sql(statement)
+
+
+def drop_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS expense_search")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Alembic filter hiding the FTS5 table and its shadow tables from autogenerate"""
+    return not (type_ == "table" and name.startswith(SEARCH_TABLE))
+
+
+def search_terms(query: str) -> list:
+    """Words of a user query; punctuation and FTS5 operators are dropped"""
+    terms = WORD.findall(query)[:SEARCH_MAX_TERMS]
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Search needs at least one word"
+        )
+    return terms
+
+
+def decode_rowid(rowid: int):
+    """(is_group_expense, id) of an index rowid"""
+    return bool(rowid % 2), rowid // 2
+
+
+def match_expression(terms: list, user_id: int, group_ids: list) -> str:
+    """FTS5 MATCH of every term as a prefix, limited to the caller's scopes"""
+    scopes = " OR ".join([f"u{user_id}"] + [f"g{group_id}" for group_id in group_ids])
+    words = " AND ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+    return f"scope : ({scopes}) AND {{description category}} : ({words})"
@@ -0,0 +1,57 @@
+"""Lean responses for list endpoints, opted into with ``lean=true``.
+
+The crud layer selects only the response columns as plain rows; here each
+row becomes a dict through key tuples worked out once from the response
+schemas, so there is no ORM hydration and no pydantic validation per row,
+and orjson writes the body. The JSON matches what the schemas produce.
+"""
+import orjson
+from fastapi import Response
+
+from . import models, schemas
+
+EXPENSE_FIELDS = tuple(schemas.Expense.model_fields)
+EXPENSE_COLUMNS = [getattr(models.Expense, field) for field in EXPENSE_FIELDS]
+
+GROUP_EXPENSE_FIELDS = ("id", "category", "amount", "description", "date", "paid_by")
+GROUP_EXPENSE_COLUMNS = [getattr(models.GroupExpense, field) for field in GROUP_EXPENSE_FIELDS]
+
+SPLIT_FIELDS = tuple(schemas.ExpenseSplit.model_fields)
+SPLIT_COLUMNS = [getattr(models.ExpenseSplit, field) for field in SPLIT_FIELDS]
+
+
+def expenses(rows) -> list:
+    """schemas.Expense dicts of EXPENSE_COLUMNS rows"""
+    return [dict(zip(EXPENSE_FIELDS, row)) for row in rows]
+
+
+def group_expenses(rows, splits, user_id: int) -> list:
+    """schemas.GroupExpense dicts of GROUP_EXPENSE_COLUMNS rows and their SPLIT_COLUMNS splits"""
+    by_expense = {}
+    for split in splits:
+        by_expense.setdefault(split.expense_id, []).append(dict(zip(SPLIT_FIELDS, split)))
+    items = []
+    for id, category, amount, description, date, paid_by in rows:
+        expense_splits = by_expense.get(id, [])
+        items.append({
+            "category": category,
+            "amount": amount,
+            "description": description,
+            "date": date,
+            # Not stored; the full path reports the schema defaults too
+            "split_type": "equal",
+            "custom_splits": None,
+            "id": id,
+            "paid_by": paid_by,
+            "splits": expense_splits,
+            "user_split": float(next(
+                (split["amount"] for split in expense_splits if split["user_id"] == user_id), 0
+            )),
+            "is_paid_by_user": paid_by == user_id,
+        })
+    return items
+
+
+def json_response(content, response: Response) -> Response:
+    """orjson-encoded body keeping the headers (ETag, Cache-Control) set on ``response``"""
+    return Response(orjson.dumps(content), media_type="application/json", headers=dict(response.headers))
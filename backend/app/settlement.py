@@ -0,0 +1,130 @@
+"""Settlement plans: the transfers that bring every group balance to zero.
+
+Nets are settled in whole cents. Groups with at most
+``EXACT_SETTLEMENT_MAX_MEMBERS`` unsettled members are solved exactly:
+a plan needs one transfer fewer than members for every independent subset
+whose nets sum to zero, so a bitmask DP over subsets finds the largest
+number of such subsets and each is settled on its own. Debts and credits
+of exactly equal size are paired before either solver runs. Larger groups
+are matched greedily in O(n log n): the largest debtor repeatedly pays
+the largest creditor, taken from two heaps, which never needs more than
+n - 1 transfers.
+"""
+import heapq
+import os
+from typing import NamedTuple
+
+# Members left after exact pairs up to which plans are provably minimal;
+# the subset DP doubles in cost with each one
+EXACT_SETTLEMENT_MAX_MEMBERS = int(os.getenv("EXACT_SETTLEMENT_MAX_MEMBERS", "12"))
+
+
+class Transfer(NamedTuple):
+    from_user_id: int
+    to_user_id: int
+    cents: int
+
+
+def to_cents(balances: list) -> dict:
+    """Non-zero nets of ``balances`` in cents, keyed by user id.
+
+    Nets are rounded per member, so they can miss zero by a few cents;
+    that residue is absorbed by the largest balance on the side it came
+    from rather than left for somebody to pay.
+    """
+    cents = {balance["user_id"]: round(balance["net"] * 100) for balance in balances}
+    residue = sum(cents.values())
+    if residue:
+        largest = max(cents, key=lambda user_id: cents[user_id] if residue > 0 else -cents[user_id])
+        cents[largest] -= residue
+    return {user_id: amount for user_id, amount in cents.items() if amount}
+
+
+def _exact_pairs(cents: dict):
+    """Transfers between debtors and creditors of exactly equal size, and the nets left over.
+
+    Some minimal plan always settles such a pair on its own, so pairing
+    them first is safe for the exact solver too.
+    """
+    creditors = {}
+    for user_id, amount in sorted(cents.items()):
+        if amount > 0:
+            creditors.setdefault(amount, []).append(user_id)
+    transfers = []
+    rest = {}
+    for user_id, amount in sorted(cents.items()):
+        if amount < 0:
+            matching = creditors.get(-amount)
+            if matching:
+                transfers.append(Transfer(user_id, matching.pop(), -amount))
+            else:
+                rest[user_id] = amount
+    rest.update((user_id, amount) for amount, users in creditors.items() for user_id in users)
+    return transfers, rest
+
+
+def _greedy(cents: dict) -> list:
+    """Transfers settling ``cents`` from the largest debtor to the largest creditor, repeatedly"""
+    debtors = [(amount, user_id) for user_id, amount in cents.items() if amount < 0]
+    creditors = [(-amount, user_id) for user_id, amount in cents.items() if amount > 0]
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+    transfers = []
+    while debtors:
+        debt, debtor = heapq.heappop(debtors)
+        credit, creditor = heapq.heappop(creditors)
+        paid = min(-debt, -credit)
+        transfers.append(Transfer(debtor, creditor, paid))
+        if debt + paid:
+            heapq.heappush(debtors, (debt + paid, debtor))
+        if credit + paid:
+            heapq.heappush(creditors, (credit + paid, creditor))
+    return transfers
+
+
+def _zero_sum_subsets(amounts: list) -> list:
+    """As many disjoint zero-sum subsets of ``amounts`` as possible, as bitmasks covering them all"""
+    bits = [1 << i for i in range(len(amounts))]
+    size = 1 << len(amounts)
+    sums = [0] * size
+    best = [0] * size
+    for mask in range(1, size):
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + amounts[low.bit_length() - 1]
+        best[mask] = max(best[mask ^ bit] for bit in bits if mask & bit) + (sums[mask] == 0)
+
+    # Walk down from the full set; consecutive zero-sum masks bound one subset
+    subsets = []
+    mask = boundary = size - 1
+    while mask:
+        target = best[mask] - (sums[mask] == 0)
+        mask = next(mask ^ bit for bit in bits if mask & bit and best[mask ^ bit] == target)
+        if sums[mask] == 0:
+            subsets.append(boundary ^ mask)
+            boundary = mask
+    return subsets
+
+
+def plan(balances: list) -> dict:
+    """Transfers settling ``balances`` as returned by crud.get_group_balances.
+
+    ``exact`` is true when the plan is known to use the fewest transfers.
+    """
+    transfers, cents = _exact_pairs(to_cents(balances))
+    if len(cents) <= EXACT_SETTLEMENT_MAX_MEMBERS:
+        members = sorted(cents)
+        for subset in _zero_sum_subsets([cents[user_id] for user_id in members]):
+            transfers += _greedy({
+                user_id: cents[user_id] for i, user_id in enumerate(members) if subset >> i & 1
+            })
+        exact = True
+    else:
+        transfers += _greedy(cents)
+        exact = False
+    return {
+        "transfers": [
+            {"from_user_id": debtor, "to_user_id": creditor, "amount": amount / 100}
+            for debtor, creditor, amount in transfers
+        ],
+        "exact": exact,
+    }
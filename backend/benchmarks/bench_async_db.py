@@ -0,0 +1,103 @@
+"""Compare request concurrency of the threadpool and AsyncSession paths.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_async_db --rows 20000 --concurrency 200
+
+Both modes issue the same ``crud_async.get_expenses`` calls; the sync mode
+runs them on plain Sessions in the anyio threadpool (40 threads by default),
+the async mode runs them on aiosqlite-backed AsyncSessions.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import crud_async, models
+from app.database import Base, create_async_session_factory
+
+
+def seed(url: str, rows: int) -> int:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        user_id = connection.execute(
+            insert(models.User).values(email="bench@example.com", hashed_password="x", full_name="Bench")
+        ).inserted_primary_key[0]
+        start = datetime(2020, 1, 1)
+        connection.execute(insert(models.Expense), [
+            {
+                "user_id": user_id,
+                "date": start + timedelta(minutes=i),
+                "category": f"category-{i % 12}",
+                "amount": float(i % 500),
+                "description": f"expense {i}",
+                "payment_method": "Card",
+            }
+            for i in range(rows)
+        ])
+    engine.dispose()
+    return user_id
+
+
+async def run_requests(open_session, user_id: int, requests: int, concurrency: int, limit: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            db = open_session()
+            try:
+                await crud_async.get_expenses(db, user_id=user_id, skip=(i * limit) % 10000, limit=limit)
+            finally:
+                result = db.close()
+                if asyncio.iscoroutine(result):
+                    await result
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        user_id = seed(url, args.rows)
+
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            pool_size=args.concurrency
+        )
+        sync_factory = sessionmaker(bind=engine)
+        sync_elapsed = asyncio.run(
+            run_requests(sync_factory, user_id, args.requests, args.concurrency, args.limit)
+        )
+        engine.dispose()
+
+        async_factory = create_async_session_factory(url)
+
+        async def run_async():
+            elapsed = await run_requests(async_factory, user_id, args.requests, args.concurrency, args.limit)
+            await async_factory.kw["bind"].dispose()
+            return elapsed
+
+        async_elapsed = asyncio.run(run_async())
+
+    for mode, elapsed in (("sync (threadpool)", sync_elapsed), ("async (aiosqlite)", async_elapsed)):
+        print(f"{mode:<20} {args.requests / elapsed:10.1f} req/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare reconstructing group balances on the client with GET /groups/{id}/balances.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_balances --expenses 20000 --members 6
+
+A group of ``--members`` users gets ``--expenses`` equally split expenses,
+bulk inserted. The client-side path downloads the whole history with
+GET /groups/{id}/expenses/ and folds ``splits`` per member; the server-side
+path asks for the balances. Bytes on the wire and latency are reported.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=20000)
+    parser.add_argument("--members", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'balances.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert, select
+    from app import crud, models
+    from app.database import SessionLocal
+    from app.main import app
+
+    with TestClient(app) as client:
+        headers = []
+        for n in range(args.members):
+            user = {"email": f"bench{n}@example.com", "password": "bench", "full_name": f"Bench {n}"}
+            client.post("/users/", json=user)
+            token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+            headers.append({"Authorization": f"Bearer {token['access_token']}"})
+        group = client.post("/groups/", json={"name": "Bench"}, headers=headers[0]).json()
+        for member in headers[1:]:
+            client.post(f"/groups/{group['id']}/join", headers=member)
+
+        with SessionLocal() as db:
+            member_ids = db.scalars(
+                select(models.GroupMember.user_id).where(models.GroupMember.group_id == group["id"])
+            ).all()
+            start = datetime(2022, 1, 1)
+            expense_ids = db.scalars(insert(models.GroupExpense).returning(models.GroupExpense.id), [
+                {
+                    "group_id": group["id"], "paid_by": member_ids[i % len(member_ids)],
+                    "date": start + timedelta(hours=i), "category": "Food", "amount": float(i % 90 + 10),
+                }
+                for i in range(args.expenses)
+            ]).all()
+            db.execute(insert(models.ExpenseSplit), [
+                {"expense_id": expense_id, "user_id": user_id, "amount": float(i % 90 + 10) / len(member_ids)}
+                for i, expense_id in enumerate(expense_ids)
+                for user_id in member_ids
+            ])
+            db.commit()
+            # Bulk inserts bypass crud, so bring the balance ledger in line once
+            crud.reconcile_balances(db, group["id"])
+
+        def client_side():
+            response = client.get(
+                f"/groups/{group['id']}/expenses/", params={"limit": args.expenses}, headers=headers[0]
+            )
+            net = {}
+            for expense in response.json():
+                net[expense["paid_by"]] = net.get(expense["paid_by"], 0) + expense["amount"]
+                for split in expense["splits"]:
+                    net[split["user_id"]] = net.get(split["user_id"], 0) - split["amount"]
+            return len(response.content)
+
+        def server_side():
+            return len(client.get(f"/groups/{group['id']}/balances", headers=headers[0]).content)
+
+        print(f"{'balances':<12} {'bytes':>10} {'ms':>8}")
+        for name, fold in (("client-side", client_side), ("server-side", server_side)):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                size = fold()
+            elapsed = (time.perf_counter() - started) / args.repeat * 1000
+            print(f"{name:<12} {size:10d} {elapsed:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare replaying an offline queue as single requests and as one batch.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_batch --operations 200
+
+The queue holds creates, updates and deletes in equal parts. It is replayed
+once as individual POST /expenses/ and DELETE /expenses/{id} requests plus
+one-op batches for the updates, and once as a single POST /batch/expenses.
+Commits are counted with a Session after_commit listener.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--operations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'batch.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from app.main import app
+
+    commits = 0
+
+    @event.listens_for(Session, "after_commit")
+    def count_commit(session):
+        nonlocal commits
+        commits += 1
+
+    expense = {"date": "2024-01-05T09:00:00", "category": "Food", "amount": 1.0,
+               "payment_method": "Card", "description": "queued"}
+    per_kind = args.operations // 3
+
+    with TestClient(app) as client:
+        user = {"email": "bench@example.com", "password": "bench", "full_name": "Bench"}
+        client.post("/users/", json=user)
+        token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        def seed():
+            return [client.post("/expenses/", json=expense, headers=headers).json()["id"]
+                    for _ in range(2 * per_kind)]
+
+        ids = seed()
+        commits, started = 0, time.perf_counter()
+        for _ in range(per_kind):
+            client.post("/expenses/", json=expense, headers=headers)
+        for expense_id in ids[:per_kind]:
+            client.post("/batch/expenses", headers=headers, json={"operations": [
+                {"op": "update", "id": expense_id, "changes": {"amount": 2.0}}
+            ]})
+        for expense_id in ids[per_kind:]:
+            client.delete(f"/expenses/{expense_id}", headers=headers)
+        single = time.perf_counter() - started
+        single_commits = commits
+
+        ids = seed()
+        operations = (
+            [{"op": "create", "expense": expense}] * per_kind
+            + [{"op": "update", "id": i, "changes": {"amount": 2.0}} for i in ids[:per_kind]]
+            + [{"op": "delete", "id": i} for i in ids[per_kind:]]
+        )
+        commits, started = 0, time.perf_counter()
+        client.post("/batch/expenses", headers=headers, json={"operations": operations})
+        batched = time.perf_counter() - started
+
+    print(f"{'replay':<10} {'ops':>5} {'seconds':>8} {'commits':>8}")
+    print(f"{'single':<10} {3 * per_kind:5d} {single:8.3f} {single_commits:8d}")
+    print(f"{'batch':<10} {3 * per_kind:5d} {batched:8.3f} {commits:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare cleaning up expenses one DELETE at a time and with DELETE /expenses/.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_bulk_delete --rows 5000
+
+Two identical imports of ``--rows`` expenses are removed, once with one
+DELETE /expenses/{id} per row and once with a single DELETE /expenses/
+carrying the id list. Commits are counted with a Session after_commit
+listener; the bulk path commits once per BULK_DELETE_CHUNK_SIZE rows.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'bulk_delete.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from app.main import app
+
+    commits = 0
+
+    @event.listens_for(Session, "after_commit")
+    def count_commit(session):
+        nonlocal commits
+        commits += 1
+
+    with TestClient(app) as client:
+        user = {"email": "bench@example.com", "password": "bench", "full_name": "Bench"}
+        client.post("/users/", json=user)
+        token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        def seed():
+            rows = "".join(
+                f"2024-01-01T00:00:00,Food,{i}.5,row {i},Card\n" for i in range(args.rows)
+            )
+            upload = "date,category,amount,description,payment_method\n" + rows
+            client.post("/expenses/import", headers=headers,
+                        files={"file": ("seed.csv", upload, "text/csv")})
+            return [e["id"] for e in client.get(
+                "/expenses/", params={"limit": args.rows}, headers=headers
+            ).json()]
+
+        ids = seed()
+        commits, started = 0, time.perf_counter()
+        for expense_id in ids:
+            client.delete(f"/expenses/{expense_id}", headers=headers)
+        single = time.perf_counter() - started
+        single_commits = commits
+
+        ids = seed()
+        commits, started = 0, time.perf_counter()
+        response = client.request("DELETE", "/expenses/", json={"ids": ids}, headers=headers)
+        bulk = time.perf_counter() - started
+        assert response.json()["deleted"] == len(ids)
+
+    print(f"{'cleanup':<10} {'rows':>6} {'seconds':>8} {'commits':>8}")
+    print(f"{'single':<10} {len(ids):6d} {single:8.3f} {single_commits:8d}")
+    print(f"{'bulk':<10} {len(ids):6d} {bulk:8.3f} {commits:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Measure time to first byte, throughput and server memory of the export.
+
+Run from the backend directory (Linux, reads /proc for the server's RSS):
+
+    python -m benchmarks.bench_export --expenses 20000 200000
+
+For each history size a scratch database is seeded for one user and a
+uvicorn server is started on it. /expenses/export is streamed in both
+formats, then the same history is fetched by paging /expenses/ with a
+cursor, 100 rows per request, for comparison. The server's peak RSS
+(VmHWM) is reported after each phase and should not grow with the history.
+"""
+import argparse
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def seed(path: str, count: int):
+    from sqlalchemy import create_engine
+    from app import models
+
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "INSERT INTO users (id, email, hashed_password, full_name, token_version) "
+        "VALUES (1, 'bench@example.com', 'x', 'Bench', 0)"
+    )
+    connection.executemany(
+        "INSERT INTO expenses (user_id, date, category, amount, description, payment_method) "
+        "VALUES (1, datetime('2015-01-01', ? || ' minutes'), 'Food', 12.5, 'Lunch with the team', 'Card')",
+        ((i,) for i in range(count))
+    )
+    connection.commit()
+    connection.close()
+
+
+def peak_rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run(path: str, count: int):
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(base + "/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        from app.main import create_access_token
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": "1", "ver": 0})}
+
+        with httpx.Client(base_url=base, headers=headers, timeout=600) as client:
+            for format in ("csv", "ndjson"):
+                started = time.perf_counter()
+                first, size = None, 0
+                with client.stream("GET", "/expenses/export", params={"format": format}) as response:
+                    for chunk in response.iter_bytes():
+                        if first is None:
+                            first = time.perf_counter() - started
+                        size += len(chunk)
+                total = time.perf_counter() - started
+                print(f"{count:>8} {format:>7} {first * 1000:9.1f} {total:8.2f} "
+                      f"{size / 2**20:8.1f} {peak_rss_mib(server.pid):9.1f}")
+
+            started = time.perf_counter()
+            first, size, cursor = None, 0, ""
+            while cursor is not None:
+                response = client.get("/expenses/", params={"cursor": cursor, "limit": 100})
+                if first is None:
+                    first = time.perf_counter() - started
+                size += len(response.content)
+                cursor = response.json()["next_cursor"]
+            total = time.perf_counter() - started
+            print(f"{count:>8} {'paged':>7} {first * 1000:9.1f} {total:8.2f} "
+                  f"{size / 2**20:8.1f} {peak_rss_mib(server.pid):9.1f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, nargs="+", default=[20000, 200000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'mode':>7} {'TTFB ms':>9} {'total s':>8} {'MiB out':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.expenses:
+            path = os.path.join(directory, f"export{count}.db")
+            seed(path, count)
+            run(path, count)
+
+
+if __name__ == "__main__":
+    main()
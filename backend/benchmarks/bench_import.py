@@ -0,0 +1,70 @@
+"""Compare statement import with one POST /expenses/ per row.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_import --rows 100000
+
+A synthetic CSV statement is uploaded to /expenses/import against a scratch
+database, then uploaded again to time the duplicate check alone. A sample of
+single POST /expenses/ calls is timed and extrapolated to the same row count.
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+
+def statement(rows: int) -> bytes:
+    out = io.StringIO()
+    out.write("date,category,amount,description,payment_method\n")
+    for i in range(rows):
+        out.write(f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:{i % 60:02d}:00,"
+                  f"category-{i % 9},{i % 500 + 0.25},statement row {i},Card\n")
+    return out.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--single-sample", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'import.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        user = {"email": "bench@example.com", "password": "bench", "full_name": "Bench"}
+        client.post("/users/", json=user)
+        token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        body = statement(args.rows)
+
+        for label in ("import", "re-import (all duplicates)"):
+            started = time.perf_counter()
+            report = client.post(
+                "/expenses/import", headers=headers, files={"file": ("statement.csv", body, "text/csv")}
+            ).json()
+            elapsed = time.perf_counter() - started
+            print(f"{label:<28} {elapsed:7.2f}s  {args.rows / elapsed:9.0f} rows/s  "
+                  f"imported={report['imported']} duplicates={report['duplicates']} failed={report['failed']}")
+
+        started = time.perf_counter()
+        for i in range(args.single_sample):
+            client.post("/expenses/", headers=headers, json={
+                "date": "2024-01-01T00:00:00", "category": "Food", "amount": 1.0,
+                "description": f"single {i}", "payment_method": "Card"
+            })
+        per_row = (time.perf_counter() - started) / args.single_sample
+        print(f"{'single POSTs (extrapolated)':<28} {per_row * args.rows:7.2f}s  {1 / per_row:9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Measure the hot-path queries with and without the composite indexes.
+
+Run from the backend directory (seeding the default size takes a minute):
+
+    python -m benchmarks.bench_indexes --expenses 2000000 --group-expenses 1000000
+
+The database is built with the model schema, the composite indexes from
+migration 0003 are dropped, every query shape is timed, and then the
+indexes are recreated and the queries timed again.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from app import models
+
+COMPOSITE_INDEXES = {
+    "ix_expenses_user_id_date": "CREATE INDEX ix_expenses_user_id_date ON expenses (user_id, date)",
+    "ix_group_expenses_group_id_date":
+        "CREATE INDEX ix_group_expenses_group_id_date ON group_expenses (group_id, date)",
+    "ix_expense_splits_expense_id_user_id":
+        "CREATE INDEX ix_expense_splits_expense_id_user_id ON expense_splits (expense_id, user_id)",
+    "ix_group_members_group_id_user_id":
+        "CREATE UNIQUE INDEX ix_group_members_group_id_user_id ON group_members (group_id, user_id)",
+    "ix_group_members_user_id_group_id":
+        "CREATE INDEX ix_group_members_user_id_group_id ON group_members (user_id, group_id)",
+}
+
+QUERIES = {
+    "list expenses (user_id, date)":
+        "SELECT * FROM expenses WHERE user_id = :user ORDER BY date, id LIMIT 100",
+    "list group expenses (group_id, date)":
+        "SELECT * FROM group_expenses WHERE group_id = :group ORDER BY date, id LIMIT 100",
+    "user split (expense_id, user_id)":
+        "SELECT amount FROM expense_splits WHERE expense_id = :expense AND user_id = :user",
+    "membership check (group_id, user_id)":
+        "SELECT id FROM group_members WHERE group_id = :group AND user_id = :user",
+    "user groups (user_id, group_id)":
+        "SELECT groups.* FROM groups JOIN group_members ON groups.id = group_members.group_id "
+        "WHERE group_members.user_id = :user LIMIT 100",
+}
+
+
+def seed(path: str, args):
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+    for name in COMPOSITE_INDEXES:
+        connection.execute(f"DROP INDEX {name}")
+    start = datetime(2015, 1, 1)
+    rng = random.Random(42)
+
+    connection.executemany(
+        "INSERT INTO users (id, email, hashed_password, full_name) VALUES (?, ?, 'x', 'Bench')",
+        ((i, f"bench{i}@example.com") for i in range(1, args.users + 1))
+    )
+    connection.executemany(
+        "INSERT INTO expenses (user_id, date, category, amount, description, payment_method) "
+        "VALUES (?, ?, ?, ?, ?, 'Card')",
+        (
+            (rng.randint(1, args.users), start + timedelta(minutes=rng.randint(0, 5_000_000)),
+             f"category-{i % 12}", float(i % 500), f"expense {i}")
+            for i in range(args.expenses)
+        )
+    )
+    connection.executemany(
+        "INSERT INTO groups (id, name, created_by) VALUES (?, ?, ?)",
+        ((g, f"group {g}", rng.randint(1, args.users)) for g in range(1, args.groups + 1))
+    )
+    members = {
+        g: rng.sample(range(1, args.users + 1), args.members_per_group)
+        for g in range(1, args.groups + 1)
+    }
+    connection.executemany(
+        "INSERT INTO group_members (group_id, user_id) VALUES (?, ?)",
+        ((g, user) for g, users in members.items() for user in users)
+    )
+    expense_groups = [rng.randint(1, args.groups) for _ in range(args.group_expenses)]
+    connection.executemany(
+        "INSERT INTO group_expenses (id, group_id, paid_by, date, category, amount, description) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, g, members[g][0], start + timedelta(minutes=rng.randint(0, 5_000_000)),
+             f"category-{i % 12}", 30.0, f"group expense {i}")
+            for i, g in enumerate(expense_groups, start=1)
+        )
+    )
+    connection.executemany(
+        "INSERT INTO expense_splits (expense_id, user_id, amount, paid) VALUES (?, ?, 10.0, 0)",
+        ((i, user) for i, g in enumerate(expense_groups, start=1) for user in members[g])
+    )
+    connection.commit()
+    connection.execute("ANALYZE")
+    return connection
+
+
+def time_queries(connection, args) -> dict:
+    rng = random.Random(7)
+    pairs = connection.execute(
+        "SELECT group_id, user_id FROM group_members ORDER BY random() LIMIT ?", (args.iterations,)
+    ).fetchall()
+    results = {}
+    for label, sql in QUERIES.items():
+        started = time.perf_counter()
+        for group_id, user_id in pairs:
+            connection.execute(sql, {
+                "user": user_id,
+                "group": group_id,
+                "expense": rng.randint(1, args.group_expenses),
+            }).fetchall()
+        results[label] = (time.perf_counter() - started) / len(pairs) * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--expenses", type=int, default=2000000)
+    parser.add_argument("--groups", type=int, default=5000)
+    parser.add_argument("--members-per-group", type=int, default=4)
+    parser.add_argument("--group-expenses", type=int, default=1000000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        connection = seed(os.path.join(directory, "bench.db"), args)
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+        before = time_queries(connection, args)
+        for sql in COMPOSITE_INDEXES.values():
+            connection.execute(sql)
+        connection.execute("ANALYZE")
+        after = time_queries(connection, args)
+        connection.close()
+
+    print(f"{'query':<40} {'no index ms':>12} {'indexed ms':>12} {'speedup':>9}")
+    for label in QUERIES:
+        print(f"{label:<40} {before[label]:12.3f} {after[label]:12.3f} {before[label] / after[label]:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure list throughput with and without the lean read path.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_lean --rows 5000 --group-rows 1000
+
+``--rows`` personal expenses are imported and ``--group-rows`` group
+expenses (split between two members) are created. Each list endpoint is
+then read ``--repeat`` times as one large page, with and without
+``lean=true``, and throughput is reported in rows per second.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--group-rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'lean.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        headers = []
+        for email in ("bench@example.com", "bench2@example.com"):
+            user = {"email": email, "password": "bench", "full_name": "Bench"}
+            client.post("/users/", json=user)
+            token = client.post("/token", data={"username": email, "password": "bench"}).json()
+            headers.append({"Authorization": f"Bearer {token['access_token']}"})
+
+        rows = "".join(
+            f"2024-01-01T00:00:00,Food,{i}.5,row {i},Card\n" for i in range(args.rows)
+        )
+        upload = "date,category,amount,description,payment_method\n" + rows
+        client.post("/expenses/import", headers=headers[0], files={"file": ("seed.csv", upload, "text/csv")})
+
+        group = client.post("/groups/", json={"name": "Bench"}, headers=headers[0]).json()
+        client.post(f"/groups/{group['id']}/join", headers=headers[1])
+        for i in range(args.group_rows):
+            client.post(f"/groups/{group['id']}/expenses", headers=headers[0], json={
+                "date": "2024-01-01T00:00:00", "category": "Food", "amount": 10.0,
+                "description": f"shared {i}", "split_type": "equal"
+            })
+
+        endpoints = (
+            ("/expenses/", args.rows),
+            (f"/groups/{group['id']}/expenses/", args.group_rows),
+        )
+        print(f"{'endpoint':<28} {'rows':>6} {'full rows/s':>12} {'lean rows/s':>12} {'speedup':>8}")
+        for url, count in endpoints:
+            rates = []
+            for lean in (False, True):
+                params = {"limit": count, "lean": "true" if lean else "false"}
+                assert len(client.get(url, params=params, headers=headers[0]).json()) == count
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    client.get(url, params=params, headers=headers[0])
+                rates.append(count * args.repeat / (time.perf_counter() - started))
+            print(f"{url:<28} {count:6d} {rates[0]:12.0f} {rates[1]:12.0f} {rates[1] / rates[0]:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
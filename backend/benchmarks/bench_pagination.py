@@ -0,0 +1,75 @@
+"""Compare offset and keyset (cursor) page latency at increasing depths.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pagination --expenses 200000
+
+One user owns every expense, so page depth is the only variable. Each depth
+is fetched with ``crud.get_expenses`` (OFFSET) and ``crud.get_expenses_page``
+(cursor taken from the row just before that depth).
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.database import make_engine
+from app.pagination import encode_cursor
+
+
+def seed(path: str, count: int):
+    engine = make_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    connection = sqlite3.connect(path)
+    connection.execute("INSERT INTO users (id, email, hashed_password, full_name) VALUES (1, 'b@x', 'x', 'B')")
+    start = datetime(2015, 1, 1)
+    connection.executemany(
+        "INSERT INTO expenses (user_id, date, category, amount, description, payment_method) "
+        "VALUES (1, ?, 'Food', 1.0, 'bench', 'Card')",
+        ((start + timedelta(minutes=i * 7 % count),) for i in range(count))
+    )
+    connection.commit()
+    connection.execute("ANALYZE")
+    connection.close()
+    return engine
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = seed(os.path.join(directory, "bench.db"), args.expenses)
+        print(f"{'depth':>8} {'offset ms':>10} {'cursor ms':>10}")
+        with Session(engine) as db:
+            for depth in (0, args.expenses // 100, args.expenses // 10, args.expenses // 2, args.expenses - args.limit):
+                cursor = ""
+                if depth:
+                    row = db.query(models.Expense.date, models.Expense.id)\
+                            .order_by(models.Expense.date, models.Expense.id)\
+                            .offset(depth - 1).first()
+                    cursor = encode_cursor(row.date, row.id)
+                offset_ms = timed(lambda: crud.get_expenses(db, 1, skip=depth, limit=args.limit), args.repeat)
+                cursor_ms = timed(lambda: crud.get_expenses_page(db, 1, cursor=cursor, limit=args.limit), args.repeat)
+                db.expunge_all()
+                print(f"{depth:>8} {offset_ms:10.2f} {cursor_ms:10.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
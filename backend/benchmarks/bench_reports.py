@@ -0,0 +1,94 @@
+"""Time GET /reports/aggregate over a large history.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_reports --rows 100000
+
+``--rows`` expenses over three years are imported for one user. Each
+report shape is timed through the endpoint, and the crud call is split
+into the columnar fetch and the NumPy aggregation to show where the time
+goes.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'reports.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from app import crud, reports
+    from app.database import SessionLocal
+    from app.main import app
+
+    categories = ["Food", "Travel", "Rent", "Health", "Fun"]
+    methods = ["Card", "Cash", "Transfer"]
+    with TestClient(app) as client:
+        user = {"email": "bench@example.com", "password": "bench", "full_name": "Bench"}
+        client.post("/users/", json=user)
+        token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        rows = "".join(
+            f"{2022 + i % 3}-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:00:00,"
+            f"{categories[i % 5]},{i % 97}.5,row {i},{methods[i % 3]}\n"
+            for i in range(args.rows)
+        )
+        upload = "date,category,amount,description,payment_method\n" + rows
+        client.post("/expenses/import", headers=headers, files={"file": ("seed.csv", upload, "text/csv")})
+        with SessionLocal() as db:
+            user_id = crud.get_user_by_email(db, user["email"]).id
+
+        shapes = {
+            "total": {},
+            "category": {"group_by": "category", "measure": ["sum", "count", "mean"]},
+            "category x month pivot": {
+                "group_by": ["category", "month"], "measure": ["sum", "median", "p90", "max"], "pivot": "true"
+            },
+            "day x payment method": {"group_by": ["day", "payment_method"], "measure": ["sum", "count"]},
+        }
+        print(f"{'report':<24} {'groups':>7} {'endpoint ms':>12} {'fetch ms':>9} {'numpy ms':>9}")
+        for name, params in shapes.items():
+            groups = len(client.get("/reports/aggregate", headers=headers, params=params).json()["rows"])
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                client.get("/reports/aggregate", headers=headers, params=params)
+            endpoint = (time.perf_counter() - started) / args.repeat * 1000
+
+            dimensions = params.get("group_by", [])
+            dimensions = [dimensions] if isinstance(dimensions, str) else dimensions
+            measures = params.get("measure", ["sum", "count"])
+            captured = {}
+            original = reports.aggregate
+
+            def capture(columns, *rest, **kw):
+                captured["columns"] = columns
+                return {}
+            reports.aggregate = capture
+            with SessionLocal() as db:
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    crud.aggregate_expenses(db, user_id, dimensions, measures)
+                fetch = (time.perf_counter() - started) / args.repeat * 1000
+            reports.aggregate = original
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                reports.aggregate(captured["columns"], dimensions, measures, pivot="pivot" in params)
+            numpy_ms = (time.perf_counter() - started) / args.repeat * 1000
+            print(f"{name:<24} {groups:7d} {endpoint:12.1f} {fetch:9.1f} {numpy_ms:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare statistics read from the daily rollups with GROUP BY over the expenses.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_rollups --rows 200000
+
+``--rows`` expenses spread over three years are imported, then
+GET /statistics/by_category is timed for the whole history and for one
+year: once with whole-day bounds (answered from daily_expense_rollups)
+and once with ``min_amount=0``, which matches the same rows but makes the
+crud layer group the expenses. The cost on the write side is reported as
+the latency of POST /expenses/.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'rollups.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    categories = ["Food", "Travel", "Rent", "Health", "Fun"]
+    with TestClient(app) as client:
+        user = {"email": "bench@example.com", "password": "bench", "full_name": "Bench"}
+        client.post("/users/", json=user)
+        token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        rows = "".join(
+            f"{2022 + i % 3}-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:00:00,"
+            f"{categories[i % 5]},{i % 97}.5,row {i},Card\n"
+            for i in range(args.rows)
+        )
+        upload = "date,category,amount,description,payment_method\n" + rows
+        client.post("/expenses/import", headers=headers, files={"file": ("seed.csv", upload, "text/csv")})
+
+        def timed(call) -> float:
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                call()
+            return (time.perf_counter() - started) / args.repeat * 1000
+
+        windows = {
+            "all history": {},
+            "one year": {"start_date": "2023-01-01", "end_date": "2023-12-31"},
+        }
+        print(f"{'window':<12} {'rollups ms':>11} {'group by ms':>12}")
+        for name, params in windows.items():
+            rollup = client.get("/statistics/by_category", headers=headers, params=params).json()
+            scan = client.get("/statistics/by_category", headers=headers, params={**params, "min_amount": 0}).json()
+            assert rollup["count"] == scan["count"]
+            from_rollups = timed(lambda: client.get("/statistics/by_category", headers=headers, params=params))
+            from_expenses = timed(lambda: client.get(
+                "/statistics/by_category", headers=headers, params={**params, "min_amount": 0}
+            ))
+            print(f"{name:<12} {from_rollups:11.1f} {from_expenses:12.1f}")
+
+        expense = {"date": "2024-06-01T12:00:00", "category": "Food", "amount": 3.5, "payment_method": "Card"}
+        created = timed(lambda: client.post("/expenses/", json=expense, headers=headers))
+        print(f"POST /expenses/: {created:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
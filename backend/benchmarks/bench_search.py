@@ -0,0 +1,95 @@
+"""Compare FTS5 search with an ILIKE scan on a large expense table.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search --rows 1000000 --users 1000
+
+``--rows`` expenses with random descriptions are spread over ``--users``
+users, the index being filled by its triggers as rows are inserted. The
+same searches by one user then run through ``crud.search_expenses`` (FTS5)
+and through the ILIKE fallback used on databases without FTS5: common
+words, which ILIKE finds after a few rows, and rare ones, which make it
+scan the user's whole history.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = (
+    "coffee lunch dinner taxi train flight hotel rent groceries pizza sushi bakery cinema "
+    "concert books pharmacy gym fuel parking insurance phone internet electricity water gift"
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'search.db')}"
+        run(args)
+
+
+def run(args):
+    from app import crud, models
+    from app.database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    random.seed(1)
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (id, email) VALUES (?, ?)",
+            [(user_id, f"user{user_id}@example.com") for user_id in range(1, args.users + 1)]
+        )
+        batch = []
+        for i in range(args.rows):
+            description = " ".join(random.sample(WORDS, 3)) + f" #{i}"
+            batch.append((random.randint(1, args.users), "2024-01-01", "Misc", 1.0, description, "Card"))
+            if len(batch) == 50_000:
+                connection.exec_driver_sql(
+                    "INSERT INTO expenses (user_id, date, category, amount, description, payment_method) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", batch
+                )
+                batch.clear()
+        if batch:
+            connection.exec_driver_sql(
+                "INSERT INTO expenses (user_id, date, category, amount, description, payment_method) "
+                "VALUES (?, ?, ?, ?, ?, ?)", batch
+            )
+    print(f"seeded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    common = [random.choice(WORDS)[:4] for _ in range(args.queries)]
+    rare = [str(random.randrange(args.rows)) for _ in range(args.queries)]
+
+    def timed(search, queries):
+        timings, hits = [], 0
+        with SessionLocal() as db:
+            for query in queries:
+                started = time.perf_counter()
+                hits += len(search(db, query))
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), max(timings), hits
+
+    def fts(db, query):
+        return crud.search_expenses(db, 1, query, limit=20)
+
+    def like(db, query):
+        return crud._search_like(db, 1, [], crud.search.search_terms(query), 0, 20)
+
+    print(f"{'search':<8} {'terms':<7} {'median ms':>10} {'max ms':>8} {'hits':>6}")
+    for name, search in (("fts5", fts), ("ilike", like)):
+        for kind, queries in (("common", common), ("rare", rare)):
+            median, worst, hits = timed(search, queries)
+            print(f"{name:<8} {kind:<7} {median:10.2f} {worst:8.2f} {hits:6d}")
+
+
+if __name__ == "__main__":
+    main()
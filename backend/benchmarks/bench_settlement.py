@@ -0,0 +1,104 @@
+"""Time GET /groups/{id}/settlement-plan as groups grow in members and history.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_settlement --members 10 100 1000 5000 --expenses 10000 100000 300000
+
+Each member count is timed with the largest ``--expenses`` and each expense
+count with the largest ``--members``. Every expense is paid by one member
+and split between three, bulk inserted. The endpoint time is split into
+the balances query and the settlement solver; the number of transfers is
+shown against the n - 1 upper bound, with ``exact`` when the subset DP ran.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--expenses", type=int, nargs="+", default=[10000, 100000, 300000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'settlement.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from app import crud, models, settlement
+    from app.database import SessionLocal
+    from app.main import app
+
+    rng = random.Random(7)
+    with TestClient(app) as client:
+        user = {"email": "bench@example.com", "password": "bench", "full_name": "Bench"}
+        client.post("/users/", json=user)
+        token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        with SessionLocal() as db:
+            owner = crud.get_user_by_email(db, user["email"]).id
+            others = db.scalars(insert(models.User).returning(models.User.id), [
+                {"email": f"member{n}@example.com", "hashed_password": "-", "full_name": f"Member {n}"}
+                for n in range(max(args.members) - 1)
+            ]).all()
+            db.commit()
+
+        def seed(members, expenses):
+            group = client.post("/groups/", json={"name": f"{members} x {expenses}"}, headers=headers).json()
+            member_ids = [owner] + others[:members - 1]
+            start = datetime(2022, 1, 1)
+            with SessionLocal() as db:
+                db.execute(insert(models.GroupMember), [
+                    {"group_id": group["id"], "user_id": user_id} for user_id in member_ids[1:]
+                ])
+                payers = [rng.choice(member_ids) for _ in range(expenses)]
+                amounts = [rng.randrange(300, 30000) / 100 for _ in range(expenses)]
+                expense_ids = db.scalars(insert(models.GroupExpense).returning(models.GroupExpense.id), [
+                    {
+                        "group_id": group["id"], "paid_by": payer, "date": start + timedelta(minutes=i),
+                        "category": "Food", "amount": amount,
+                    }
+                    for i, (payer, amount) in enumerate(zip(payers, amounts))
+                ]).all()
+                db.execute(insert(models.ExpenseSplit), [
+                    {"expense_id": expense_id, "user_id": user_id, "amount": amount / 3}
+                    for expense_id, amount in zip(expense_ids, amounts)
+                    for user_id in rng.sample(member_ids, min(3, members))
+                ])
+                db.commit()
+                # Bulk inserts bypass crud, so bring the balance ledger in line once
+                crud.reconcile_balances(db, group["id"])
+            return group["id"]
+
+        def timed(call):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                result = call()
+            return result, (time.perf_counter() - started) / args.repeat * 1000
+
+        scenarios = [(members, max(args.expenses)) for members in args.members]
+        scenarios += [(max(args.members), expenses) for expenses in args.expenses if expenses != max(args.expenses)]
+        print(f"{'members':>7} {'expenses':>9} {'endpoint ms':>12} {'balances ms':>12} {'solver ms':>10} "
+              f"{'transfers':>10} {'bound':>6} {'exact':>6}")
+        for members, expenses in sorted(scenarios):
+            group_id = seed(members, expenses)
+            _, endpoint = timed(lambda: client.get(f"/groups/{group_id}/settlement-plan", headers=headers))
+            with SessionLocal() as db:
+                balances, query = timed(lambda: crud.get_group_balances(db, group_id, owner))
+            plan, solver = timed(lambda: settlement.plan(balances))
+            bound = max(sum(1 for balance in balances if round(balance["net"] * 100)) - 1, 0)
+            print(f"{members:7d} {expenses:9d} {endpoint:12.1f} {query:12.1f} {solver:10.1f} "
+                  f"{len(plan['transfers']):10d} {bound:6d} {str(plan['exact']):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Measure concurrent read/write throughput with and without the SQLite profile.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_sqlite_profile --seconds 5 --readers 8 --writers 2
+
+Writers insert single expenses in their own transactions (like
+POST /expenses/), readers page through a user's expenses (like
+GET /expenses/).
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from app import models
+from app.database import Base, make_engine
+
+
+def seed(engine, rows: int):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(models.User), [
+            {"id": i, "email": f"bench{i}@example.com", "hashed_password": "x", "full_name": "Bench"}
+            for i in range(1, 101)
+        ])
+        start = datetime(2020, 1, 1)
+        connection.execute(insert(models.Expense), [
+            {
+                "user_id": i % 100 + 1,
+                "date": start + timedelta(minutes=i),
+                "category": f"category-{i % 12}",
+                "amount": float(i % 500),
+                "description": f"expense {i}",
+                "payment_method": "Card",
+            }
+            for i in range(rows)
+        ])
+
+
+def run(tuned: bool, args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", tuned=tuned)
+        seed(engine, args.rows)
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+
+        def reader():
+            done = 0
+            while time.perf_counter() < deadline:
+                with engine.connect() as connection:
+                    connection.execute(
+                        select(models.Expense)
+                        .where(models.Expense.user_id == random.randint(1, 100))
+                        .limit(100)
+                    ).all()
+                done += 1
+            with lock:
+                counts["reads"] += done
+
+        def writer():
+            done = errors = 0
+            while time.perf_counter() < deadline:
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(models.Expense).values(
+                            user_id=random.randint(1, 100),
+                            date=datetime.utcnow(),
+                            category="Food",
+                            amount=1.0,
+                            description="bench",
+                            payment_method="Card"
+                        ))
+                    done += 1
+                except OperationalError:
+                    errors += 1
+            with lock:
+                counts["writes"] += done
+                counts["errors"] += errors
+
+        threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+        threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    for label, tuned in (("default", False), ("production", True)):
+        counts = run(tuned, args)
+        print(
+            f"{label:<11} reads/s {counts['reads'] / args.seconds:9.1f}  "
+            f"writes/s {counts['writes'] / args.seconds:8.1f}  locked errors {counts['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure cold-start cost: import time, lifespan startup and first requests.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_startup --runs 5
+
+Each run is a fresh interpreter against a scratch SQLite database, so module
+imports, pool connections, the bcrypt backend and the OpenAPI document are
+all cold. The first login and first /openapi.json are timed after startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+imported = time.perf_counter()
+with TestClient(app) as client:
+    ready = time.perf_counter()
+    client.post("/users/", json={"email": "bench@example.com", "password": "pw", "full_name": "Bench"})
+    t = time.perf_counter()
+    client.post("/token", data={"username": "bench@example.com", "password": "pw"})
+    login = time.perf_counter() - t
+    t = time.perf_counter()
+    client.get("/openapi.json")
+    openapi = time.perf_counter() - t
+print(json.dumps({
+    "import": imported - started,
+    "startup": ready - imported,
+    "first login": login,
+    "first /openapi.json": openapi,
+}))
+"""
+
+
+def run_once(directory: str, run: int) -> dict:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(directory, f'startup{run}.db')}")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [run_once(directory, run) for run in range(args.runs)]
+
+    print(f"{'phase':<22} {'median ms':>10} {'max ms':>10}")
+    for phase in runs[0]:
+        values = [r[phase] * 1000 for r in runs]
+        print(f"{phase:<22} {statistics.median(values):10.1f} {max(values):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare folding statistics on the client with GET /statistics/by_category.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_statistics --rows 20000
+
+``--rows`` expenses over a year are imported. The client-side path pulls
+the whole history with GET /expenses/ (as statistics_screen.dart does) and
+folds it per category; the server-side path asks for one month's figures.
+Bytes on the wire and latency are reported for each.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app binds its engine at import time, so point it at the scratch database first
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'statistics.db')}"
+        run(args)
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    categories = ["Food", "Travel", "Rent", "Health", "Fun"]
+    with TestClient(app) as client:
+        user = {"email": "bench@example.com", "password": "bench", "full_name": "Bench"}
+        client.post("/users/", json=user)
+        token = client.post("/token", data={"username": user["email"], "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        rows = "".join(
+            f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T12:00:00,{categories[i % 5]},{i % 97}.5,row {i},Card\n"
+            for i in range(args.rows)
+        )
+        upload = "date,category,amount,description,payment_method\n" + rows
+        client.post("/expenses/import", headers=headers, files={"file": ("seed.csv", upload, "text/csv")})
+
+        def client_side():
+            response = client.get("/expenses/", params={"limit": args.rows}, headers=headers)
+            totals = {}
+            for expense in response.json():
+                if expense["date"].startswith("2024-03"):
+                    totals[expense["category"]] = totals.get(expense["category"], 0) + expense["amount"]
+            return len(response.content)
+
+        def server_side():
+            response = client.get("/statistics/by_category", headers=headers,
+                                  params={"start_date": "2024-03-01", "end_date": "2024-03-31"})
+            return len(response.content)
+
+        print(f"{'statistics':<12} {'bytes':>10} {'ms':>8}")
+        for name, fold in (("client-side", client_side), ("server-side", server_side)):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                size = fold()
+            elapsed = (time.perf_counter() - started) / args.repeat * 1000
+            print(f"{name:<12} {size:10d} {elapsed:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
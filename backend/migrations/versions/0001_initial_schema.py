@@ -0,0 +1,116 @@
+"""Initial schema, as created by Base.metadata.create_all
+
+Databases created before migrations existed already match this revision;
+mark them with ``alembic stamp 0001`` before running ``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "expenses",
+        sa.Column("payment_method", sa.String(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("category", sa.String(), nullable=True),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_expenses_id", "expenses", ["id"])
+    op.create_index("ix_expenses_category", "expenses", ["category"])
+
+    op.create_table(
+        "groups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_groups_id", "groups", ["id"])
+
+    op.create_table(
+        "group_members",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("group_id", sa.Integer(), nullable=True),
+        sa.Column("joined_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_group_members_id", "group_members", ["id"])
+
+    op.create_table(
+        "group_expenses",
+        sa.Column("group_id", sa.Integer(), nullable=True),
+        sa.Column("paid_by", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("category", sa.String(), nullable=True),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"]),
+        sa.ForeignKeyConstraint(["paid_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_group_expenses_category", "group_expenses", ["category"])
+    op.create_index("ix_group_expenses_id", "group_expenses", ["id"])
+
+    op.create_table(
+        "expense_splits",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("expense_id", sa.Integer(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("amount", sa.Float(), nullable=True),
+        sa.Column("paid", sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(["expense_id"], ["group_expenses.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_expense_splits_id", "expense_splits", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_expense_splits_id", table_name="expense_splits")
+    op.drop_table("expense_splits")
+    op.drop_index("ix_group_expenses_id", table_name="group_expenses")
+    op.drop_index("ix_group_expenses_category", table_name="group_expenses")
+    op.drop_table("group_expenses")
+    op.drop_index("ix_group_members_id", table_name="group_members")
+    op.drop_table("group_members")
+    op.drop_index("ix_groups_id", table_name="groups")
+    op.drop_table("groups")
+    op.drop_index("ix_expenses_category", table_name="expenses")
+    op.drop_index("ix_expenses_id", table_name="expenses")
+    op.drop_table("expenses")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
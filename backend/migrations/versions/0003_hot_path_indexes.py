@@ -0,0 +1,49 @@
+"""Composite indexes matching the hot query shapes
+
+- expenses (user_id, date): GET /expenses/ filters by owner and pages by date
+- group_expenses (group_id, date): GET /groups/{id}/expenses/ likewise per group
+- expense_splits (expense_id, user_id): loading splits of a page of group
+  expenses and picking the caller's share
+- group_members (group_id, user_id), unique: every membership check; also
+  enforces what join_group only checked in Python
+- group_members (user_id, group_id): GET /groups/ walks memberships by user
+
+See benchmarks/bench_indexes.py for the measurements behind each index.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:10:00
+
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the oldest membership row of any duplicate before enforcing uniqueness
+    op.execute(
+        "DELETE FROM group_members WHERE id NOT IN "
+        "(SELECT MIN(id) FROM group_members GROUP BY group_id, user_id)"
+    )
+    op.create_index("ix_expenses_user_id_date", "expenses", ["user_id", "date"])
+    op.create_index("ix_group_expenses_group_id_date", "group_expenses", ["group_id", "date"])
+    op.create_index(
+        "ix_expense_splits_expense_id_user_id", "expense_splits", ["expense_id", "user_id"]
+    )
+    op.create_index(
+        "ix_group_members_group_id_user_id", "group_members", ["group_id", "user_id"], unique=True
+    )
+    op.create_index("ix_group_members_user_id_group_id", "group_members", ["user_id", "group_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_group_members_user_id_group_id", table_name="group_members")
+    op.drop_index("ix_group_members_group_id_user_id", table_name="group_members")
+    op.drop_index("ix_expense_splits_expense_id_user_id", table_name="expense_splits")
+    op.drop_index("ix_group_expenses_group_id_date", table_name="group_expenses")
+    op.drop_index("ix_expenses_user_id_date", table_name="expenses")
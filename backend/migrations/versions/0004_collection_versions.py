@@ -0,0 +1,32 @@
+"""Add collection_versions, the change counters behind list ETags
+
+One row per cached collection: ("expenses", user id), ("groups", user id)
+and ("group_expenses", group id). A missing row means version 0.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:15:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "collection_versions",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("scope_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("scope", "scope_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("collection_versions")
@@ -0,0 +1,75 @@
+"""Sync feed: change sequence numbers, updated_at and tombstones
+
+Existing rows are numbered once, expenses first, then group expenses and
+memberships, and the ("sync", 0) counter continues after the last number.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 10:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ("expenses", "group_expenses"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("seq", sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+    with op.batch_alter_table("group_members") as batch_op:
+        batch_op.add_column(sa.Column("seq", sa.Integer(), nullable=True))
+
+    op.execute("UPDATE expenses SET seq = id, updated_at = CURRENT_TIMESTAMP")
+    op.execute(
+        "UPDATE group_expenses SET updated_at = CURRENT_TIMESTAMP, "
+        "seq = id + (SELECT COALESCE(MAX(seq), 0) FROM expenses)"
+    )
+    op.execute(
+        "UPDATE group_members SET seq = id + "
+        "(SELECT COALESCE(MAX(seq), 0) FROM (SELECT seq FROM expenses UNION ALL SELECT seq FROM group_expenses))"
+    )
+    op.execute(
+        "INSERT INTO collection_versions (scope, scope_id, version) SELECT 'sync', 0, COALESCE(MAX(seq), 0) FROM "
+        "(SELECT seq FROM expenses UNION ALL SELECT seq FROM group_expenses UNION ALL SELECT seq FROM group_members)"
+    )
+
+    op.create_index("ix_expenses_user_id_seq", "expenses", ["user_id", "seq"])
+    op.create_index("ix_group_expenses_group_id_seq", "group_expenses", ["group_id", "seq"])
+
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("group_id", sa.Integer(), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tombstones_user_id_seq", "tombstones", ["user_id", "seq"])
+    op.create_index("ix_tombstones_group_id_seq", "tombstones", ["group_id", "seq"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tombstones_group_id_seq", table_name="tombstones")
+    op.drop_index("ix_tombstones_user_id_seq", table_name="tombstones")
+    op.drop_table("tombstones")
+    op.execute("DELETE FROM collection_versions WHERE scope = 'sync'")
+    op.drop_index("ix_group_expenses_group_id_seq", table_name="group_expenses")
+    op.drop_index("ix_expenses_user_id_seq", table_name="expenses")
+    with op.batch_alter_table("group_members") as batch_op:
+        batch_op.drop_column("seq")
+    for table in ("group_expenses", "expenses"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
+            batch_op.drop_column("seq")
@@ -0,0 +1,29 @@
+"""Add expenses.import_key so statement imports skip rows seen before
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 10:25:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.add_column(sa.Column("import_key", sa.String(), nullable=True))
+    op.create_index(
+        "ix_expenses_user_id_import_key", "expenses", ["user_id", "import_key"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_expenses_user_id_import_key", table_name="expenses")
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.drop_column("import_key")
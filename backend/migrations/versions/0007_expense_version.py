@@ -0,0 +1,27 @@
+"""Add expenses.version for optimistic concurrency on updates
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 11:40:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.drop_column("version")
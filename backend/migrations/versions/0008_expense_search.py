@@ -0,0 +1,61 @@
+"""Add the expense_search FTS5 index and the triggers that maintain it
+
+SQLite only; elsewhere search falls back to ILIKE and needs no schema change.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 12:30:00
+
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Personal expenses are indexed under rowid 2 * id, group expenses under 2 * id + 1
+SOURCES = {
+    "expenses": ("2 * {row}id", "'u' || {row}user_id", "user_id"),
+    "group_expenses": ("2 * {row}id + 1", "'g' || {row}group_id", "group_id"),
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE expense_search USING fts5("
+        "description, category, scope, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+    )
+    for table, (rowid, scope, owner) in SOURCES.items():
+        op.execute(
+            "INSERT INTO expense_search (rowid, description, category, scope) "
+            f"SELECT {rowid.format(row='')}, description, category, {scope.format(row='')} FROM {table}"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_search_insert AFTER INSERT ON {table} BEGIN "
+            "INSERT INTO expense_search (rowid, description, category, scope) "
+            f"VALUES ({rowid.format(row='new.')}, new.description, new.category, "
+            f"{scope.format(row='new.')}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_search_update "
+            f"AFTER UPDATE OF description, category, {owner} ON {table} BEGIN "
+            "UPDATE expense_search SET description = new.description, category = new.category, "
+            f"scope = {scope.format(row='new.')} WHERE rowid = {rowid.format(row='old.')}; END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_search_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM expense_search WHERE rowid = {rowid.format(row='old.')}; END"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table in SOURCES:
+        for event in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_search_{event}")
+    op.execute("DROP TABLE IF EXISTS expense_search")
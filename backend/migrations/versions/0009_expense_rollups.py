@@ -0,0 +1,71 @@
+"""Add daily_expense_rollups and monthly_group_rollups and fill them
+
+On databases other than SQLite and PostgreSQL the tables start empty; run
+``python -m app.rollups rebuild`` after upgrading.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 14:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Bucket expressions per dialect: (day of expenses.date, first day of the month of group_expenses.date)
+BUCKETS = {
+    "sqlite": ("date(date)", "strftime('%Y-%m-01', date)"),
+    "postgresql": ("CAST(date_trunc('day', date) AS DATE)", "CAST(date_trunc('month', date) AS DATE)"),
+}
+
+BACKFILL = (
+    "INSERT INTO {table} ({owner}, {bucket}, category, total, count, max_amount) "
+    "SELECT {owner}, {expression}, COALESCE(category, 'Uncategorized'), "
+    "SUM(COALESCE(amount, 0)), COUNT(*), MAX(COALESCE(amount, 0)) "
+    "FROM {source} WHERE {owner} IS NOT NULL "
+    "GROUP BY {owner}, {expression}, COALESCE(category, 'Uncategorized')"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_expense_rollups",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("max_amount", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "day", "category"),
+    )
+    op.create_table(
+        "monthly_group_rollups",
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("max_amount", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("group_id", "month", "category"),
+    )
+
+    buckets = BUCKETS.get(op.get_bind().dialect.name)
+    if buckets is None:
+        return
+    day, month = buckets
+    op.execute(BACKFILL.format(
+        table="daily_expense_rollups", owner="user_id", bucket="day", expression=day, source="expenses"
+    ))
+    op.execute(BACKFILL.format(
+        table="monthly_group_rollups", owner="group_id", bucket="month", expression=month, source="group_expenses"
+    ))
+
+
+def downgrade() -> None:
+    op.drop_table("monthly_group_rollups")
+    op.drop_table("daily_expense_rollups")
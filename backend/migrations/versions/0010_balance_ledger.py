@@ -0,0 +1,82 @@
+"""Add balance_ledger, member_balances and balance_snapshots and fill them
+
+Each existing group expense gets ledger entries for its payer and its
+unsettled splits, recorded at its last update; member_balances holds
+their totals. Snapshots start with the next writes.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 18:40:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+UNSETTLED = (
+    "FROM group_expenses e JOIN expense_splits s ON s.expense_id = e.id "
+    "WHERE e.group_id IS NOT NULL AND (s.paid IS NULL OR s.paid = {false})"
+)
+BACKFILL = (
+    "INSERT INTO balance_ledger (group_id, user_id, expense_id, paid, owed, recorded_at) "
+    "SELECT group_id, user_id, expense_id, SUM(paid), SUM(owed), recorded_at FROM ("
+    "SELECT e.group_id AS group_id, e.paid_by AS user_id, e.id AS expense_id, "
+    "COALESCE(s.amount, 0) AS paid, 0 AS owed, COALESCE(e.updated_at, e.date) AS recorded_at " + UNSETTLED + " "
+    "UNION ALL "
+    "SELECT e.group_id, s.user_id, e.id, 0, COALESCE(s.amount, 0), COALESCE(e.updated_at, e.date) " + UNSETTLED +
+    ") changes GROUP BY group_id, user_id, expense_id, recorded_at ORDER BY expense_id, user_id"
+)
+TOTALS = (
+    "INSERT INTO member_balances (group_id, user_id, paid, owed) "
+    "SELECT group_id, user_id, SUM(paid), SUM(owed) FROM balance_ledger GROUP BY group_id, user_id"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "balance_ledger",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("expense_id", sa.Integer(), nullable=True),
+        sa.Column("paid", sa.Float(), nullable=False),
+        sa.Column("owed", sa.Float(), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_balance_ledger_group_id_id", "balance_ledger", ["group_id", "id"])
+    op.create_index("ix_balance_ledger_group_id_recorded_at", "balance_ledger", ["group_id", "recorded_at"])
+    op.create_table(
+        "member_balances",
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("paid", sa.Float(), nullable=False),
+        sa.Column("owed", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+    )
+    op.create_table(
+        "balance_snapshots",
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), nullable=False),
+        sa.Column("ledger_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("paid", sa.Float(), nullable=False),
+        sa.Column("owed", sa.Float(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("group_id", "ledger_id", "user_id"),
+    )
+
+    false = "0" if op.get_bind().dialect.name == "sqlite" else "false"
+    op.execute(BACKFILL.format(false=false))
+    op.execute(TOTALS)
+
+
+def downgrade() -> None:
+    op.drop_table("balance_snapshots")
+    op.drop_table("member_balances")
+    op.drop_index("ix_balance_ledger_group_id_recorded_at", table_name="balance_ledger")
+    op.drop_index("ix_balance_ledger_group_id_id", table_name="balance_ledger")
+    op.drop_table("balance_ledger")
@@ -0,0 +1,47 @@
+from typing import Dict
+
+import pytest
+
+from app import models
+from app.database import engine
+
+
+@pytest.fixture(scope="session", autouse=True)
+def create_schema():
+    """Create the tables that the application lifespan would create on startup"""
+    models.Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def sign_up(client, tmp_path):
+    """Factory registering a fresh user and returning their authorization headers.
+
+    Emails carry the test's ``tmp_path`` name, so every test gets new users.
+    """
+    def sign_up(name: str, full_name: str = "Test User") -> Dict:
+        user = {
+            "email": f"{name}_{tmp_path.name}@example.com",
+            "password": "testpassword123",
+            "full_name": full_name
+        }
+        assert client.post("/users/", json=user).status_code == 200
+        response = client.post(
+            "/token",
+            data={"username": user["email"], "password": user["password"], "grant_type": "password"},
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        assert response.status_code == 200, "Failed to get auth token"
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return sign_up
+
+
+@pytest.fixture
+def auth_headers(sign_up) -> Dict:
+    """Fixture for authorization headers of a fresh user"""
+    return sign_up("test_user")
+
+
+@pytest.fixture
+def second_auth_headers(sign_up) -> Dict:
+    """Fixture for authorization headers of a second fresh user"""
+    return sign_up("test_second_user")
@@ -4,6 +4,7 @@ import logging
 from typing import Dict, Tuple
 from datetime import datetime, timezone
 
+from app import batch
 from app.main import app
 
 # Configure logging
@@ -187,12 +188,12 @@ class TestDeleteExpense:
         assert response.status_code == 422
 
     def test_delete_expense_id_empty(self, client, auth_headers):
-        """Test deleting with empty ID"""
+        """Test that deleting without an ID, ids or filters deletes nothing"""
         response = client.delete(
             "/expenses/",
             headers=auth_headers
         )
-        assert response.status_code in [404, 405]
+        assert response.status_code == 422
 
     def test_delete_with_extra_params(self, client, auth_headers, test_expense):
         """Test deleting with extra query parameters"""
@@ -213,5 +214,84 @@ class TestDeleteExpense:
         assert response.status_code == 404
 
 
+class TestBulkDeleteExpenses:
+    """Test DELETE /expenses/ by id list or filters"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    def _create(self, client, headers, category: str = "Food", day: int = 5) -> int:
+        expense = {
+            "date": f"2024-01-{day:02d}T09:00:00",
+            "category": category,
+            "amount": 10.0,
+            "payment_method": "Cash",
+            "description": "Bulk"
+        }
+        response = client.post("/expenses/", json=expense, headers=headers)
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    def _remaining(self, client, headers) -> set:
+        return {e["id"] for e in client.get("/expenses/", headers=headers).json()}
+
+    def test_delete_by_ids(self, client, auth_headers, second_auth_headers):
+        """Test that only the caller's listed expenses are deleted"""
+        ids = [self._create(client, auth_headers) for _ in range(3)]
+        foreign = self._create(client, second_auth_headers)
+        response = client.request(
+            "DELETE", "/expenses/", json={"ids": ids[:2] + [foreign, 10**12]}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json() == {"deleted": 2}
+        assert self._remaining(client, auth_headers) == {ids[2]}
+        assert self._remaining(client, second_auth_headers) == {foreign}
+
+    def test_delete_by_filters(self, client, auth_headers, monkeypatch):
+        """Test deleting with the listing filters, across several chunks"""
+        monkeypatch.setattr(batch, "BULK_DELETE_CHUNK_SIZE", 2)
+        travel = [self._create(client, auth_headers, "Travel", day) for day in range(1, 6)]
+        kept = self._create(client, auth_headers, "Food", 3)
+        late = self._create(client, auth_headers, "Travel", 20)
+        response = client.delete(
+            "/expenses/", params={"category": "Travel", "end_date": "2024-01-10"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json() == {"deleted": len(travel)}
+        assert self._remaining(client, auth_headers) == {kept, late}
+
+    def test_ids_and_filters_combine(self, client, auth_headers):
+        """Test that ids and filters must both match"""
+        food = self._create(client, auth_headers, "Food")
+        travel = self._create(client, auth_headers, "Travel")
+        response = client.request(
+            "DELETE", "/expenses/", params={"category": "Travel"},
+            json={"ids": [food, travel]}, headers=auth_headers
+        )
+        assert response.json() == {"deleted": 1}
+        assert self._remaining(client, auth_headers) == {food}
+
+    def test_empty_search_is_not_a_filter(self, client, auth_headers):
+        """Test that blank filters do not delete everything"""
+        expense = self._create(client, auth_headers)
+        response = client.delete("/expenses/", params={"search": ""}, headers=auth_headers)
+        assert response.status_code == 422
+        assert self._remaining(client, auth_headers) == {expense}
+
+    def test_bulk_delete_is_synced(self, client, auth_headers):
+        """Test that deleted expenses become tombstones and invalidate the list ETag"""
+        ids = [self._create(client, auth_headers) for _ in range(2)]
+        etag = client.get("/expenses/", headers=auth_headers).headers["etag"]
+        since = client.get("/sync/changes", headers=auth_headers).json()["next_since"]
+        client.request("DELETE", "/expenses/", json={"ids": ids}, headers=auth_headers)
+
+        feed = client.get("/sync/changes", params={"since": since}, headers=auth_headers).json()
+        assert sorted((c["op"], c["id"]) for c in feed["changes"]) == [("delete", i) for i in ids]
+        response = client.get("/expenses/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200 and response.json() == []
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--disable-warnings"])
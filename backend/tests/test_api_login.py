@@ -2,7 +2,12 @@ import pytest
 from fastapi.testclient import TestClient
 import logging
 from typing import Dict
+from jose import jwt
+from sqlalchemy import text
 
+from app import main
+from app.cache import token_versions
+from app.database import engine
 from app.main import app
 
 # Configure logging
@@ -316,5 +321,85 @@ class TestLogin:
         assert response.status_code in (200, 401)
 
 
+class TestTokenClaims:
+    """Test the user-id and token-version claims"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def test_user(self) -> Dict:
+        """Fixture for test user credentials"""
+        return {
+            "email": "test_token_claims@example.com",
+            "password": "testpassword123",
+            "full_name": "Test Token Claims User"
+        }
+
+    @pytest.fixture(autouse=True)
+    def setup_test_user(self, client, test_user):
+        """Create test user if doesn't exist"""
+        response = client.post("/users/", json=test_user)
+        if response.status_code not in (200, 400):  # 400 means user exists
+            pytest.fail(f"Failed to setup test user: {response.text}")
+
+    def _login(self, client, test_user) -> str:
+        response = client.post(
+            "/token",
+            data={
+                "username": test_user["email"],
+                "password": test_user["password"],
+                "grant_type": "password"
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        assert response.status_code == 200
+        return response.json()["access_token"]
+
+    def test_token_carries_user_id_and_version(self, client, test_user):
+        """Test that the subject is the integer user id"""
+        claims = jwt.get_unverified_claims(self._login(client, test_user))
+        assert claims["sub"].isdigit()
+        assert isinstance(claims["ver"], int)
+
+    def test_revoke_rejects_old_tokens(self, client, test_user):
+        """Test that bumping the token version rejects earlier tokens"""
+        old_headers = {"Authorization": f"Bearer {self._login(client, test_user)}"}
+        assert client.get("/expenses/", headers=old_headers).status_code == 200
+
+        response = client.post("/token/revoke", headers=old_headers)
+        assert response.status_code == 200
+        assert client.get("/expenses/", headers=old_headers).status_code == 401
+
+        new_headers = {"Authorization": f"Bearer {self._login(client, test_user)}"}
+        assert client.get("/expenses/", headers=new_headers).status_code == 200
+
+    def test_version_bumped_in_database_rejects_cached_token(self, client, test_user, monkeypatch):
+        """Test that a token version bumped outside the ORM rejects a cached token"""
+        monkeypatch.setattr(token_versions, "ttl", 0)
+        token_versions.clear()
+        headers = {"Authorization": f"Bearer {self._login(client, test_user)}"}
+        assert client.get("/expenses/", headers=headers).status_code == 200
+        assert client.get("/expenses/", headers=headers).status_code == 200
+
+        # Another worker, a migration or an operator bumping the version in plain SQL
+        with engine.begin() as connection:
+            connection.execute(
+                text("UPDATE users SET token_version = token_version + 1 WHERE email = :email"),
+                {"email": test_user["email"]}
+            )
+        assert client.get("/expenses/", headers=headers).status_code == 401
+        # Another token of the same user cannot vouch for it either
+        assert client.get("/groups/", headers=headers).status_code == 401
+
+    def test_email_subject_is_rejected(self, client, test_user):
+        """Test that tokens without the id claims are rejected"""
+        token = main.create_access_token(data={"sub": test_user["email"]})
+        response = client.get("/expenses/", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--disable-warnings"])
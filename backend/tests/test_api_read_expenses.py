@@ -261,5 +261,140 @@ class TestReadExpense:
             assert start_date <= expense["created_at"] <= end_date
 
 
+class TestReadExpenseCursor:
+    """Test keyset (cursor) pagination of expenses"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def create_test_expenses(self, client, auth_headers) -> List[Dict]:
+        """Fixture to create expenses with some shared dates, out of date order"""
+        expenses = []
+        for i in range(7):
+            response = client.post("/expenses/", json={
+                "date": f"2024-01-{10 - i // 2:02d}T12:00:00",
+                "category": "Food",
+                "amount": 10.0 + i,
+                "payment_method": "Cash",
+                "description": f"Cursor expense {i}"
+            }, headers=auth_headers)
+            assert response.status_code == 200
+            expenses.append(response.json())
+        return expenses
+
+    def test_cursor_walks_all_pages_in_order(self, client, auth_headers, create_test_expenses):
+        """Test that following next_cursor visits every expense once in (date, id) order"""
+        seen = []
+        cursor = ""
+        while cursor is not None:
+            response = client.get("/expenses/", params={"cursor": cursor, "limit": 3}, headers=auth_headers)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["items"]) <= 3
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+
+        expected = sorted(create_test_expenses, key=lambda e: (e["date"], e["id"]))
+        assert [e["id"] for e in seen] == [e["id"] for e in expected]
+
+    def test_last_page_has_no_cursor(self, client, auth_headers, create_test_expenses):
+        """Test that a page holding the remaining rows ends the walk"""
+        response = client.get("/expenses/", params={"cursor": "", "limit": 7}, headers=auth_headers)
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 7
+        assert response.json()["next_cursor"] is None
+
+    def test_without_cursor_returns_list(self, client, auth_headers, create_test_expenses):
+        """Test that skip/limit requests keep returning a plain list"""
+        response = client.get("/expenses/?skip=2&limit=2", headers=auth_headers)
+        assert response.status_code == 200
+        assert [e["id"] for e in response.json()] == [e["id"] for e in create_test_expenses[2:4]]
+
+    def test_invalid_cursor(self, client, auth_headers):
+        """Test that a malformed cursor is rejected"""
+        response = client.get("/expenses/?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_cursor_negative_limit(self, client, auth_headers):
+        """Test that cursor mode rejects a negative limit"""
+        response = client.get("/expenses/?cursor=&limit=-1", headers=auth_headers)
+        assert response.status_code == 422
+
+
+class TestReadExpenseFilters:
+    """Test server-side filtering of expenses"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture(autouse=True)
+    def create_test_expenses(self, client, auth_headers):
+        """Fixture to create expenses spread over categories, methods and dates"""
+        for date, category, amount, method, description in [
+            ("2024-01-05T09:00:00", "Food", 12.5, "Cash", "Office lunch"),
+            ("2024-01-31T23:30:00", "Travel", 80.0, "Credit Card", "Train to office"),
+            ("2024-02-01T08:00:00", "Food", 4.0, "Credit Card", "Coffee 100%"),
+            ("2024-03-10T18:00:00", "Rent", 900.0, "Bank Transfer", "March rent"),
+        ]:
+            response = client.post("/expenses/", json={
+                "date": date,
+                "category": category,
+                "amount": amount,
+                "payment_method": method,
+                "description": description
+            }, headers=auth_headers)
+            assert response.status_code == 200
+
+    def _descriptions(self, client, auth_headers, params) -> List[str]:
+        response = client.get("/expenses/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return sorted(expense["description"] for expense in response.json())
+
+    def test_filter_by_date_range(self, client, auth_headers):
+        """Test that a date-only end_date includes the whole day"""
+        assert self._descriptions(client, auth_headers, {"start_date": "2024-01-01", "end_date": "2024-01-31"}) == [
+            "Office lunch", "Train to office"
+        ]
+        assert self._descriptions(client, auth_headers, {"end_date": "2024-01-31T12:00:00"}) == ["Office lunch"]
+
+    def test_filter_by_categories(self, client, auth_headers):
+        """Test that repeated category parameters match any of them"""
+        assert self._descriptions(client, auth_headers, {"category": ["Food", "Rent"]}) == [
+            "Coffee 100%", "March rent", "Office lunch"
+        ]
+
+    def test_filter_by_payment_method_and_amount(self, client, auth_headers):
+        """Test combining payment method with an amount range"""
+        params = {"payment_method": "Credit Card", "min_amount": 5, "max_amount": 100}
+        assert self._descriptions(client, auth_headers, params) == ["Train to office"]
+
+    def test_filter_by_description(self, client, auth_headers):
+        """Test case-insensitive substring search with LIKE wildcards escaped"""
+        assert self._descriptions(client, auth_headers, {"search": "OFFICE"}) == ["Office lunch", "Train to office"]
+        assert self._descriptions(client, auth_headers, {"search": "100%"}) == ["Coffee 100%"]
+        assert self._descriptions(client, auth_headers, {"search": "_"}) == []
+
+    def test_filters_apply_to_cursor_pages(self, client, auth_headers):
+        """Test that cursor pagination pages through the filtered set only"""
+        params = {"cursor": "", "limit": 1, "category": "Food"}
+        first = client.get("/expenses/", params=params, headers=auth_headers).json()
+        second = client.get("/expenses/", params={**params, "cursor": first["next_cursor"]},
+                            headers=auth_headers).json()
+        assert [e["description"] for e in first["items"] + second["items"]] == ["Office lunch", "Coffee 100%"]
+        assert second["next_cursor"] is None
+
+    def test_inverted_ranges_rejected(self, client, auth_headers):
+        """Test that inverted date or amount ranges are rejected"""
+        response = client.get("/expenses/?start_date=2024-02-01&end_date=2024-01-01", headers=auth_headers)
+        assert response.status_code == 422
+        response = client.get("/expenses/?min_amount=10&max_amount=1", headers=auth_headers)
+        assert response.status_code == 422
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--disable-warnings"])
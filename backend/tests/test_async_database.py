@@ -0,0 +1,122 @@
+import pytest
+import asyncio
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud_async, models, reports, schemas, settlement
+from app.database import Base, async_database_url, create_async_session_factory
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestAsyncDatabase:
+    """Test the crud_async wrappers against both session types"""
+
+    @pytest.fixture
+    def database_url(self, tmp_path) -> str:
+        """Fixture for a fresh SQLite database with the schema created"""
+        url = f"sqlite:///{tmp_path / 'async.db'}"
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+        return url
+
+    @pytest.fixture
+    def test_user(self) -> schemas.UserCreate:
+        return schemas.UserCreate(
+            email="test_async@example.com",
+            password="testpassword123",
+            full_name="Test Async User"
+        )
+
+    @pytest.fixture
+    def test_expense(self) -> schemas.ExpenseCreate:
+        return schemas.ExpenseCreate(
+            date=datetime(2024, 1, 15),
+            category="Food",
+            amount=12.5,
+            description="Lunch",
+            payment_method="Card"
+        )
+
+    async def _exercise(self, db, test_user, test_expense):
+        user = await crud_async.create_user(db, test_user)
+        assert user.expenses == []
+        await crud_async.create_expense(db, expense=test_expense, user_id=user.id)
+        expenses = await crud_async.get_expenses(db, user_id=user.id)
+        assert [expense.amount for expense in expenses] == [12.5]
+
+        group = await crud_async.create_group(db, "Async Group", user.id)
+        group_expense = await crud_async.create_group_expense(
+            db,
+            group.id,
+            schemas.GroupExpenseCreate(
+                date=datetime(2024, 1, 16),
+                category="Rent",
+                amount=100.0
+            ),
+            user.id
+        )
+        return group_expense
+
+    def test_async_url_uses_aiosqlite(self):
+        """Test that SQLite URLs are mapped onto the aiosqlite driver"""
+        assert async_database_url("sqlite:///./expenses.db") == "sqlite+aiosqlite:///./expenses.db"
+
+    def test_async_session(self, database_url, test_user, test_expense):
+        """Test crud_async on an AsyncSession"""
+        async def scenario():
+            session_factory = create_async_session_factory(database_url)
+            async with session_factory() as db:
+                group_expense = await self._exercise(db, test_user, test_expense)
+            await session_factory.kw["bind"].dispose()
+            return group_expense
+
+        group_expense = asyncio.run(scenario())
+        # Splits were loaded before the session closed
+        assert [split.amount for split in group_expense.splits] == [100.0]
+
+    def test_heavy_work_leaves_the_event_loop(self, database_url, test_user, test_expense, monkeypatch):
+        """Test that reports and settlement plans are computed off the event loop's thread"""
+        threads = {}
+
+        def recording(name, fn):
+            def wrapper(*args, **kwargs):
+                threads[name] = threading.get_ident()
+                return fn(*args, **kwargs)
+            return wrapper
+
+        monkeypatch.setattr(reports, "aggregate", recording("aggregate", reports.aggregate))
+        monkeypatch.setattr(settlement, "plan", recording("plan", settlement.plan))
+
+        async def scenario():
+            session_factory = create_async_session_factory(database_url)
+            async with session_factory() as db:
+                group_expense = await self._exercise(db, test_user, test_expense)
+                report = await crud_async.aggregate_expenses(db, group_expense.paid_by, ["category"], ["sum"])
+                plan = await crud_async.get_settlement_plan(db, group_expense.group_id, group_expense.paid_by)
+            await session_factory.kw["bind"].dispose()
+            return threading.get_ident(), report, plan
+
+        loop_thread, report, plan = asyncio.run(scenario())
+        assert report["rows"] and plan["transfers"] == []
+        assert set(threads) == {"aggregate", "plan"}
+        assert loop_thread not in threads.values()
+
+    def test_sync_session(self, database_url, test_user, test_expense):
+        """Test crud_async on a plain Session through the threadpool"""
+        engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        db = sessionmaker(bind=engine)()
+        try:
+            group_expense = asyncio.run(self._exercise(db, test_user, test_expense))
+            assert len(group_expense.splits) == 1
+            assert db.query(models.Expense).count() == 1
+        finally:
+            db.close()
+            engine.dispose()
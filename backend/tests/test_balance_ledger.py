@@ -0,0 +1,117 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func, select, update
+
+from app import balances, models
+from app.database import SessionLocal
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestBalanceLedger:
+    """Test the balance ledger, member totals and snapshots behind group balances"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def members(self, sign_up) -> List[Dict]:
+        """Fixture for authorization headers of two fresh users"""
+        return [sign_up(f"{name}_ledger") for name in ("first", "second")]
+
+    @pytest.fixture
+    def group(self, client, members) -> Dict:
+        """Fixture for a group both users belong to"""
+        group = client.post("/groups/", json={"name": "Ledger Group"}, headers=members[0]).json()
+        assert client.post(f"/groups/{group['id']}/join", headers=members[1]).status_code == 200
+        return group
+
+    def _add(self, client, group, headers, amount: float) -> Dict:
+        response = client.post(f"/groups/{group['id']}/expenses", json={
+            "date": "2024-03-01T12:00:00", "category": "Food", "amount": amount, "split_type": "equal"
+        }, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def _nets(self, client, group, headers, **params) -> List[float]:
+        response = client.get(f"/groups/{group['id']}/balances", params=params, headers=headers)
+        assert response.status_code == 200
+        return [balance["net"] for balance in response.json()]
+
+    def test_writes_append_entries(self, client, members, group):
+        """Test that creates and deletes append entries and keep member totals equal to the splits"""
+        expense = self._add(client, group, members[0], 40.0)
+        self._add(client, group, members[1], 10.0)
+        assert client.delete(
+            f"/groups/{group['id']}/expenses/{expense['id']}", headers=members[0]
+        ).status_code == 200
+
+        with SessionLocal() as db:
+            entries = db.execute(
+                select(models.BalanceLedgerEntry.expense_id, models.BalanceLedgerEntry.paid,
+                       models.BalanceLedgerEntry.owed)
+                .where(models.BalanceLedgerEntry.group_id == group["id"])
+                .order_by(models.BalanceLedgerEntry.id)
+            ).all()
+            assert balances.check(db, group["id"]) == []
+        # Deleting appends the reversal; the original entries stay
+        assert [tuple(entry) for entry in entries] == [
+            (expense["id"], 40.0, 20.0), (expense["id"], 0.0, 20.0),
+            (expense["id"] + 1, 0.0, 5.0), (expense["id"] + 1, 10.0, 5.0),
+            (expense["id"], -40.0, -20.0), (expense["id"], -0.0, -20.0),
+        ]
+        assert self._nets(client, group, members[0]) == [-5.0, 5.0]
+
+    def test_as_of_with_snapshots(self, client, members, group, monkeypatch):
+        """Test that balances as of earlier moments replay from snapshots to the same totals"""
+        monkeypatch.setattr(balances, "BALANCE_SNAPSHOT_INTERVAL", 3)
+        moments = [datetime.utcnow().isoformat()]
+        for amount in (10.0, 20.0, 30.0, 40.0):
+            self._add(client, group, members[0], amount)
+            moments.append(datetime.utcnow().isoformat())
+
+        with SessionLocal() as db:
+            snapshots = db.scalar(
+                select(func.count(func.distinct(models.BalanceSnapshot.ledger_id)))
+                .where(models.BalanceSnapshot.group_id == group["id"])
+            )
+            positions = db.scalars(
+                select(models.BalanceLedgerEntry.id)
+                .where(models.BalanceLedgerEntry.group_id == group["id"])
+                .order_by(models.BalanceLedgerEntry.id)
+            ).all()
+            for position in positions:
+                replayed = balances.ledger_totals(db, group["id"], upto=position)
+                replayed = {user_id: total for (_, user_id), total in replayed.items()}
+                assert balances.totals_at(db, group["id"], position) == replayed
+        assert snapshots == 2
+
+        assert [self._nets(client, group, members[1], as_of=moment) for moment in moments] == [
+            [0.0, 0.0], [5.0, -5.0], [15.0, -15.0], [30.0, -30.0], [50.0, -50.0]
+        ]
+        assert self._nets(client, group, members[1], as_of="2000-01-01T00:00:00") == []
+
+    def test_cli(self, client, members, group):
+        """Test that check spots drifted totals and rebuild restores them from the ledger"""
+        self._add(client, group, members[0], 12.0)
+        with SessionLocal() as db:
+            db.execute(
+                update(models.MemberBalance)
+                .where(models.MemberBalance.group_id == group["id"])
+                .values(paid=models.MemberBalance.paid + 1)
+            )
+            db.commit()
+            assert len(balances.check(db, group["id"])) == 2
+        assert balances.main(["check"]) == 1
+        assert balances.main(["rebuild"]) == 0
+        assert balances.main(["check"]) == 0
+        assert self._nets(client, group, members[0]) == [6.0, -6.0]
@@ -0,0 +1,155 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import update
+
+from app import batch, crud, models
+from app.database import SessionLocal
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestExpenseBatch:
+    """Test the transactional batch mutation endpoint"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    def _expense(self, description: str, amount: float = 10.0) -> Dict:
+        return {
+            "date": "2024-01-05T09:00:00",
+            "category": "Food",
+            "amount": amount,
+            "payment_method": "Cash",
+            "description": description
+        }
+
+    def _batch(self, client, headers, operations):
+        response = client.post("/batch/expenses", json={"operations": operations}, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_mixed_operations(self, client, auth_headers):
+        """Test creates, updates and deletes applied together with per-op results"""
+        kept = client.post("/expenses/", json=self._expense("Kept"), headers=auth_headers).json()
+        gone = client.post("/expenses/", json=self._expense("Gone"), headers=auth_headers).json()
+
+        result = self._batch(client, auth_headers, [
+            {"op": "create", "expense": self._expense("New"), "client_id": "local-1"},
+            {"op": "update", "id": kept["id"], "changes": {"amount": 20}},
+            {"op": "update", "id": kept["id"], "changes": {"description": "Kept, edited"}},
+            {"op": "delete", "id": gone["id"]},
+        ])
+        assert result["applied"] == 4 and result["failed"] == 0
+        created = result["results"][0]
+        assert created["status"] == "created" and created["client_id"] == "local-1"
+        assert [r["status"] for r in result["results"][1:]] == ["updated", "updated", "deleted"]
+
+        expenses = {e["id"]: e for e in client.get("/expenses/", headers=auth_headers).json()}
+        assert set(expenses) == {kept["id"], created["id"]}
+        assert expenses[kept["id"]]["amount"] == 20
+        assert expenses[kept["id"]]["description"] == "Kept, edited"
+        assert expenses[created["id"]]["description"] == "New"
+
+    def test_invalid_operations_are_isolated(self, client, auth_headers, second_auth_headers):
+        """Test that invalid or foreign operations fail alone"""
+        foreign = client.post("/expenses/", json=self._expense("Foreign"), headers=second_auth_headers).json()
+        result = self._batch(client, auth_headers, [
+            {"op": "create", "expense": self._expense("Good")},
+            {"op": "create", "expense": {**self._expense("Bad"), "amount": -1}},
+            {"op": "update", "id": foreign["id"], "changes": {"amount": 1}},
+            {"op": "delete", "id": foreign["id"]},
+            {"op": "rename", "id": 1},
+            {"op": "update", "id": foreign["id"], "changes": {"category": None}},
+            {"op": "create", "expense": {**self._expense("Blank"), "category": "  "}},
+        ])
+        assert [r["status"] for r in result["results"]] == [
+            "created", "error", "error", "error", "error", "error", "error"
+        ]
+        details = [r["detail"] for r in result["results"]]
+        assert details[1].startswith("expense.amount")
+        assert details[2] == details[3] == "Expense not found"
+        assert details[5].startswith("changes.category")
+        assert details[6] == "Category cannot be empty"
+        assert result["applied"] == 1 and result["failed"] == 6
+        assert len(client.get("/expenses/", headers=second_auth_headers).json()) == 1
+
+    def test_update_after_delete_fails(self, client, auth_headers):
+        """Test that operations are checked in order"""
+        expense = client.post("/expenses/", json=self._expense("Once"), headers=auth_headers).json()
+        result = self._batch(client, auth_headers, [
+            {"op": "update", "id": expense["id"], "changes": {"amount": 1}},
+            {"op": "delete", "id": expense["id"]},
+            {"op": "update", "id": expense["id"], "changes": {"amount": 2}},
+        ])
+        assert [r["status"] for r in result["results"]] == ["updated", "deleted", "error"]
+        assert client.get("/expenses/", headers=auth_headers).json() == []
+
+    def test_versioned_updates(self, client, auth_headers):
+        """Test that update versions are checked in order and bumped once per update"""
+        expense = client.post("/expenses/", json=self._expense("Versioned"), headers=auth_headers).json()
+        result = self._batch(client, auth_headers, [
+            {"op": "update", "id": expense["id"], "changes": {"amount": 1}, "version": 1},
+            {"op": "update", "id": expense["id"], "changes": {"amount": 2}, "version": 2},
+            {"op": "update", "id": expense["id"], "changes": {"amount": 3}, "version": 2},
+        ])
+        assert [r["status"] for r in result["results"]] == ["updated", "updated", "error"]
+        assert [r["version"] for r in result["results"][:2]] == [2, 3]
+        assert result["results"][2]["detail"] == "Expense was modified by another request"
+
+        stored = client.get("/expenses/", headers=auth_headers).json()[0]
+        assert stored["amount"] == 2 and stored["version"] == 3
+
+    def test_concurrent_update_conflicts(self, client, auth_headers):
+        """Test that an update committed while the batch waits is reported as a conflict, not overwritten"""
+        expense = client.post("/expenses/", json=self._expense("Raced"), headers=auth_headers).json()
+        with SessionLocal() as db:
+            # Hold the write lock, as a PATCH in flight does, while the batch starts
+            crud.next_sequence(db)
+            db.execute(
+                update(models.Expense).where(models.Expense.id == expense["id"])
+                .values(amount=5, version=models.Expense.version + 1)
+            )
+            results = []
+            worker = threading.Thread(target=lambda: results.append(self._batch(client, auth_headers, [
+                {"op": "update", "id": expense["id"], "changes": {"amount": 1}, "version": 1},
+            ])))
+            worker.start()
+            time.sleep(0.3)
+            db.commit()
+        worker.join()
+        assert results[0]["results"][0]["status"] == "error"
+        assert results[0]["results"][0]["detail"] == "Expense was modified by another request"
+        stored = client.get("/expenses/", headers=auth_headers).json()[0]
+        assert stored["amount"] == 5 and stored["version"] == 2
+
+    def test_batch_is_synced(self, client, auth_headers):
+        """Test that batch changes reach the sync feed in operation order"""
+        expense = client.post("/expenses/", json=self._expense("Synced"), headers=auth_headers).json()
+        since = client.get("/sync/changes", headers=auth_headers).json()["next_since"]
+        result = self._batch(client, auth_headers, [
+            {"op": "create", "expense": self._expense("Batch")},
+            {"op": "delete", "id": expense["id"]},
+        ])
+        feed = client.get("/sync/changes", params={"since": since}, headers=auth_headers).json()
+        assert [(c["op"], c["id"]) for c in feed["changes"]] == [
+            ("upsert", result["results"][0]["id"]),
+            ("delete", expense["id"]),
+        ]
+
+    def test_batch_limit(self, client, auth_headers, monkeypatch):
+        """Test that oversized batches are rejected up front"""
+        monkeypatch.setattr(batch, "BATCH_MAX_OPERATIONS", 2)
+        operations = [{"op": "delete", "id": 1}] * 3
+        response = client.post("/batch/expenses", json={"operations": operations}, headers=auth_headers)
+        assert response.status_code == 422
+        assert self._batch(client, auth_headers, [])["results"] == []
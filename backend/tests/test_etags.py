@@ -0,0 +1,101 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from typing import Dict
+
+from app import crud_async
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestListETags:
+    """Test conditional GET on the list endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def expense(self) -> Dict:
+        """Fixture for a valid expense"""
+        return {
+            "date": "2024-01-05T09:00:00",
+            "category": "Food",
+            "amount": 12.5,
+            "payment_method": "Cash",
+            "description": "ETag lunch"
+        }
+
+    def _revalidate(self, client, url, headers, etag):
+        return client.get(url, headers={**headers, "If-None-Match": etag})
+
+    def test_expenses_not_modified(self, client, auth_headers, expense, monkeypatch):
+        """Test that a matching If-None-Match gets 304 without listing"""
+        client.post("/expenses/", json=expense, headers=auth_headers)
+        response = client.get("/expenses/", headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.startswith('"') and etag.endswith('"')
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("the list query ran")
+        monkeypatch.setattr(crud_async, "get_expenses", fail)
+        response = self._revalidate(client, "/expenses/", auth_headers, etag)
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    def test_expense_mutations_change_etag(self, client, auth_headers, expense):
+        """Test that creating and deleting expenses invalidate the ETag"""
+        etag = client.get("/expenses/", headers=auth_headers).headers["ETag"]
+        created = client.post("/expenses/", json=expense, headers=auth_headers).json()
+        response = self._revalidate(client, "/expenses/", auth_headers, etag)
+        assert response.status_code == 200
+        assert [e["id"] for e in response.json()] == [created["id"]]
+
+        etag = response.headers["ETag"]
+        client.delete(f"/expenses/{created['id']}", headers=auth_headers)
+        response = self._revalidate(client, "/expenses/", auth_headers, etag)
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_etag_depends_on_query(self, client, auth_headers):
+        """Test that different pages or filters get different ETags"""
+        first = client.get("/expenses/?limit=1", headers=auth_headers).headers["ETag"]
+        second = client.get("/expenses/?limit=2", headers=auth_headers).headers["ETag"]
+        assert first != second
+        assert self._revalidate(client, "/expenses/?limit=2", auth_headers, first).status_code == 200
+
+    def test_etag_is_per_user(self, client, auth_headers, second_auth_headers):
+        """Test that one user's ETag does not match another user's list"""
+        etag = client.get("/expenses/", headers=auth_headers).headers["ETag"]
+        assert self._revalidate(client, "/expenses/", second_auth_headers, etag).status_code == 200
+
+    def test_groups_etag(self, client, auth_headers, second_auth_headers):
+        """Test that creating or joining a group invalidates the member's group list"""
+        etag = client.get("/groups/", headers=second_auth_headers).headers["ETag"]
+        assert self._revalidate(client, "/groups/", second_auth_headers, etag).status_code == 304
+
+        group = client.post("/groups/", json={"name": "ETag group"}, headers=auth_headers).json()
+        assert self._revalidate(client, "/groups/", second_auth_headers, etag).status_code == 304
+        client.post(f"/groups/{group['id']}/join", headers=second_auth_headers)
+        response = self._revalidate(client, "/groups/", second_auth_headers, etag)
+        assert response.status_code == 200
+        assert [g["id"] for g in response.json()] == [group["id"]]
+
+    def test_group_expenses_etag(self, client, auth_headers, second_auth_headers, expense):
+        """Test group expense ETags, with membership checked before 304"""
+        group = client.post("/groups/", json={"name": "ETag group"}, headers=auth_headers).json()
+        url = f"/groups/{group['id']}/expenses/"
+        etag = client.get(url, headers=auth_headers).headers["ETag"]
+        assert self._revalidate(client, url, auth_headers, etag).status_code == 304
+        assert self._revalidate(client, url, second_auth_headers, "*").status_code == 403
+
+        client.post(f"/groups/{group['id']}/expenses", json=expense, headers=auth_headers)
+        response = self._revalidate(client, url, auth_headers, etag)
+        assert response.status_code == 200
+        assert len(response.json()) == 1
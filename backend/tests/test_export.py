@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+import csv
+import io
+import json
+import logging
+from typing import Dict
+
+from app import export
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestExport:
+    """Test streaming CSV/NDJSON export"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def small_batches(self, monkeypatch):
+        """Fixture forcing several batches for a handful of rows"""
+        monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+
+    def _expense(self, i: int) -> Dict:
+        return {
+            "date": f"2024-01-{10 - i:02d}T09:00:00",
+            "category": "Food" if i % 2 else "Travel",
+            "amount": 10.0 + i,
+            "payment_method": "Cash",
+            "description": f"Export, \"quoted\" {i}"
+        }
+
+    def test_csv_export(self, client, auth_headers, small_batches):
+        """Test that CSV export streams every expense in date order"""
+        for i in range(5):
+            client.post("/expenses/", json=self._expense(i), headers=auth_headers)
+        response = client.get("/expenses/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="expenses.csv"' in response.headers["content-disposition"]
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["description"] for row in rows] == [f"Export, \"quoted\" {i}" for i in reversed(range(5))]
+        assert rows[0]["date"] == "2024-01-06T09:00:00"
+        assert rows[0]["payment_method"] == "Cash"
+
+    def test_ndjson_export_with_filters(self, client, auth_headers, small_batches):
+        """Test NDJSON export restricted by the list filters"""
+        for i in range(5):
+            client.post("/expenses/", json=self._expense(i), headers=auth_headers)
+        response = client.get("/expenses/export?format=ndjson&category=Food", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["amount"] for row in rows] == [13.0, 11.0]
+
+    def test_empty_export(self, client, auth_headers):
+        """Test that an empty CSV export still has its header"""
+        response = client.get("/expenses/export", headers=auth_headers)
+        assert response.text == "id,date,category,amount,description,payment_method\n"
+
+    def test_group_export(self, client, auth_headers, second_auth_headers, sign_up):
+        """Test group export with the user's share, for members only"""
+        group = client.post("/groups/", json={"name": "Export group"}, headers=auth_headers).json()
+        client.post(f"/groups/{group['id']}/join", headers=second_auth_headers)
+        client.post(f"/groups/{group['id']}/expenses", json=self._expense(1), headers=auth_headers)
+
+        url = f"/groups/{group['id']}/expenses/export?format=ndjson"
+        rows = [json.loads(line) for line in client.get(url, headers=second_auth_headers).text.splitlines()]
+        assert len(rows) == 1
+        assert rows[0]["user_split"] == 5.5
+
+        outsider = sign_up("test_export_outsider")
+        assert client.get(url, headers=outsider).status_code == 403
+        assert client.get("/groups/999999/expenses/export", headers=auth_headers).status_code == 404
+        response = client.get(f"{url}&payment_method=Cash", headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_invalid_format(self, client, auth_headers):
+        """Test that unknown formats are rejected"""
+        assert client.get("/expenses/export?format=xml", headers=auth_headers).status_code == 422
+        assert client.get("/expenses/export").status_code == 401
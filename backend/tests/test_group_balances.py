@@ -0,0 +1,95 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from typing import Dict, List
+
+from sqlalchemy import update
+
+from app import crud, models
+from app.database import SessionLocal
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestGroupBalances:
+    """Test the per-member net balances of a group"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def members(self, sign_up) -> List[Dict]:
+        """Fixture for authorization headers of three fresh users"""
+        return [sign_up(f"{name}_balances", full_name=name) for name in ("alice", "bob", "carol")]
+
+    @pytest.fixture
+    def group(self, client, members) -> Dict:
+        """Fixture for a group all three users belong to"""
+        group = client.post("/groups/", json={"name": "Balances Group"}, headers=members[0]).json()
+        for headers in members[1:]:
+            assert client.post(f"/groups/{group['id']}/join", headers=headers).status_code == 200
+        return group
+
+    def _member_ids(self, client, group, headers) -> List[int]:
+        response = client.get(f"/groups/{group['id']}/members/", headers=headers)
+        names = {member["full_name"]: member["id"] for member in response.json()}
+        return [names["alice"], names["bob"], names["carol"]]
+
+    def _add(self, client, group, headers, amount: float, **split) -> Dict:
+        response = client.post(f"/groups/{group['id']}/expenses", json={
+            "date": "2024-03-01T12:00:00", "category": "Food", "amount": amount, "split_type": "equal", **split
+        }, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_net_balances(self, client, members, group):
+        """Test paid, owed and net for equal and custom splits"""
+        alice, bob, carol = self._member_ids(client, group, members[0])
+        self._add(client, group, members[0], 90.0)
+        self._add(client, group, members[1], 60.0, split_type="custom", custom_splits={
+            str(alice): 50, str(bob): 0, str(carol): 50
+        })
+
+        response = client.get(f"/groups/{group['id']}/balances", headers=members[2])
+        assert response.status_code == 200
+        assert response.json() == [
+            {"user_id": alice, "full_name": "alice", "paid": 90.0, "owed": 60.0, "net": 30.0},
+            {"user_id": bob, "full_name": "bob", "paid": 60.0, "owed": 30.0, "net": 30.0},
+            {"user_id": carol, "full_name": "carol", "paid": 0.0, "owed": 60.0, "net": -60.0},
+        ]
+
+    def test_settled_splits_and_etag(self, client, members, group):
+        """Test that reconciled settled splits drop out and that writes change the ETag"""
+        alice, bob, carol = self._member_ids(client, group, members[0])
+        expense = self._add(client, group, members[0], 30.0)
+        first = client.get(f"/groups/{group['id']}/balances", headers=members[0])
+        assert client.get(
+            f"/groups/{group['id']}/balances", headers={**members[0], "If-None-Match": first.headers["ETag"]}
+        ).status_code == 304
+
+        with SessionLocal() as db:
+            db.execute(
+                update(models.ExpenseSplit)
+                .where(models.ExpenseSplit.expense_id == expense["id"], models.ExpenseSplit.user_id == bob)
+                .values(paid=True)
+            )
+            db.commit()
+            # Settling outside crud needs correcting ledger entries for alice's paid and bob's owed
+            assert crud.reconcile_balances(db, group["id"]) == 2
+        self._add(client, group, members[2], 0.0)
+        response = client.get(
+            f"/groups/{group['id']}/balances", headers={**members[0], "If-None-Match": first.headers["ETag"]}
+        )
+        assert response.status_code == 200
+        assert [(b["user_id"], b["net"]) for b in response.json()] == [(alice, 10.0), (bob, 0.0), (carol, -10.0)]
+
+    def test_access(self, client, members, group, sign_up):
+        """Test that only members can read balances"""
+        outsider = sign_up("dave_balances", full_name="dave")
+        assert client.get(f"/groups/{group['id']}/balances", headers=outsider).status_code == 403
+        assert client.get("/groups/99999/balances", headers=members[0]).status_code == 404
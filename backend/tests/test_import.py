@@ -0,0 +1,155 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+
+from app import importers
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+CSV_STATEMENT = """date,category,amount,description,payment_method
+2024-01-05,Food,12.50,Lunch,Card
+2024-01-06T08:30:00,Travel,30,Train,Card
+2024-01-07,Food,-4,Refund,Card
+not-a-date,Food,4,Coffee,Card
+2024-01-08, ,4,Coffee,
+2024-01-05,Food,12.50,Lunch,Card
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKACCTFROM><BANKID>1<ACCTID>12345<ACCTTYPE>CHECKING</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240105120000[-5:EST]
+<TRNAMT>-42.10
+<FITID>T1
+<NAME>GROCER
+<MEMO>Weekly shop
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240106<TRNAMT>1000.00<FITID>T2<NAME>SALARY</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240107<TRNAMT>-5<FITID>T3<NAME>COFFEE</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF_STATEMENT = """!Type:Bank
+D01/05/2024
+T-1,234.56
+PLandlord
+LRent
+^
+D01/06'24
+T-20.00
+PCinema
+^
+D01/07/2024
+T500.00
+PRefund
+^
+"""
+
+
+class TestImport:
+    """Test bulk statement import"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    def _import(self, client, headers, filename: str, content: str, **params):
+        return client.post(
+            "/expenses/import", params=params, headers=headers,
+            files={"file": (filename, content.encode(), "application/octet-stream")}
+        )
+
+    def test_csv_import_report(self, client, auth_headers, monkeypatch):
+        """Test that valid rows are inserted and bad rows reported by line"""
+        monkeypatch.setattr(importers, "IMPORT_CHUNK_SIZE", 2)
+        response = self._import(client, auth_headers, "statement.csv", CSV_STATEMENT)
+        assert response.status_code == 200
+        report = response.json()
+        assert report["imported"] == 3
+        assert report["failed"] == 3
+        assert report["duplicates"] == 0
+        assert [(r["row"], r["status"]) for r in report["rows"]] == [(4, "error"), (5, "error"), (6, "error")]
+        assert report["rows"][0]["detail"].startswith("amount")
+
+        expenses = client.get("/expenses/", headers=auth_headers).json()
+        # The repeated lunch on line 7 is a second purchase, not a duplicate
+        assert sorted(e["description"] for e in expenses) == ["Lunch", "Lunch", "Train"]
+        # Empty cells fall back to the defaults, blank ones are rejected
+        assert report["rows"][2]["detail"] == "category: Category cannot be empty"
+
+    def test_reimport_skips_duplicates(self, client, auth_headers):
+        """Test that importing the same statement twice inserts nothing new"""
+        self._import(client, auth_headers, "statement.csv", CSV_STATEMENT)
+        report = self._import(client, auth_headers, "statement.csv", CSV_STATEMENT).json()
+        assert report["imported"] == 0
+        assert report["duplicates"] == 3
+        assert len(client.get("/expenses/", headers=auth_headers).json()) == 3
+
+    def test_reimport_with_more_repeats(self, client, auth_headers):
+        """Test that a later statement with one more identical row imports only that row"""
+        self._import(client, auth_headers, "statement.csv", CSV_STATEMENT)
+        report = self._import(
+            client, auth_headers, "statement.csv", CSV_STATEMENT + "2024-01-05,Food,12.50,Lunch,Card\n"
+        ).json()
+        assert report["imported"] == 1
+        assert report["duplicates"] == 3
+        assert [(r["row"], r["status"]) for r in report["rows"] if r["status"] == "duplicate"] == [
+            (2, "duplicate"), (3, "duplicate"), (7, "duplicate")
+        ]
+
+    def test_ofx_import(self, client, auth_headers):
+        """Test OFX debits become expenses and credits are reported"""
+        report = self._import(client, auth_headers, "bank.qfx", OFX_STATEMENT, category="Bank").json()
+        assert report["imported"] == 2
+        assert report["failed"] == 1
+        assert "Credit" in report["rows"][0]["detail"]
+
+        expenses = client.get("/expenses/", headers=auth_headers).json()
+        assert sorted((e["amount"], e["description"], e["category"], e["payment_method"]) for e in expenses) == [
+            (5.0, "COFFEE", "Bank", "Imported"),
+            (42.1, "GROCER - Weekly shop", "Bank", "Imported"),
+        ]
+        assert self._import(client, auth_headers, "bank.ofx", OFX_STATEMENT).json()["duplicates"] == 2
+
+    def test_qif_import(self, client, auth_headers):
+        """Test QIF records with categories, thousands separators and short years"""
+        report = self._import(client, auth_headers, "register.qif", QIF_STATEMENT).json()
+        assert report["imported"] == 2
+        assert report["failed"] == 1
+
+        expenses = client.get("/expenses/", headers=auth_headers).json()
+        assert sorted((e["date"][:10], e["amount"], e["category"]) for e in expenses) == [
+            ("2024-01-05", 1234.56, "Rent"),
+            ("2024-01-06", 20.0, "Uncategorized"),
+        ]
+
+    def test_imported_rows_are_synced(self, client, auth_headers):
+        """Test that imported rows appear in the sync feed and change the list ETag"""
+        etag = client.get("/expenses/", headers=auth_headers).headers["ETag"]
+        self._import(client, auth_headers, "statement.csv", CSV_STATEMENT)
+        feed = client.get("/sync/changes", headers=auth_headers).json()
+        assert [c["op"] for c in feed["changes"]] == ["upsert", "upsert", "upsert"]
+        assert feed["changes"][0]["seq"] < feed["changes"][1]["seq"] < feed["changes"][2]["seq"]
+        response = client.get("/expenses/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+    def test_format_required(self, client, auth_headers):
+        """Test that an unknown extension without format is rejected"""
+        assert self._import(client, auth_headers, "statement.txt", CSV_STATEMENT).status_code == 422
+        response = self._import(client, auth_headers, "statement.txt", CSV_STATEMENT, format="csv")
+        assert response.status_code == 200
+
+    def test_csv_missing_columns(self, client, auth_headers):
+        """Test that a CSV without date or amount columns fails as a whole"""
+        report = self._import(client, auth_headers, "statement.csv", "when,what\n2024-01-01,x\n").json()
+        assert report["imported"] == 0
+        assert report["rows"] == [{"row": 1, "status": "error", "detail": "Missing CSV columns: amount, date"}]
@@ -0,0 +1,84 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from typing import Dict
+
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestLeanLists:
+    """Test that lean=true list responses match the regular ones"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    def _expense(self, day: int, description=None) -> Dict:
+        return {
+            "date": f"2024-01-{day:02d}T09:30:00.250000",
+            "category": "Food" if day % 2 else "Travel",
+            "amount": 10.0 + day,
+            "payment_method": "Cash",
+            "description": description
+        }
+
+    def _compare(self, client, headers, url, params) -> Dict:
+        full = client.get(url, params=params, headers=headers)
+        lean = client.get(url, params={**params, "lean": "true"}, headers=headers)
+        assert full.status_code == lean.status_code == 200
+        assert lean.headers["content-type"] == "application/json"
+        assert lean.json() == full.json()
+        return lean
+
+    def test_expenses_match(self, client, auth_headers):
+        """Test offset pages, keyset pages and filters in lean mode"""
+        ids = [
+            client.post("/expenses/", json=self._expense(day, f"Day {day}" if day != 2 else None),
+                        headers=auth_headers).json()["id"]
+            for day in (3, 1, 2, 5, 4)
+        ]
+        assert client.patch(f"/expenses/{ids[0]}", json={"amount": 1}, headers=auth_headers).status_code == 200
+
+        assert len(self._compare(client, auth_headers, "/expenses/", {}).json()) == 5
+        self._compare(client, auth_headers, "/expenses/", {"skip": 1, "limit": 2})
+        self._compare(client, auth_headers, "/expenses/", {"category": "Food", "search": "day"})
+        first = self._compare(client, auth_headers, "/expenses/", {"cursor": "", "limit": 2}).json()
+        assert first["next_cursor"]
+        self._compare(client, auth_headers, "/expenses/", {"cursor": first["next_cursor"], "limit": 2})
+
+    def test_group_expenses_match(self, client, auth_headers, second_auth_headers):
+        """Test that splits and the caller's share are the same in lean mode"""
+        group = client.post("/groups/", json={"name": "Lean group"}, headers=auth_headers).json()
+        client.post(f"/groups/{group['id']}/join", headers=second_auth_headers)
+        url = f"/groups/{group['id']}/expenses/"
+        for day in (1, 2, 3):
+            payer = auth_headers if day != 2 else second_auth_headers
+            response = client.post(f"/groups/{group['id']}/expenses",
+                                   json={**self._expense(day, "Shared"), "split_type": "equal"}, headers=payer)
+            assert response.status_code == 200
+
+        items = self._compare(client, auth_headers, url, {}).json()
+        assert [len(item["splits"]) for item in items] == [2, 2, 2]
+        assert [item["is_paid_by_user"] for item in items] == [True, False, True]
+        self._compare(client, second_auth_headers, url, {"skip": 1, "limit": 1})
+
+    def test_lean_keeps_etag_and_access_checks(self, client, auth_headers, second_auth_headers):
+        """Test that lean responses carry the ETag and still check membership"""
+        client.post("/expenses/", json=self._expense(1), headers=auth_headers)
+        lean = client.get("/expenses/", params={"lean": "true"}, headers=auth_headers)
+        assert lean.headers["etag"] and lean.headers["cache-control"] == "private, no-cache"
+        response = client.get("/expenses/", params={"lean": "true"},
+                              headers={**auth_headers, "If-None-Match": lean.headers["etag"]})
+        assert response.status_code == 304
+
+        group = client.post("/groups/", json={"name": "Private group"}, headers=auth_headers).json()
+        response = client.get(f"/groups/{group['id']}/expenses/", params={"lean": "true"},
+                              headers=second_auth_headers)
+        assert response.status_code == 403
+        assert client.get("/expenses/", params={"lean": "true", "skip": -1},
+                          headers=auth_headers).status_code == 422
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+import subprocess
+import sys
+
+from sqlalchemy import create_engine
+
+from app import database
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestLifespan:
+    """Test the startup work done by the application lifespan"""
+
+    def test_startup_prewarms(self):
+        """Test that startup caches the OpenAPI document and fills the pool"""
+        app.openapi_schema = None
+        with TestClient(app) as client:
+            assert app.openapi_schema is not None
+            assert database.engine.pool.checkedin() >= 1
+            assert client.get("/").status_code == 200
+
+    def test_import_has_no_side_effects(self):
+        """Test that importing the app neither touches the database nor loads jose/passlib/numpy"""
+        code = (
+            "import sys\n"
+            "from app import database\n"
+            "from app.main import app\n"
+            "assert database.engine.pool.checkedin() == 0\n"
+            "assert 'jose' not in sys.modules\n"
+            "assert 'passlib.context' not in sys.modules\n"
+            "assert 'numpy' not in sys.modules\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+    def test_check_mode_rejects_unmigrated_database(self, tmp_path):
+        """Test that schema check mode fails fast without the Alembic head"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'unmigrated.db'}")
+        with pytest.raises(RuntimeError, match="alembic upgrade head"):
+            database.check_schema(engine)
+        engine.dispose()
@@ -0,0 +1,190 @@
+import pytest
+import logging
+import os
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+from app import balances, models, rollups, search
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestMigrations:
+    """Test the Alembic migration chain"""
+
+    @pytest.fixture
+    def database_url(self, tmp_path) -> str:
+        return f"sqlite:///{tmp_path / 'migrations.db'}"
+
+    @pytest.fixture
+    def alembic_config(self, database_url) -> Config:
+        """Fixture for an Alembic config pointed at a scratch database"""
+        config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+        config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+        config.set_main_option("sqlalchemy.url", database_url)
+        return config
+
+    def test_head_matches_models(self, alembic_config, database_url):
+        """Test that upgrading to head yields exactly the model schema"""
+        command.upgrade(alembic_config, "head")
+        engine = create_engine(database_url)
+        with engine.connect() as connection:
+            context = MigrationContext.configure(connection, opts={"include_name": search.include_name})
+            diff = compare_metadata(context, models.Base.metadata)
+        engine.dispose()
+        assert diff == []
+
+    def test_hot_path_indexes(self, alembic_config, database_url):
+        """Test that the composite indexes exist after upgrading"""
+        command.upgrade(alembic_config, "head")
+        engine = create_engine(database_url)
+        inspector = inspect(engine)
+        indexes = {
+            index["name"]: index
+            for table in ("expenses", "group_expenses", "expense_splits", "group_members")
+            for index in inspector.get_indexes(table)
+        }
+        engine.dispose()
+        assert indexes["ix_expenses_user_id_date"]["column_names"] == ["user_id", "date"]
+        assert indexes["ix_group_expenses_group_id_date"]["column_names"] == ["group_id", "date"]
+        assert indexes["ix_expense_splits_expense_id_user_id"]["column_names"] == ["expense_id", "user_id"]
+        assert indexes["ix_group_members_group_id_user_id"]["unique"]
+
+    def test_sync_backfill(self, alembic_config, database_url):
+        """Test that existing rows get sync positions and the counter continues after them"""
+        command.upgrade(alembic_config, "0004")
+        engine = create_engine(database_url)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO users (id, email) VALUES (1, 'a@example.com')")
+            connection.exec_driver_sql(
+                "INSERT INTO expenses (id, user_id, date, category, amount) "
+                "VALUES (1, 1, '2024-01-01', 'Food', 1), (2, 1, '2024-01-02', 'Food', 2)"
+            )
+            connection.exec_driver_sql("INSERT INTO groups (id, name, created_by) VALUES (1, 'g', 1)")
+            connection.exec_driver_sql("INSERT INTO group_members (id, group_id, user_id) VALUES (1, 1, 1)")
+            connection.exec_driver_sql(
+                "INSERT INTO group_expenses (id, group_id, paid_by, date, amount) VALUES (1, 1, 1, '2024-01-03', 3)"
+            )
+        command.upgrade(alembic_config, "head")
+        with engine.connect() as connection:
+            seqs = [
+                row[0] for row in connection.exec_driver_sql(
+                    "SELECT seq FROM expenses UNION ALL SELECT seq FROM group_expenses "
+                    "UNION ALL SELECT seq FROM group_members"
+                )
+            ]
+            counter = connection.exec_driver_sql(
+                "SELECT version FROM collection_versions WHERE scope = 'sync'"
+            ).scalar()
+        engine.dispose()
+        assert sorted(seqs) == [1, 2, 3, 4]
+        assert counter == 4
+
+    def test_search_index(self, alembic_config, database_url):
+        """Test that existing expenses are indexed for search and later changes follow"""
+        command.upgrade(alembic_config, "0007")
+        engine = create_engine(database_url)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO users (id, email) VALUES (1, 'a@example.com')")
+            connection.exec_driver_sql(
+                "INSERT INTO expenses (id, user_id, date, category, amount, description) "
+                "VALUES (1, 1, '2024-01-01', 'Food', 1, 'Lunch')"
+            )
+            connection.exec_driver_sql("INSERT INTO groups (id, name, created_by) VALUES (1, 'g', 1)")
+            connection.exec_driver_sql(
+                "INSERT INTO group_expenses (id, group_id, paid_by, date, amount, description) "
+                "VALUES (1, 1, 1, '2024-01-03', 3, 'Taxi')"
+            )
+        command.upgrade(alembic_config, "head")
+        with engine.begin() as connection:
+            connection.exec_driver_sql("UPDATE expenses SET description = 'Dinner' WHERE id = 1")
+            indexed = connection.exec_driver_sql(
+                "SELECT rowid, description, scope FROM expense_search ORDER BY rowid"
+            ).all()
+        engine.dispose()
+        assert [tuple(row) for row in indexed] == [(2, "Dinner", "u1"), (3, "Taxi", "g1")]
+
+    def test_rollup_backfill(self, alembic_config, database_url):
+        """Test that existing expenses are rolled up the same way the app maintains them"""
+        command.upgrade(alembic_config, "0008")
+        engine = create_engine(database_url)
+        with engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO users (id, email) VALUES (1, 'a@example.com')")
+            connection.exec_driver_sql(
+                "INSERT INTO expenses (id, user_id, date, category, amount) VALUES "
+                "(1, 1, '2024-01-01 09:00:00.000000', 'Food', 1), "
+                "(2, 1, '2024-01-01 21:30:00.000000', 'Food', 4), "
+                "(3, 1, '2024-01-02 08:00:00.000000', 'Food', 2)"
+            )
+            connection.exec_driver_sql("INSERT INTO groups (id, name, created_by) VALUES (1, 'g', 1)")
+            connection.exec_driver_sql(
+                "INSERT INTO group_expenses (id, group_id, paid_by, date, category, amount) VALUES "
+                "(1, 1, 1, '2024-01-03 12:00:00.000000', 'Taxi', 3), "
+                "(2, 1, 1, '2024-01-30 12:00:00.000000', 'Taxi', 5)"
+            )
+        command.upgrade(alembic_config, "head")
+        with engine.connect() as connection:
+            daily = connection.exec_driver_sql(
+                "SELECT day, category, total, count, max_amount FROM daily_expense_rollups ORDER BY day"
+            ).all()
+            monthly = connection.exec_driver_sql(
+                "SELECT month, category, total, count, max_amount FROM monthly_group_rollups"
+            ).all()
+        with Session(engine) as db:
+            mismatches = [rollups.check(db, rollup) for rollup in rollups.ROLLUPS.values()]
+        engine.dispose()
+        assert [tuple(row) for row in daily] == [
+            ("2024-01-01", "Food", 5.0, 2, 4.0), ("2024-01-02", "Food", 2.0, 1, 2.0)
+        ]
+        assert [tuple(row) for row in monthly] == [("2024-01-01", "Taxi", 8.0, 2, 5.0)]
+        assert mismatches == [[], []]
+
+    def test_balance_ledger_backfill(self, alembic_config, database_url):
+        """Test that existing unsettled splits become ledger entries and member totals"""
+        command.upgrade(alembic_config, "0009")
+        engine = create_engine(database_url)
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO users (id, email) VALUES (1, 'a@example.com'), (2, 'b@example.com')"
+            )
+            connection.exec_driver_sql("INSERT INTO groups (id, name, created_by) VALUES (1, 'g', 1)")
+            connection.exec_driver_sql(
+                "INSERT INTO group_expenses (id, group_id, paid_by, date, category, amount) VALUES "
+                "(1, 1, 1, '2024-01-03 12:00:00.000000', 'Taxi', 30), "
+                "(2, 1, 2, '2024-01-04 12:00:00.000000', 'Food', 10)"
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO expense_splits (expense_id, user_id, amount, paid) VALUES "
+                "(1, 1, 15, 0), (1, 2, 15, 0), (2, 1, 5, 1), (2, 2, 5, 0)"
+            )
+        command.upgrade(alembic_config, "head")
+        with engine.connect() as connection:
+            ledger = connection.exec_driver_sql(
+                "SELECT user_id, expense_id, paid, owed FROM balance_ledger ORDER BY id"
+            ).all()
+            totals = connection.exec_driver_sql(
+                "SELECT user_id, paid, owed FROM member_balances ORDER BY user_id"
+            ).all()
+        with Session(engine) as db:
+            mismatches = balances.check(db)
+        engine.dispose()
+        assert [tuple(row) for row in ledger] == [(1, 1, 30.0, 15.0), (2, 1, 0.0, 15.0), (2, 2, 5.0, 5.0)]
+        assert [tuple(row) for row in totals] == [(1, 30.0, 15.0), (2, 5.0, 20.0)]
+        assert mismatches == []
+
+    def test_downgrade_to_base(self, alembic_config, database_url):
+        """Test that every revision can be rolled back"""
+        command.upgrade(alembic_config, "head")
+        command.downgrade(alembic_config, "base")
+        engine = create_engine(database_url)
+        assert inspect(engine).get_table_names() == ["alembic_version"]
+        engine.dispose()
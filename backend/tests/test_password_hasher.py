@@ -0,0 +1,80 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+import logging
+import threading
+
+from app import main
+from app.main import app
+from app.hashing import PasswordHasher
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestPasswordHasher:
+    """Test the bounded bcrypt worker pool"""
+
+    @pytest.fixture
+    def release(self):
+        """Fixture for an event that unblocks saturating tasks"""
+        event = threading.Event()
+        yield event
+        event.set()
+
+    @pytest.fixture
+    def saturated_hasher(self, release) -> PasswordHasher:
+        """Fixture for a hasher whose only slot is occupied"""
+        hasher = PasswordHasher(workers=1, queue_size=0)
+        hasher.submit(release.wait)
+        yield hasher
+        release.set()
+        hasher.shutdown()
+
+    def test_hash_and_verify(self):
+        """Test that hashes produced by the pool verify"""
+        hasher = PasswordHasher(workers=1, queue_size=1)
+        hashed = hasher.hash("secret")
+        assert hasher.verify("secret", hashed)
+        assert not hasher.verify("wrong", hashed)
+        assert hasher.completed == 3
+        assert hasher.pending == 0
+        hasher.shutdown()
+
+    def test_full_queue_fails_fast(self, saturated_hasher):
+        """Test that submissions beyond capacity are rejected with 503"""
+        with pytest.raises(HTTPException) as exc_info:
+            saturated_hasher.hash("secret")
+        assert exc_info.value.status_code == 503
+        assert saturated_hasher.rejected == 1
+
+    def test_login_returns_503_when_saturated(self, saturated_hasher, monkeypatch):
+        """Test that login fails fast instead of piling up"""
+        client = TestClient(app)
+        user = {
+            "email": "test_password_hasher@example.com",
+            "password": "testpassword123",
+            "full_name": "Test Password Hasher User"
+        }
+        response = client.post("/users/", json=user)
+        assert response.status_code in (200, 400)
+
+        monkeypatch.setattr(main, "password_hasher", saturated_hasher)
+        response = client.post(
+            "/token",
+            data={
+                "username": user["email"],
+                "password": user["password"],
+                "grant_type": "password"
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_metrics_exposes_pool_state(self):
+        """Test that queue depth and latency are exposed for scraping"""
+        response = TestClient(app).get("/metrics")
+        assert "password_hash_pending" in response.text
+        assert "password_hash_latency_seconds_sum" in response.text
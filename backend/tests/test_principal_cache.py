@@ -0,0 +1,147 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+import time
+from typing import Dict
+
+from app.main import app
+from app.cache import Principal, PrincipalCache, TokenVersionCache, principal_cache
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestPrincipalCache:
+    """Test the token-keyed principal cache"""
+
+    @pytest.fixture
+    def cache(self) -> PrincipalCache:
+        """Fixture for a small, isolated cache"""
+        return PrincipalCache(maxsize=2, ttl=60)
+
+    @pytest.fixture
+    def principal(self) -> Principal:
+        return Principal(id=1, email="cache@example.com", full_name="Cache User")
+
+    def test_miss_then_hit(self, cache, principal):
+        """Test that a stored token is served from the cache"""
+        assert cache.get("token-a") is None
+        cache.set("token-a", principal)
+        assert cache.get("token-a") == principal
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_entry_expires_with_token(self, cache, principal):
+        """Test that entries never outlive the token expiry"""
+        cache.set("token-a", principal, token_expires_at=time.time() - 1)
+        assert cache.get("token-a") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache, principal):
+        """Test that the least recently used token is evicted first"""
+        cache.set("token-a", principal)
+        cache.set("token-b", principal)
+        cache.get("token-a")
+        cache.set("token-c", principal)
+        assert cache.get("token-b") is None
+        assert cache.get("token-a") == principal
+        assert cache.evictions == 1
+
+    def test_invalidate_user(self, cache, principal):
+        """Test that invalidation drops every token of the user"""
+        other = Principal(id=2, email="other@example.com", full_name="Other")
+        cache.set("token-a", principal)
+        cache.set("token-b", other)
+        cache.invalidate_user(principal.id)
+        assert cache.get("token-a") is None
+        assert cache.get("token-b") == other
+
+    def test_get_user_returns_live_principal(self, cache, principal):
+        """Test lookup of a user's principal through any of their tokens"""
+        assert cache.get_user(principal.id) is None
+        cache.set("token-a", principal)
+        assert cache.get_user(principal.id) == principal
+        cache.invalidate_user(principal.id)
+        assert cache.get_user(principal.id) is None
+
+
+class TestTokenVersionCache:
+    """Test the per-user token version cache"""
+
+    def test_entries_expire(self):
+        """Test that versions are only trusted for the TTL"""
+        versions = TokenVersionCache(maxsize=2, ttl=60)
+        versions.set(1, 3)
+        assert versions.get(1) == 3
+        versions.ttl = 0.01
+        versions.set(1, 4)
+        time.sleep(0.02)
+        assert versions.get(1) is None
+
+    def test_bounded_and_invalidated(self):
+        """Test LRU bounding and per-user invalidation"""
+        versions = TokenVersionCache(maxsize=2, ttl=60)
+        for user_id in (1, 2, 3):
+            versions.set(user_id, 0)
+        assert versions.get(1) is None
+        versions.invalidate_user(2)
+        assert versions.get(2) is None
+        assert versions.get(3) == 0
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that a zero TTL reads the version on every request"""
+        versions = TokenVersionCache(ttl=0)
+        versions.set(1, 0)
+        assert versions.get(1) is None
+
+
+class TestPrincipalCacheApi:
+    """Test the principal cache through the API"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def test_user(self) -> Dict:
+        """Fixture for test user credentials"""
+        return {
+            "email": "test_principal_cache@example.com",
+            "password": "testpassword123",
+            "full_name": "Test Principal Cache User"
+        }
+
+    @pytest.fixture
+    def auth_headers(self, client, test_user) -> Dict:
+        """Fixture for authorization headers"""
+        response = client.post("/users/", json=test_user)
+        if response.status_code not in (200, 400):  # 400 means user exists
+            pytest.fail(f"Failed to setup test user: {response.text}")
+        response = client.post(
+            "/token",
+            data={
+                "username": test_user["email"],
+                "password": test_user["password"],
+                "grant_type": "password"
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        assert response.status_code == 200
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def test_repeated_requests_hit_cache(self, client, auth_headers):
+        """Test that steady-state requests are served from the cache"""
+        assert client.get("/expenses/", headers=auth_headers).status_code == 200
+        hits = principal_cache.hits
+        assert client.get("/expenses/", headers=auth_headers).status_code == 200
+        assert principal_cache.hits == hits + 1
+
+    def test_metrics_exposes_counters(self, client, auth_headers):
+        """Test that cache counters are exposed for scraping"""
+        client.get("/expenses/", headers=auth_headers)
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert "principal_cache_hits_total" in response.text
+        assert "principal_cache_misses_total" in response.text
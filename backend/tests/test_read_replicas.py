@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+import logging
+import shutil
+from datetime import datetime, timezone
+from typing import Dict
+
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, database, models
+from app.main import app
+from app.database import SessionLocal, SessionRouter, engine, make_engine
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestReadReplicas:
+    """Test read/write session routing with a file-copy replica"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def test_user(self) -> Dict:
+        """Fixture for test user credentials"""
+        return {
+            "email": "test_read_replicas@example.com",
+            "password": "testpassword123",
+            "full_name": "Test Read Replicas User"
+        }
+
+    @pytest.fixture
+    def auth_headers(self, client, test_user) -> Dict:
+        """Fixture for authorization headers"""
+        response = client.post("/users/", json=test_user)
+        if response.status_code not in (200, 400):  # 400 means user exists
+            pytest.fail(f"Failed to setup test user: {response.text}")
+        response = client.post(
+            "/token",
+            data={
+                "username": test_user["email"],
+                "password": test_user["password"],
+                "grant_type": "password"
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        assert response.status_code == 200
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    @pytest.fixture
+    def router(self, auth_headers, tmp_path, monkeypatch) -> SessionRouter:
+        """Fixture for a router whose replica is a snapshot of the primary"""
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        replica_path = tmp_path / "replica.db"
+        shutil.copyfile(engine.url.database, replica_path)
+        replica_engine = make_engine(f"sqlite:///{replica_path}")
+        router = SessionRouter(SessionLocal, [sessionmaker(bind=replica_engine)])
+        monkeypatch.setattr(database, "session_router", router)
+        yield router
+        replica_engine.dispose()
+
+    def _user_id(self, router, test_user) -> int:
+        with router.primary() as db:
+            return db.query(models.User).filter(models.User.email == test_user["email"]).one().id
+
+    def test_reads_go_to_replica(self, client, auth_headers, router):
+        """Test that reads without recent writes are served by the replica"""
+        assert client.get("/expenses/", headers=auth_headers).status_code == 200
+        assert router.replica_reads == 1
+        assert router.primary_reads == 0
+
+    def test_read_your_writes(self, client, auth_headers, router, test_user):
+        """Test that a user reads their own writes right after a mutation"""
+        response = client.post("/expenses/", json={
+            "date": datetime.now(timezone.utc).isoformat(),
+            "category": "Food",
+            "amount": 10.0,
+            "description": "Replica test",
+            "payment_method": "Cash"
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        user_id = self._user_id(router, test_user)
+        with router.primary() as db:
+            position = db.get(models.CollectionVersion, ("writes", user_id)).version
+        assert router.last_write(user_id) == position
+
+        expenses = client.get("/expenses/", headers=auth_headers).json()
+        assert response.json()["id"] in [expense["id"] for expense in expenses]
+        assert router.primary_reads == 1
+
+        # The snapshot replica does not have the new row
+        with router.replicas[0]() as db:
+            assert db.get(models.Expense, response.json()["id"]) is None
+
+    def test_replica_serves_once_caught_up(self, client, auth_headers, router, test_user):
+        """Test that reads return to the replica once it has applied the user's last commit"""
+        response = client.post("/token/revoke", headers=auth_headers)
+        assert response.status_code == 200
+        user_id = self._user_id(router, test_user)
+        # Commits outside the sync feed take a position too
+        assert router.last_write(user_id) > 0
+        assert asyncio.run(router.reader(user_id)) is router.primary
+
+        with router.replicas[0]() as db:
+            db.merge(models.CollectionVersion(scope="writes", scope_id=user_id, version=router.last_write(user_id)))
+            db.commit()
+        assert asyncio.run(router.reader(user_id)) is router.replicas[0]
+        assert asyncio.run(router.reader(None)) is router.replicas[0]
+
+    def test_without_replicas_reads_use_primary(self):
+        """Test that the router is a no-op without replicas"""
+        router = SessionRouter(SessionLocal, [])
+        router.mark_write(1, 10)
+        assert asyncio.run(router.reader(1)) is SessionLocal
+        assert router.last_write(1) == 0
+
+    def test_without_replicas_commits_take_no_position(self, client, auth_headers, test_user):
+        """Test that writes only count positions while replicas are configured"""
+        with SessionLocal() as db:
+            user_id = crud.get_user_by_email(db, test_user["email"]).id
+
+        def positions():
+            with SessionLocal() as db:
+                return [crud.get_collection_version(db, "sync", 0), crud.get_collection_version(db, "writes", user_id)]
+
+        before = positions()
+        assert client.post("/token/revoke", headers=auth_headers).status_code == 200
+        assert positions() == before
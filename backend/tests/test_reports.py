@@ -0,0 +1,121 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+
+import numpy as np
+
+from app import reports
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestReports:
+    """Test the multi-dimensional aggregation endpoint"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def expenses(self, client, auth_headers, sign_up):
+        """Fixture for personal expenses over two months and a shared group expense"""
+        for day, category, amount, method in [
+            ("2024-01-01", "Food", 10.0, "Cash"),  # Monday
+            ("2024-01-02", "Food", 20.0, "Card"),
+            ("2024-01-09", "Food", 60.0, "Card"),
+            ("2024-01-31", "Travel", 100.0, "Card"),
+            ("2024-02-05", "Food", 5.0, "Cash"),
+        ]:
+            response = client.post("/expenses/", json={
+                "date": f"{day}T12:00:00", "category": category, "amount": amount, "payment_method": method
+            }, headers=auth_headers)
+            assert response.status_code == 200
+        group = client.post("/groups/", json={"name": "Report Group"}, headers=auth_headers).json()
+        other = sign_up("report_member")
+        assert client.post(f"/groups/{group['id']}/join", headers=other).status_code == 200
+        response = client.post(f"/groups/{group['id']}/expenses", json={
+            "date": "2024-02-10T12:00:00", "category": "Food", "amount": 80.0, "split_type": "equal"
+        }, headers=other)
+        assert response.status_code == 200
+        return group
+
+    def test_group_by_category_and_month(self, client, auth_headers, expenses):
+        """Test rows per category and month, with the caller's share of group expenses"""
+        response = client.get("/reports/aggregate", params={
+            "group_by": ["category", "month"], "measure": ["sum", "count", "max"]
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        report = response.json()
+        assert report["rows"] == [
+            {"category": "Food", "month": "2024-01", "sum": 90.0, "count": 3, "max": 60.0},
+            {"category": "Food", "month": "2024-02", "sum": 45.0, "count": 2, "max": 40.0},
+            {"category": "Travel", "month": "2024-01", "sum": 100.0, "count": 1, "max": 100.0},
+        ]
+        assert report["total"] == {"sum": 235.0, "count": 6, "max": 100.0}
+        assert isinstance(report["total"]["count"], int)
+        assert report["pivot"] is None
+
+    def test_pivot(self, client, auth_headers, expenses):
+        """Test a category x month matrix with empty cells"""
+        response = client.get("/reports/aggregate", params={
+            "group_by": ["category", "month"], "measure": ["sum", "mean"], "pivot": "true"
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        pivot = response.json()["pivot"]
+        assert pivot["rows"] == ["Food", "Travel"]
+        assert pivot["columns"] == ["2024-01", "2024-02"]
+        assert pivot["cells"]["sum"] == [[90.0, 45.0], [100.0, 0]]
+        assert pivot["cells"]["mean"] == [[30.0, 22.5], [100.0, None]]
+
+    def test_date_and_source_dimensions(self, client, auth_headers, expenses):
+        """Test week, weekday, payment method and group dimensions"""
+        params = {"end_date": "2024-01-31"}
+        weeks = client.get("/reports/aggregate", params={**params, "group_by": "week"}, headers=auth_headers)
+        assert [(row["week"], row["count"]) for row in weeks.json()["rows"]] == [
+            ("2024-01-01", 2), ("2024-01-08", 1), ("2024-01-29", 1)
+        ]
+        weekdays = client.get("/reports/aggregate", params={**params, "group_by": "weekday"}, headers=auth_headers)
+        assert [(row["weekday"], row["count"]) for row in weekdays.json()["rows"]] == [(0, 1), (1, 2), (2, 1)]
+
+        sources = client.get("/reports/aggregate", params={
+            "group_by": ["group", "payment_method"], "measure": "sum"
+        }, headers=auth_headers).json()["rows"]
+        assert sources == [
+            {"group": None, "payment_method": "Card", "sum": 180.0},
+            {"group": None, "payment_method": "Cash", "sum": 15.0},
+            {"group": expenses["id"], "payment_method": None, "sum": 40.0},
+        ]
+        card = client.get("/reports/aggregate", params={"payment_method": "Card"}, headers=auth_headers).json()
+        assert card["total"] == {"sum": 180.0, "count": 3}
+
+    def test_invalid_requests(self, client, auth_headers):
+        """Test unknown dimensions, repeated dimensions and pivots without two dimensions"""
+        assert client.get(
+            "/reports/aggregate", params={"group_by": "colour"}, headers=auth_headers
+        ).status_code == 422
+        assert client.get(
+            "/reports/aggregate", params={"group_by": ["day", "day"]}, headers=auth_headers
+        ).status_code == 422
+        assert client.get(
+            "/reports/aggregate", params={"group_by": "day", "pivot": "true"}, headers=auth_headers
+        ).status_code == 422
+        empty = client.get("/reports/aggregate", params={"group_by": "day"}, headers=auth_headers)
+        assert empty.status_code == 200
+        assert empty.json()["rows"] == []
+
+    def test_percentiles_match_numpy(self):
+        """Test that per-group median and p90 agree with numpy.percentile"""
+        rng = np.random.default_rng(7)
+        categories = rng.choice(["a", "b", "c"], size=500).tolist()
+        amounts = rng.gamma(2.0, 20.0, size=500)
+        report = reports.aggregate(
+            {"amount": amounts.tolist(), "category": categories}, ["category"], ["median", "p90"]
+        )
+        for row in report["rows"]:
+            selected = amounts[np.array(categories) == row["category"]]
+            assert row["median"] == pytest.approx(np.percentile(selected, 50))
+            assert row["p90"] == pytest.approx(np.percentile(selected, 90))
@@ -0,0 +1,174 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from datetime import date
+from typing import Dict
+
+from sqlalchemy import update
+
+from app import crud, models, rollups
+from app.database import SessionLocal
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestRollups:
+    """Test the expense rollup tables behind statistics"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def auth_headers(self, sign_up) -> Dict:
+        """Fixture for authorization headers of a fresh user"""
+        return sign_up("test_rollups")
+
+    @pytest.fixture
+    def user_id(self, auth_headers, tmp_path) -> int:
+        with SessionLocal() as db:
+            return crud.get_user_by_email(db, f"test_rollups_{tmp_path.name}@example.com").id
+
+    def _create(self, client, headers, day: str, category: str, amount: float) -> Dict:
+        response = client.post("/expenses/", json={
+            "date": f"{day}T12:00:00", "category": category, "amount": amount, "payment_method": "Cash"
+        }, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def _buckets(self, rollup, owner_id: int) -> list:
+        model = rollup.model
+        with SessionLocal() as db:
+            assert rollups.check(db, rollup, owner_id) == []
+            rows = db.query(
+                getattr(model, rollup.bucket), model.category, model.total, model.count, model.max_amount
+            ).filter(getattr(model, rollup.owner) == owner_id).order_by(
+                getattr(model, rollup.bucket), model.category
+            ).all()
+        return [(str(bucket), category, total, count, maximum) for bucket, category, total, count, maximum in rows]
+
+    def test_maintained_by_writes(self, client, auth_headers, user_id):
+        """Test that creates, updates and deletes keep the user's buckets exact"""
+        first = self._create(client, auth_headers, "2024-01-05", "Food", 10.0)
+        largest = self._create(client, auth_headers, "2024-01-05", "Food", 30.0)
+        moved = self._create(client, auth_headers, "2024-01-06", "Food", 5.0)
+        assert self._buckets(rollups.DAILY, user_id) == [
+            ("2024-01-05", "Food", 40.0, 2, 30.0), ("2024-01-06", "Food", 5.0, 1, 5.0)
+        ]
+
+        # Deleting the largest amount recomputes the bucket maximum
+        assert client.delete(f"/expenses/{largest['id']}", headers=auth_headers).status_code == 200
+        response = client.patch(f"/expenses/{moved['id']}", json={
+            "date": "2024-01-05T18:00:00", "category": "Travel"
+        }, headers=auth_headers)
+        assert response.status_code == 200
+        assert client.patch(
+            f"/expenses/{first['id']}", json={"amount": 12.0}, headers=auth_headers
+        ).status_code == 200
+        assert self._buckets(rollups.DAILY, user_id) == [
+            ("2024-01-05", "Food", 12.0, 1, 12.0), ("2024-01-05", "Travel", 5.0, 1, 5.0)
+        ]
+
+    def test_maintained_by_bulk_writes(self, client, auth_headers, user_id):
+        """Test that batches, imports and bulk deletes keep the user's buckets exact"""
+        kept = self._create(client, auth_headers, "2024-02-01", "Food", 8.0)
+        gone = self._create(client, auth_headers, "2024-02-02", "Food", 9.0)
+        response = client.post("/batch/expenses", json={"operations": [
+            {"op": "create", "expense": {
+                "date": "2024-02-01T09:00:00", "category": "Food", "amount": 2.0, "payment_method": "Card"
+            }},
+            {"op": "update", "id": kept["id"], "changes": {"category": "Rent"}},
+            {"op": "delete", "id": gone["id"]},
+        ]}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["failed"] == 0
+        statement = "date,category,amount,description,payment_method\n" \
+                    "2024-02-03,Food,4,Coffee,Card\n2024-03-01,Food,6,Lunch,Card\n"
+        response = client.post(
+            "/expenses/import", headers=auth_headers,
+            files={"file": ("statement.csv", statement.encode(), "application/octet-stream")}
+        )
+        assert response.status_code == 200
+        assert self._buckets(rollups.DAILY, user_id) == [
+            ("2024-02-01", "Food", 2.0, 1, 2.0),
+            ("2024-02-01", "Rent", 8.0, 1, 8.0),
+            ("2024-02-03", "Food", 4.0, 1, 4.0),
+            ("2024-03-01", "Food", 6.0, 1, 6.0),
+        ]
+
+        response = client.request(
+            "DELETE", "/expenses/", params={"start_date": "2024-02-02", "end_date": "2024-02-29"},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["deleted"] == 1
+        assert [bucket[:2] for bucket in self._buckets(rollups.DAILY, user_id)] == [
+            ("2024-02-01", "Food"), ("2024-02-01", "Rent"), ("2024-03-01", "Food")
+        ]
+
+    def test_statistics_read_rollups(self, client, auth_headers, user_id):
+        """Test that whole-day windows are answered from the buckets and others from the expenses"""
+        self._create(client, auth_headers, "2024-01-05", "Food", 10.0)
+        self._create(client, auth_headers, "2024-01-31", "Travel", 100.0)
+        with SessionLocal() as db:
+            db.execute(
+                update(models.DailyExpenseRollup)
+                .where(models.DailyExpenseRollup.user_id == user_id, models.DailyExpenseRollup.category == "Food")
+                .values(total=11.0)
+            )
+            db.commit()
+
+        aligned = client.get(
+            "/statistics/by_category", params={"start_date": "2024-01-01", "end_date": "2024-01-31"},
+            headers=auth_headers
+        ).json()
+        exact = client.get(
+            "/statistics/by_category", params={"start_date": "2024-01-01", "min_amount": 0},
+            headers=auth_headers
+        ).json()
+        assert aligned["categories"]["Food"]["total"] == 11.0
+        assert exact["categories"]["Food"]["total"] == 10.0
+
+        with SessionLocal() as db:
+            assert [key for key, _, _ in rollups.check(db, rollups.DAILY, user_id)] == [
+                (user_id, date(2024, 1, 5), "Food")
+            ]
+        assert rollups.main(["rebuild"]) == 0
+        assert rollups.main(["check"]) == 0
+        aligned = client.get(
+            "/statistics/by_category", params={"start_date": "2024-01-01", "end_date": "2024-01-31"},
+            headers=auth_headers
+        ).json()
+        assert aligned == exact
+
+    def test_group_rollups(self, client, auth_headers, sign_up):
+        """Test monthly group buckets and the group statistics endpoint"""
+        group = client.post("/groups/", json={"name": "Rollup Group"}, headers=auth_headers).json()
+        expenses = []
+        for day, amount in [("2024-01-03", 30.0), ("2024-01-20", 50.0), ("2024-02-02", 20.0)]:
+            response = client.post(f"/groups/{group['id']}/expenses", json={
+                "date": f"{day}T12:00:00", "category": "Taxi", "amount": amount, "split_type": "equal"
+            }, headers=auth_headers)
+            assert response.status_code == 200
+            expenses.append(response.json())
+        assert client.delete(
+            f"/groups/{group['id']}/expenses/{expenses[1]['id']}", headers=auth_headers
+        ).status_code == 200
+        assert self._buckets(rollups.MONTHLY_GROUP, group["id"]) == [
+            ("2024-01-01", "Taxi", 30.0, 1, 30.0), ("2024-02-01", "Taxi", 20.0, 1, 20.0)
+        ]
+
+        url = f"/groups/{group['id']}/statistics/by_category"
+        month = client.get(url, params={"start_date": "2024-01-01", "end_date": "2024-01-31"}, headers=auth_headers)
+        assert month.status_code == 200
+        assert month.json()["categories"] == {"Taxi": {"total": 30.0, "count": 1, "average": 30.0, "max": 30.0}}
+        # Not month-aligned, so counted from the expenses
+        days = client.get(url, params={"start_date": "2024-01-15"}, headers=auth_headers).json()
+        assert (days["total"], days["count"]) == (20.0, 1)
+
+        outsider = sign_up("outsider")
+        assert client.get(url, headers=outsider).status_code == 403
@@ -0,0 +1,124 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from typing import Dict, List
+
+from app import crud, search
+from app.database import SessionLocal
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestSearch:
+    """Test full-text search across personal and group expenses"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    def _expense(self, description: str, category: str = "Food") -> Dict:
+        return {
+            "date": "2024-01-05T09:00:00",
+            "category": category,
+            "amount": 12.0,
+            "payment_method": "Cash",
+            "description": description
+        }
+
+    def _create(self, client, headers, description: str, category: str = "Food") -> int:
+        response = client.post("/expenses/", json=self._expense(description, category), headers=headers)
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    def _search(self, client, headers, q: str, **params) -> List:
+        response = client.get("/search", params={"q": q, **params}, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_ranked_prefix_matches(self, client, auth_headers):
+        """Test that words match as prefixes, case and accent insensitively, best match first"""
+        pizza = self._create(client, auth_headers, "Pizza with the team")
+        twice = self._create(client, auth_headers, "Pizza pizza Pizza")
+        self._create(client, auth_headers, "Train ticket", "Travel")
+        cafe = self._create(client, auth_headers, "Café au lait")
+
+        hits = self._search(client, auth_headers, "piz")
+        assert [hit["id"] for hit in hits] == [twice, pizza]
+        assert hits[0]["entity"] == "expense" and hits[0]["score"] > hits[1]["score"]
+        assert [hit["id"] for hit in self._search(client, auth_headers, "CAFE")] == [cafe]
+        assert len(self._search(client, auth_headers, "travel")) == 1
+        assert self._search(client, auth_headers, "pizza train") == []
+
+    def test_group_expenses_and_scope(self, client, auth_headers, second_auth_headers):
+        """Test that group expenses of the caller's groups match and others' expenses do not"""
+        group = client.post("/groups/", json={"name": "Search group"}, headers=auth_headers).json()
+        shared = client.post(
+            f"/groups/{group['id']}/expenses", json=self._expense("Shared sushi"), headers=auth_headers
+        ).json()
+        own = self._create(client, second_auth_headers, "Sushi alone")
+
+        hits = self._search(client, auth_headers, "sushi")
+        assert [(hit["entity"], hit["id"], hit["group_id"]) for hit in hits] == [
+            ("group_expense", shared["id"], group["id"])
+        ]
+        assert [hit["id"] for hit in self._search(client, second_auth_headers, "sushi")] == [own]
+
+        client.post(f"/groups/{group['id']}/join", headers=second_auth_headers)
+        assert len(self._search(client, second_auth_headers, "sushi")) == 2
+
+    def test_index_follows_changes(self, client, auth_headers):
+        """Test that updates and deletes reach the index"""
+        expense = self._create(client, auth_headers, "Old words")
+        client.patch(f"/expenses/{expense}", json={"description": "New words"}, headers=auth_headers)
+        assert self._search(client, auth_headers, "old") == []
+        assert [hit["id"] for hit in self._search(client, auth_headers, "new")] == [expense]
+
+        client.delete(f"/expenses/{expense}", headers=auth_headers)
+        assert self._search(client, auth_headers, "words") == []
+
+    def test_paging(self, client, auth_headers):
+        """Test that skip and limit page through the ranked matches"""
+        ids = {self._create(client, auth_headers, f"Coffee {i}") for i in range(5)}
+        first = self._search(client, auth_headers, "coffee", limit=3)
+        rest = self._search(client, auth_headers, "coffee", skip=3, limit=3)
+        assert len(first) == 3 and len(rest) == 2
+        assert {hit["id"] for hit in first + rest} == ids
+
+    def test_best_match_ranks_over_newer_ones(self, client, auth_headers):
+        """Test that every match is ranked, so an old best match still comes first"""
+        best = self._create(client, auth_headers, "Tea")
+        response = client.post("/batch/expenses", json={"operations": [
+            {"op": "create", "expense": self._expense(f"Tea with biscuits and a long chat {i}")} for i in range(40)
+        ]}, headers=auth_headers)
+        assert response.status_code == 200
+        hits = self._search(client, auth_headers, "tea", limit=5)
+        assert hits[0]["id"] == best
+        pages = [self._search(client, auth_headers, "tea", skip=skip, limit=15) for skip in (0, 15, 30, 45)]
+        assert [len(page) for page in pages] == [15, 15, 11, 0]
+        assert len({hit["id"] for page in pages for hit in page}) == 41
+
+    def test_query_syntax_is_not_interpreted(self, client, auth_headers):
+        """Test that FTS5 operators in the query are treated as plain words"""
+        expense = self._create(client, auth_headers, "Bread and butter")
+        hits = self._search(client, auth_headers, 'bread" OR scope:u* NEAR(')
+        assert hits == []
+        assert [hit["id"] for hit in self._search(client, auth_headers, '"bread" -')] == [expense]
+
+    def test_like_fallback_escapes_wildcards(self, client, auth_headers):
+        """Test that the ILIKE fallback matches "_" in a word literally"""
+        response = client.post("/expenses/", json=self._expense("order_id 7"), headers=auth_headers)
+        self._create(client, auth_headers, "orderXid 7")
+        expense = response.json()
+        with SessionLocal() as db:
+            hits = crud._search_like(db, expense["user_id"], [], search.search_terms("order_id"), 0, 20)
+        assert [hit["id"] for hit in hits] == [expense["id"]]
+
+    def test_invalid_parameters(self, client, auth_headers):
+        """Test that empty queries and out-of-range pages are rejected"""
+        for params in ({"q": "!!"}, {"q": "x", "limit": 0}, {"q": "x", "limit": 101}, {"q": "x", "skip": -1}):
+            assert client.get("/search", params=params, headers=auth_headers).status_code == 422
+        assert client.get("/search", headers=auth_headers).status_code == 422
@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from typing import Dict, List
+
+from app import settlement
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestSettlementPlan:
+    """Test the transfers that settle a group"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    def _settles(self, balances: List[Dict], transfers: List[Dict]) -> bool:
+        remaining = {balance["user_id"]: round(balance["net"] * 100) for balance in balances}
+        for transfer in transfers:
+            assert transfer["amount"] > 0
+            remaining[transfer["from_user_id"]] += round(transfer["amount"] * 100)
+            remaining[transfer["to_user_id"]] -= round(transfer["amount"] * 100)
+        return not any(remaining.values())
+
+    def test_plan_settles_group(self, client, sign_up):
+        """Test that the plan pays off every member's net, is cached and is for members only"""
+        members = [sign_up(f"{name}_settlement", full_name=name) for name in ("alice", "bob", "carol", "dave")]
+        group = client.post("/groups/", json={"name": "Settlement Group"}, headers=members[0]).json()
+        for headers in members[1:]:
+            assert client.post(f"/groups/{group['id']}/join", headers=headers).status_code == 200
+        for headers, amount in ((members[0], 100.0), (members[1], 20.0)):
+            response = client.post(f"/groups/{group['id']}/expenses", json={
+                "date": "2024-03-01T12:00:00", "category": "Food", "amount": amount, "split_type": "equal"
+            }, headers=headers)
+            assert response.status_code == 200
+
+        response = client.get(f"/groups/{group['id']}/settlement-plan", headers=members[3])
+        assert response.status_code == 200
+        plan = response.json()
+        balances = client.get(f"/groups/{group['id']}/balances", headers=members[3]).json()
+        assert plan["exact"] is True
+        assert len(plan["transfers"]) == 3
+        assert self._settles(balances, plan["transfers"])
+
+        etag = response.headers["ETag"]
+        assert client.get(
+            f"/groups/{group['id']}/settlement-plan", headers={**members[3], "If-None-Match": etag}
+        ).status_code == 304
+        outsider = sign_up("erin_settlement", full_name="erin")
+        assert client.get(f"/groups/{group['id']}/settlement-plan", headers=outsider).status_code == 403
+
+    def test_exact_solver_beats_greedy(self, monkeypatch):
+        """Test that independent zero-sum subsets are settled separately when the group is small"""
+        nets = [-2.0, -9.0, 5.0, -3.0, 4.0, 5.0, 3.0, -3.0]
+        balances = [{"user_id": i, "net": net} for i, net in enumerate(nets, start=1)]
+        exact = settlement.plan(balances)
+        assert exact["exact"] is True
+        # {-2, -9, 5, -3, 4, 5} splits into {-9, 4, 5} and {-2, -3, 5}; the pair {3, -3} settles alone
+        assert len(exact["transfers"]) == 5
+        assert self._settles(balances, exact["transfers"])
+
+        monkeypatch.setattr(settlement, "EXACT_SETTLEMENT_MAX_MEMBERS", 0)
+        greedy = settlement.plan(balances)
+        assert greedy["exact"] is False
+        assert len(greedy["transfers"]) == 6
+        assert self._settles(balances, greedy["transfers"])
+
+    def test_rounding_residue(self):
+        """Test that nets rounded per member still produce a plan that sums to zero"""
+        balances = [
+            {"user_id": 1, "net": 66.67}, {"user_id": 2, "net": -33.33}, {"user_id": 3, "net": -33.33}
+        ]
+        plan = settlement.plan(balances)
+        assert sorted((t["from_user_id"], t["to_user_id"], t["amount"]) for t in plan["transfers"]) == [
+            (2, 1, 33.33), (3, 1, 33.33)
+        ]
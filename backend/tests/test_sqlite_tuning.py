@@ -0,0 +1,63 @@
+import pytest
+import logging
+
+from sqlalchemy import text
+
+from app.database import WalCheckpointer, make_engine
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestSqliteTuning:
+    """Test the SQLite production profile"""
+
+    @pytest.fixture
+    def tuned_engine(self, tmp_path):
+        """Fixture for an engine with the production profile"""
+        engine = make_engine(f"sqlite:///{tmp_path / 'tuned.db'}", tuned=True)
+        yield engine
+        engine.dispose()
+
+    @pytest.fixture
+    def default_engine(self, tmp_path):
+        """Fixture for an engine with SQLite defaults"""
+        engine = make_engine(f"sqlite:///{tmp_path / 'default.db'}", tuned=False)
+        yield engine
+        engine.dispose()
+
+    def _pragma(self, engine, name):
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    def test_profile_applied_on_connect(self, tuned_engine):
+        """Test that every pragma of the profile is set"""
+        assert self._pragma(tuned_engine, "journal_mode") == "wal"
+        assert self._pragma(tuned_engine, "synchronous") == 1  # NORMAL
+        assert self._pragma(tuned_engine, "busy_timeout") == 5000
+        assert self._pragma(tuned_engine, "cache_size") == -65536
+        assert self._pragma(tuned_engine, "temp_store") == 2  # MEMORY
+        assert self._pragma(tuned_engine, "mmap_size") > 0
+
+    def test_profile_can_be_disabled(self, default_engine):
+        """Test that untuned engines keep SQLite defaults"""
+        assert self._pragma(default_engine, "journal_mode") == "delete"
+        assert self._pragma(default_engine, "synchronous") == 2  # FULL
+
+    def test_checkpointer_truncates_wal(self, tuned_engine):
+        """Test that a background checkpoint pass empties the WAL"""
+        with tuned_engine.begin() as connection:
+            connection.execute(text("CREATE TABLE t (x INTEGER)"))
+            connection.execute(text("INSERT INTO t VALUES (1)"))
+        checkpointer = WalCheckpointer(tuned_engine, interval=60, mode="TRUNCATE")
+        checkpointer.run_once()
+        assert checkpointer.checkpoints == 1
+        assert checkpointer.run_once() == 0
+
+    def test_checkpointer_thread_stops(self, tuned_engine):
+        """Test that the checkpoint thread starts and stops cleanly"""
+        checkpointer = WalCheckpointer(tuned_engine, interval=0.01)
+        checkpointer.start()
+        checkpointer.stop()
+        assert checkpointer._thread is None
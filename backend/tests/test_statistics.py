@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestStatistics:
+    """Test the SQL-aggregated statistics endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def expenses(self, client, auth_headers):
+        """Fixture for a few expenses in January and February"""
+        for day, category, amount in [
+            ("2024-01-05", "Food", 10.0),
+            ("2024-01-20", "Food", 30.0),
+            ("2024-01-31", "Travel", 100.0),
+            ("2024-02-01", "Food", 5.0),
+        ]:
+            response = client.post("/expenses/", json={
+                "date": f"{day}T12:00:00", "category": category, "amount": amount, "payment_method": "Cash"
+            }, headers=auth_headers)
+            assert response.status_code == 200
+
+    def test_by_category(self, client, auth_headers, expenses):
+        """Test totals, counts, averages and maxima per category and overall"""
+        response = client.get("/statistics/by_category", headers=auth_headers)
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["categories"] == {
+            "Food": {"total": 45.0, "count": 3, "average": 15.0, "max": 30.0},
+            "Travel": {"total": 100.0, "count": 1, "average": 100.0, "max": 100.0},
+        }
+        assert (stats["total"], stats["count"], stats["max"]) == (145.0, 4, 100.0)
+        assert stats["average"] == pytest.approx(36.25)
+
+    def test_date_window(self, client, auth_headers, expenses):
+        """Test that a date-only end_date includes that whole day"""
+        params = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+        stats = client.get("/statistics/by_category", params=params, headers=auth_headers).json()
+        assert stats["count"] == 3
+        assert set(stats["categories"]) == {"Food", "Travel"}
+        assert stats["categories"]["Food"]["total"] == 40.0
+
+    def test_summary(self, client, auth_headers, expenses):
+        """Test /statistics/ with the other listing filters"""
+        response = client.get("/statistics/", params={"category": "Food"}, headers=auth_headers)
+        assert response.json() == {"total": 45.0, "count": 3, "average": 15.0, "max": 30.0}
+
+    def test_empty_window(self, client, auth_headers):
+        """Test that no expenses give zeros rather than an error"""
+        stats = client.get("/statistics/by_category", headers=auth_headers).json()
+        assert stats == {"total": 0.0, "count": 0, "average": 0.0, "max": 0.0, "categories": {}}
+
+    def test_etag_follows_expenses(self, client, auth_headers, expenses):
+        """Test that statistics answer 304 until an expense changes"""
+        etag = client.get("/statistics/by_category", headers=auth_headers).headers["etag"]
+        headers = {**auth_headers, "If-None-Match": etag}
+        assert client.get("/statistics/by_category", headers=headers).status_code == 304
+        client.post("/expenses/", json={
+            "date": "2024-03-01T12:00:00", "category": "Food", "amount": 1.0, "payment_method": "Cash"
+        }, headers=auth_headers)
+        assert client.get("/statistics/by_category", headers=headers).status_code == 200
+
+    def test_invalid_window(self, client, auth_headers):
+        """Test that an inverted window is rejected"""
+        params = {"start_date": "2024-02-01", "end_date": "2024-01-01"}
+        assert client.get("/statistics/", params=params, headers=auth_headers).status_code == 422
+        assert client.get("/statistics/by_category").status_code == 401
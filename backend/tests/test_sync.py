@@ -0,0 +1,110 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from typing import Dict, List
+
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestSyncChanges:
+    """Test the delta sync feed"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    def _expense(self, description: str) -> Dict:
+        return {
+            "date": "2024-01-05T09:00:00",
+            "category": "Food",
+            "amount": 12.0,
+            "payment_method": "Cash",
+            "description": description
+        }
+
+    def _changes(self, client, headers, since: int = 0, limit: int = 500) -> Dict:
+        response = client.get("/sync/changes", params={"since": since, "limit": limit}, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def _ops(self, feed) -> List:
+        return [(c["entity"], c["op"], c["id"]) for c in feed["changes"]]
+
+    def test_inserts_and_deletes(self, client, auth_headers):
+        """Test that a client sees inserts, then only the later delete"""
+        assert self._changes(client, auth_headers) == {"changes": [], "next_since": 0, "has_more": False}
+        expense = client.post("/expenses/", json=self._expense("Sync lunch"), headers=auth_headers).json()
+        feed = self._changes(client, auth_headers)
+        assert self._ops(feed) == [("expense", "upsert", expense["id"])]
+        assert feed["changes"][0]["expense"]["description"] == "Sync lunch"
+        assert feed["changes"][0]["updated_at"]
+        since = feed["next_since"]
+        assert self._changes(client, auth_headers, since)["changes"] == []
+
+        client.delete(f"/expenses/{expense['id']}", headers=auth_headers)
+        feed = self._changes(client, auth_headers, since)
+        assert self._ops(feed) == [("expense", "delete", expense["id"])]
+        assert feed["next_since"] > since
+
+    def test_paging(self, client, auth_headers):
+        """Test that walking pages yields every change once, in seq order"""
+        ids = [
+            client.post("/expenses/", json=self._expense(f"Sync {i}"), headers=auth_headers).json()["id"]
+            for i in range(5)
+        ]
+        seen, since, has_more = [], 0, True
+        while has_more:
+            feed = self._changes(client, auth_headers, since, limit=2)
+            assert len(feed["changes"]) <= 2
+            seen.extend(feed["changes"])
+            since, has_more = feed["next_since"], feed["has_more"]
+        assert [c["id"] for c in seen] == ids
+        assert [c["seq"] for c in seen] == sorted(c["seq"] for c in seen)
+
+    def test_group_changes(self, client, auth_headers, second_auth_headers):
+        """Test that members see group joins and group expense changes"""
+        group = client.post("/groups/", json={"name": "Sync group"}, headers=auth_headers).json()
+        since = self._changes(client, second_auth_headers)["next_since"]
+        before = client.post(f"/groups/{group['id']}/expenses", json=self._expense("Before join"),
+                             headers=auth_headers).json()
+        # Not a member yet
+        assert self._changes(client, second_auth_headers, since)["changes"] == []
+
+        client.post(f"/groups/{group['id']}/join", headers=second_auth_headers)
+        feed = self._changes(client, second_auth_headers, since)
+        assert self._ops(feed) == [
+            ("group_expense", "upsert", before["id"]),
+            ("group", "joined", group["id"]),
+        ]
+        since = feed["next_since"]
+
+        expense = client.post(f"/groups/{group['id']}/expenses", json=self._expense("After join"),
+                              headers=auth_headers).json()
+        feed = self._changes(client, second_auth_headers, since)
+        assert self._ops(feed) == [("group_expense", "upsert", expense["id"])]
+        assert feed["changes"][0]["group_id"] == group["id"]
+        assert feed["changes"][0]["group_expense"]["user_split"] == 6.0
+        assert feed["changes"][0]["group_expense"]["is_paid_by_user"] is False
+
+        # A row deleted before the client syncs only shows up as its tombstone
+        client.delete(f"/groups/{group['id']}/expenses/{expense['id']}", headers=auth_headers)
+        feed = self._changes(client, second_auth_headers, since)
+        assert self._ops(feed) == [("group_expense", "delete", expense["id"])]
+
+    def test_other_users_changes_hidden(self, client, auth_headers, second_auth_headers):
+        """Test that personal changes of other users never appear"""
+        expense = client.post("/expenses/", json=self._expense("Private"), headers=auth_headers).json()
+        client.delete(f"/expenses/{expense['id']}", headers=auth_headers)
+        assert self._changes(client, second_auth_headers)["changes"] == []
+
+    def test_invalid_parameters(self, client, auth_headers):
+        """Test that out-of-range since and limit are rejected"""
+        assert client.get("/sync/changes?since=-1", headers=auth_headers).status_code == 422
+        assert client.get("/sync/changes?limit=0", headers=auth_headers).status_code == 422
+        assert client.get("/sync/changes?limit=1001", headers=auth_headers).status_code == 422
+        assert client.get("/sync/changes").status_code == 401
@@ -0,0 +1,121 @@
+import pytest
+from fastapi.testclient import TestClient
+import logging
+from typing import Dict
+
+from app.main import app
+
+# Configure logging
+logging.basicConfig(level=logging.ERROR)
+logger = logging.getLogger(__name__)
+
+
+class TestUpdateExpense:
+    """Test PUT and PATCH /expenses/{id} with optimistic concurrency"""
+
+    @pytest.fixture
+    def client(self):
+        """Fixture for TestClient"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def expense(self, client, auth_headers) -> Dict:
+        """Fixture for an expense of the first user"""
+        response = client.post("/expenses/", json=self._expense(), headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def _expense(self, **overrides) -> Dict:
+        expense = {
+            "date": "2024-01-05T09:00:00",
+            "category": "Food",
+            "amount": 10.0,
+            "payment_method": "Cash",
+            "description": "Lunch"
+        }
+        expense.update(overrides)
+        return expense
+
+    def test_put_replaces_expense(self, client, auth_headers, expense):
+        """Test that PUT without a version replaces every field and bumps the version"""
+        assert expense["version"] == 1
+        body = self._expense(category="Travel", amount=42.5, description=None, payment_method="Card")
+        response = client.put(f"/expenses/{expense['id']}", json=body, headers=auth_headers)
+        assert response.status_code == 200
+        updated = response.json()
+        assert updated["id"] == expense["id"]
+        assert updated["version"] == 2 and response.headers["etag"] == '"2"'
+        assert (updated["category"], updated["amount"], updated["description"]) == ("Travel", 42.5, None)
+
+        listed = client.get("/expenses/", headers=auth_headers).json()
+        assert listed == [updated]
+
+    def test_patch_changes_given_fields(self, client, auth_headers, expense):
+        """Test that PATCH keeps omitted fields"""
+        response = client.patch(
+            f"/expenses/{expense['id']}", json={"amount": 12, "version": 1}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        updated = response.json()
+        assert updated["amount"] == 12 and updated["version"] == 2
+        assert updated["description"] == "Lunch" and updated["category"] == "Food"
+
+    def test_stale_version_conflicts(self, client, auth_headers, expense):
+        """Test that an update based on an old version gets 409 and changes nothing"""
+        url = f"/expenses/{expense['id']}"
+        assert client.patch(url, json={"amount": 1, "version": 1}, headers=auth_headers).status_code == 200
+
+        response = client.patch(url, json={"amount": 2, "version": 1}, headers=auth_headers)
+        assert response.status_code == 409
+        response = client.put(url, json=self._expense(amount=3), headers={**auth_headers, "If-Match": '"1"'})
+        assert response.status_code == 409
+
+        stored = client.get("/expenses/", headers=auth_headers).json()[0]
+        assert stored["amount"] == 1 and stored["version"] == 2
+
+    def test_if_match_header(self, client, auth_headers, expense):
+        """Test that If-Match carries the expected version"""
+        url = f"/expenses/{expense['id']}"
+        response = client.patch(url, json={"amount": 5}, headers={**auth_headers, "If-Match": '"1"'})
+        assert response.status_code == 200
+        response = client.patch(url, json={"amount": 6}, headers={**auth_headers, "If-Match": response.headers["etag"]})
+        assert response.status_code == 200 and response.json()["version"] == 3
+        response = client.patch(url, json={"amount": 7}, headers={**auth_headers, "If-Match": "abc"})
+        assert response.status_code == 422
+
+    def test_missing_or_foreign_expense(self, client, auth_headers, second_auth_headers, expense):
+        """Test that unknown and other users' expenses are not found"""
+        url = f"/expenses/{expense['id']}"
+        assert client.patch(url, json={"amount": 1}, headers=second_auth_headers).status_code == 404
+        assert client.patch(url, json={"amount": 1, "version": 1}, headers=second_auth_headers).status_code == 404
+        assert client.put("/expenses/999999", json=self._expense(), headers=auth_headers).status_code == 404
+        assert client.get("/expenses/", headers=auth_headers).json()[0]["version"] == 1
+
+    def test_invalid_values(self, client, auth_headers, expense):
+        """Test that updates follow the create validation rules"""
+        url = f"/expenses/{expense['id']}"
+        assert client.put(url, json=self._expense(category=" "), headers=auth_headers).status_code == 422
+        assert client.patch(url, json={"amount": -1}, headers=auth_headers).status_code == 422
+        assert client.patch(url, json={"category": None}, headers=auth_headers).status_code == 422
+
+    def test_empty_patch_is_rejected(self, client, auth_headers, expense):
+        """Test that a PATCH without fields changes neither the version nor the list ETag"""
+        url = f"/expenses/{expense['id']}"
+        etag = client.get("/expenses/", headers=auth_headers).headers["etag"]
+        assert client.patch(url, json={}, headers=auth_headers).status_code == 422
+        assert client.patch(url, json={"version": 1}, headers=auth_headers).status_code == 422
+
+        response = client.get("/expenses/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert client.get("/expenses/", headers=auth_headers).json()[0]["version"] == 1
+
+    def test_update_invalidates_etag_and_syncs(self, client, auth_headers, expense):
+        """Test that an update changes the list ETag and moves the expense up the sync feed"""
+        etag = client.get("/expenses/", headers=auth_headers).headers["etag"]
+        since = client.get("/sync/changes", headers=auth_headers).json()["next_since"]
+        client.patch(f"/expenses/{expense['id']}", json={"amount": 3}, headers=auth_headers)
+
+        response = client.get("/expenses/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        feed = client.get("/sync/changes", params={"since": since}, headers=auth_headers).json()
+        assert [(c["op"], c["id"]) for c in feed["changes"]] == [("upsert", expense["id"])]